@@ -0,0 +1,48 @@
+"""add indexes for hot filters
+
+Revision ID: add_hot_filter_indexes
+Revises: add_sales_rollups
+Create Date: 2026-10-18 12:00:00.000000
+
+"""
+from alembic import op
+
+
+# revision identifiers, used by Alembic.
+revision = 'add_hot_filter_indexes'
+down_revision = 'add_sales_rollups'
+branch_labels = None
+depends_on = None
+
+# (name, table, columns)
+INDEXES = [
+    # Per-user listings in id (cursor) order, optionally within a date range
+    ('ix_sales_created_by_id', 'sales', ['created_by', 'id']),
+    ('ix_sales_created_by_created_at_id', 'sales', ['created_by', 'created_at', 'id']),
+    ('ix_sales_created_at', 'sales', ['created_at']),
+    ('ix_sales_customer_id', 'sales', ['customer_id']),
+    ('ix_sales_product_id', 'sales', ['product_id']),
+    ('ix_inventory_transactions_created_by_id', 'inventory_transactions', ['created_by', 'id']),
+    ('ix_inventory_transactions_product_id_created_by', 'inventory_transactions', ['product_id', 'created_by']),
+    ('ix_products_created_by_id', 'products', ['created_by', 'id']),
+    ('ix_products_category_id', 'products', ['category_id']),
+    ('ix_products_supplier_id', 'products', ['supplier_id']),
+    ('ix_returns_sale_id', 'returns', ['sale_id']),
+    ('ix_returns_product_id', 'returns', ['product_id']),
+]
+
+
+def upgrade() -> None:
+    # CREATE INDEX CONCURRENTLY cannot run inside a transaction, but does not
+    # block writes to the tables while the indexes are built.
+    with op.get_context().autocommit_block():
+        for name, table, columns in INDEXES:
+            op.create_index(
+                name, table, columns, unique=False, postgresql_concurrently=True,
+            )
+
+
+def downgrade() -> None:
+    with op.get_context().autocommit_block():
+        for name, table, _ in reversed(INDEXES):
+            op.drop_index(name, table_name=table, postgresql_concurrently=True)
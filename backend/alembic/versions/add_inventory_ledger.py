@@ -0,0 +1,48 @@
+"""add inventory ledger balances and stock snapshots
+
+Revision ID: add_inventory_ledger
+Revises: add_hot_filter_indexes
+Create Date: 2026-10-18 14:00:00.000000
+
+"""
+from alembic import op
+import sqlalchemy as sa
+
+
+# revision identifiers, used by Alembic.
+revision = 'add_inventory_ledger'
+down_revision = 'add_hot_filter_indexes'
+branch_labels = None
+depends_on = None
+
+
+def upgrade() -> None:
+    op.add_column('inventory_transactions', sa.Column('balance_after', sa.Integer(), nullable=True))
+    op.create_index(
+        'ix_inventory_transactions_product_id_created_at_id', 'inventory_transactions',
+        ['product_id', 'created_at', 'id'], unique=False,
+    )
+    op.create_table(
+        'stock_snapshots',
+        sa.Column('id', sa.Integer(), nullable=False),
+        sa.Column('product_id', sa.Integer(), nullable=False),
+        sa.Column('stock', sa.Integer(), nullable=False),
+        sa.Column('taken_at', sa.DateTime(timezone=True), server_default=sa.text('now()'), nullable=False),
+        sa.ForeignKeyConstraint(['product_id'], ['products.id'], ),
+        sa.PrimaryKeyConstraint('id')
+    )
+    op.create_index(op.f('ix_stock_snapshots_id'), 'stock_snapshots', ['id'], unique=False)
+    op.create_index(
+        'ix_stock_snapshots_product_id_taken_at', 'stock_snapshots',
+        ['product_id', 'taken_at'], unique=False,
+    )
+    # Existing ledger rows have no balance, so start history from today's stock
+    op.execute("INSERT INTO stock_snapshots (product_id, stock, taken_at) SELECT id, stock, now() FROM products")
+
+
+def downgrade() -> None:
+    op.drop_index('ix_stock_snapshots_product_id_taken_at', table_name='stock_snapshots')
+    op.drop_index(op.f('ix_stock_snapshots_id'), table_name='stock_snapshots')
+    op.drop_table('stock_snapshots')
+    op.drop_index('ix_inventory_transactions_product_id_created_at_id', table_name='inventory_transactions')
+    op.drop_column('inventory_transactions', 'balance_after')
@@ -0,0 +1,96 @@
+"""add locations and per-location stock levels
+
+Revision ID: add_locations
+Revises: add_inventory_ledger
+Create Date: 2026-10-18 15:00:00.000000
+
+"""
+from alembic import op
+import sqlalchemy as sa
+
+
+# revision identifiers, used by Alembic.
+revision = 'add_locations'
+down_revision = 'add_inventory_ledger'
+branch_labels = None
+depends_on = None
+
+
+def upgrade() -> None:
+    op.create_table(
+        'locations',
+        sa.Column('id', sa.Integer(), nullable=False),
+        sa.Column('name', sa.String(), nullable=False),
+        sa.Column('address', sa.Text(), nullable=True),
+        sa.Column('created_at', sa.DateTime(timezone=True), server_default=sa.text('now()'), nullable=True),
+        sa.Column('updated_at', sa.DateTime(timezone=True), nullable=True),
+        sa.PrimaryKeyConstraint('id')
+    )
+    op.create_index(op.f('ix_locations_id'), 'locations', ['id'], unique=False)
+    op.create_index(op.f('ix_locations_name'), 'locations', ['name'], unique=True)
+    op.create_table(
+        'stock_levels',
+        sa.Column('id', sa.Integer(), nullable=False),
+        sa.Column('product_id', sa.Integer(), nullable=False),
+        sa.Column('location_id', sa.Integer(), nullable=False),
+        sa.Column('stock', sa.Integer(), nullable=False, server_default='0'),
+        sa.Column('updated_at', sa.DateTime(timezone=True), server_default=sa.text('now()'), nullable=True),
+        sa.ForeignKeyConstraint(['product_id'], ['products.id'], ),
+        sa.ForeignKeyConstraint(['location_id'], ['locations.id'], ),
+        sa.PrimaryKeyConstraint('id'),
+        sa.UniqueConstraint('product_id', 'location_id', name='uq_stock_levels_product_location')
+    )
+    op.create_index(op.f('ix_stock_levels_id'), 'stock_levels', ['id'], unique=False)
+    op.create_index(
+        'ix_stock_levels_location_id_product_id', 'stock_levels',
+        ['location_id', 'product_id'], unique=False,
+    )
+
+    op.add_column('sales', sa.Column('location_id', sa.Integer(), nullable=True))
+    op.create_foreign_key('sales_location_id_fkey', 'sales', 'locations', ['location_id'], ['id'])
+    op.add_column('inventory_transactions', sa.Column('location_id', sa.Integer(), nullable=True))
+    op.create_foreign_key(
+        'inventory_transactions_location_id_fkey', 'inventory_transactions', 'locations',
+        ['location_id'], ['id'],
+    )
+    op.add_column('stock_snapshots', sa.Column('location_id', sa.Integer(), nullable=True))
+    op.create_foreign_key(
+        'stock_snapshots_location_id_fkey', 'stock_snapshots', 'locations', ['location_id'], ['id']
+    )
+
+    # Point-in-time lookups now filter on the location as well
+    op.drop_index('ix_inventory_transactions_product_id_created_at_id', table_name='inventory_transactions')
+    op.create_index(
+        'ix_inventory_transactions_product_location_created_at', 'inventory_transactions',
+        ['product_id', 'location_id', 'created_at', 'id'], unique=False,
+    )
+    op.drop_index('ix_stock_snapshots_product_id_taken_at', table_name='stock_snapshots')
+    op.create_index(
+        'ix_stock_snapshots_product_location_taken_at', 'stock_snapshots',
+        ['product_id', 'location_id', 'taken_at'], unique=False,
+    )
+
+
+def downgrade() -> None:
+    op.drop_index('ix_stock_snapshots_product_location_taken_at', table_name='stock_snapshots')
+    op.create_index(
+        'ix_stock_snapshots_product_id_taken_at', 'stock_snapshots',
+        ['product_id', 'taken_at'], unique=False,
+    )
+    op.drop_index('ix_inventory_transactions_product_location_created_at', table_name='inventory_transactions')
+    op.create_index(
+        'ix_inventory_transactions_product_id_created_at_id', 'inventory_transactions',
+        ['product_id', 'created_at', 'id'], unique=False,
+    )
+    op.drop_constraint('stock_snapshots_location_id_fkey', 'stock_snapshots', type_='foreignkey')
+    op.drop_column('stock_snapshots', 'location_id')
+    op.drop_constraint('inventory_transactions_location_id_fkey', 'inventory_transactions', type_='foreignkey')
+    op.drop_column('inventory_transactions', 'location_id')
+    op.drop_constraint('sales_location_id_fkey', 'sales', type_='foreignkey')
+    op.drop_column('sales', 'location_id')
+    op.drop_index('ix_stock_levels_location_id_product_id', table_name='stock_levels')
+    op.drop_index(op.f('ix_stock_levels_id'), table_name='stock_levels')
+    op.drop_table('stock_levels')
+    op.drop_index(op.f('ix_locations_name'), table_name='locations')
+    op.drop_index(op.f('ix_locations_id'), table_name='locations')
+    op.drop_table('locations')
@@ -0,0 +1,36 @@
+"""add the low stock set
+
+Revision ID: add_low_stock
+Revises: add_product_search
+Create Date: 2026-10-18 17:00:00.000000
+
+"""
+from alembic import op
+import sqlalchemy as sa
+
+
+# revision identifiers, used by Alembic.
+revision = 'add_low_stock'
+down_revision = 'add_product_search'
+branch_labels = None
+depends_on = None
+
+
+def upgrade() -> None:
+    op.create_table(
+        'low_stock_products',
+        sa.Column('product_id', sa.Integer(), nullable=False),
+        sa.Column('since', sa.DateTime(timezone=True), server_default=sa.text('now()'), nullable=False),
+        sa.ForeignKeyConstraint(['product_id'], ['products.id'], ),
+        sa.PrimaryKeyConstraint('product_id')
+    )
+    op.execute(
+        "INSERT INTO low_stock_products (product_id) "
+        "SELECT id FROM products WHERE stock + coalesce("
+        "(SELECT sum(stock) FROM stock_levels WHERE stock_levels.product_id = products.id), 0"
+        ") <= min_quantity"
+    )
+
+
+def downgrade() -> None:
+    op.drop_table('low_stock_products')
@@ -0,0 +1,40 @@
+"""add trigram and full-text indexes for product search
+
+Revision ID: add_product_search
+Revises: add_locations
+Create Date: 2026-10-18 16:00:00.000000
+
+"""
+from alembic import op
+
+
+# revision identifiers, used by Alembic.
+revision = 'add_product_search'
+down_revision = 'add_locations'
+branch_labels = None
+depends_on = None
+
+# Must match SEARCH_DOCUMENT in app/models/product.py for the planner to use the index
+SEARCH_DOCUMENT = "to_tsvector('simple', coalesce(name, '') || ' ' || coalesce(description, ''))"
+
+# (name, index definition)
+INDEXES = [
+    ('ix_products_name_trgm', 'gin (name gin_trgm_ops)'),
+    ('ix_products_sku_trgm', 'gin (sku gin_trgm_ops)'),
+    ('ix_products_barcode_trgm', 'gin (barcode gin_trgm_ops)'),
+    ('ix_products_search', f'gin (({SEARCH_DOCUMENT}))'),
+]
+
+
+def upgrade() -> None:
+    op.execute("CREATE EXTENSION IF NOT EXISTS pg_trgm")
+    # Built concurrently so that product writes are not blocked meanwhile
+    with op.get_context().autocommit_block():
+        for name, definition in INDEXES:
+            op.execute(f"CREATE INDEX CONCURRENTLY IF NOT EXISTS {name} ON products USING {definition}")
+
+
+def downgrade() -> None:
+    with op.get_context().autocommit_block():
+        for name, _ in reversed(INDEXES):
+            op.execute(f"DROP INDEX CONCURRENTLY IF EXISTS {name}")
@@ -0,0 +1,45 @@
+"""add sales_rollup_deltas
+
+Revision ID: add_sales_rollup_deltas
+Revises: add_low_stock
+Create Date: 2026-10-18 21:00:00.000000
+
+"""
+from alembic import op
+import sqlalchemy as sa
+
+
+# revision identifiers, used by Alembic.
+revision = 'add_sales_rollup_deltas'
+down_revision = 'add_low_stock'
+branch_labels = None
+depends_on = None
+
+
+def upgrade() -> None:
+    op.create_table(
+        'sales_rollup_deltas',
+        sa.Column('id', sa.Integer(), nullable=False),
+        sa.Column('granularity', sa.String(length=8), nullable=False),
+        sa.Column('bucket_start', sa.DateTime(timezone=True), nullable=False),
+        sa.Column('dimension', sa.String(length=16), nullable=False),
+        sa.Column('dimension_id', sa.Integer(), nullable=False),
+        sa.Column('sales_count', sa.Integer(), nullable=False, server_default='0'),
+        sa.Column('units', sa.Float(), nullable=False, server_default='0'),
+        sa.Column('revenue', sa.Float(), nullable=False, server_default='0'),
+        sa.Column('cost', sa.Float(), nullable=False, server_default='0'),
+        sa.Column('returns_count', sa.Integer(), nullable=False, server_default='0'),
+        sa.Column('returned_units', sa.Float(), nullable=False, server_default='0'),
+        sa.Column('returned_revenue', sa.Float(), nullable=False, server_default='0'),
+        sa.Column('returned_cost', sa.Float(), nullable=False, server_default='0'),
+        sa.PrimaryKeyConstraint('id'),
+    )
+    op.create_index(
+        'ix_sales_rollup_deltas_range', 'sales_rollup_deltas',
+        ['granularity', 'dimension', 'bucket_start'], unique=False,
+    )
+
+
+def downgrade() -> None:
+    op.drop_index('ix_sales_rollup_deltas_range', table_name='sales_rollup_deltas')
+    op.drop_table('sales_rollup_deltas')
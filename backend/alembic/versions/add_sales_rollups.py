@@ -0,0 +1,95 @@
+"""add sales_rollups
+
+Revision ID: add_sales_rollups
+Revises: add_created_by_to_products
+Create Date: 2026-10-18 10:00:00.000000
+
+"""
+from alembic import op
+import sqlalchemy as sa
+from sqlalchemy import text
+
+
+# revision identifiers, used by Alembic.
+revision = 'add_sales_rollups'
+down_revision = 'add_created_by_to_products'
+branch_labels = None
+depends_on = None
+
+
+def upgrade() -> None:
+    op.create_table(
+        'sales_rollups',
+        sa.Column('id', sa.Integer(), nullable=False),
+        sa.Column('granularity', sa.String(length=8), nullable=False),
+        sa.Column('bucket_start', sa.DateTime(timezone=True), nullable=False),
+        sa.Column('dimension', sa.String(length=16), nullable=False),
+        sa.Column('dimension_id', sa.Integer(), nullable=False),
+        sa.Column('sales_count', sa.Integer(), nullable=False, server_default='0'),
+        sa.Column('units', sa.Float(), nullable=False, server_default='0'),
+        sa.Column('revenue', sa.Float(), nullable=False, server_default='0'),
+        sa.Column('cost', sa.Float(), nullable=False, server_default='0'),
+        sa.Column('returns_count', sa.Integer(), nullable=False, server_default='0'),
+        sa.Column('returned_units', sa.Float(), nullable=False, server_default='0'),
+        sa.Column('returned_revenue', sa.Float(), nullable=False, server_default='0'),
+        sa.Column('returned_cost', sa.Float(), nullable=False, server_default='0'),
+        sa.PrimaryKeyConstraint('id'),
+        sa.UniqueConstraint(
+            'granularity', 'dimension', 'dimension_id', 'bucket_start',
+            name='uq_sales_rollups_bucket',
+        ),
+    )
+    op.create_index(op.f('ix_sales_rollups_id'), 'sales_rollups', ['id'], unique=False)
+    op.create_index(
+        'ix_sales_rollups_range', 'sales_rollups',
+        ['granularity', 'dimension', 'bucket_start'], unique=False,
+    )
+
+    # Backfill from existing sales and returns, one pass per bucket size and dimension
+    connection = op.get_bind()
+    dimensions = {
+        'product': 'p.id',
+        'category': 'p.category_id',
+        'customer': 's.customer_id',
+    }
+    for granularity in ('hour', 'day'):
+        for dimension, key in dimensions.items():
+            connection.execute(text(f"""
+                INSERT INTO sales_rollups
+                    (granularity, bucket_start, dimension, dimension_id,
+                     sales_count, units, revenue, cost,
+                     returns_count, returned_units, returned_revenue, returned_cost)
+                SELECT '{granularity}', date_trunc('{granularity}', s.created_at AT TIME ZONE 'UTC') AT TIME ZONE 'UTC',
+                       '{dimension}', {key},
+                       count(*), sum(s.quantity), sum(s.total_amount), sum(s.quantity * coalesce(p.cost, 0)),
+                       0, 0, 0, 0
+                FROM sales s JOIN products p ON p.id = s.product_id
+                WHERE {key} IS NOT NULL
+                GROUP BY 2, 4
+            """))
+            connection.execute(text(f"""
+                INSERT INTO sales_rollups
+                    (granularity, bucket_start, dimension, dimension_id,
+                     sales_count, units, revenue, cost,
+                     returns_count, returned_units, returned_revenue, returned_cost)
+                SELECT '{granularity}', date_trunc('{granularity}', r.created_at AT TIME ZONE 'UTC') AT TIME ZONE 'UTC',
+                       '{dimension}', {key},
+                       0, 0, 0, 0,
+                       count(*), sum(r.quantity), sum(r.quantity * s.unit_price), sum(r.quantity * coalesce(p.cost, 0))
+                FROM returns r
+                JOIN sales s ON s.id = r.sale_id
+                JOIN products p ON p.id = r.product_id
+                WHERE {key} IS NOT NULL
+                GROUP BY 2, 4
+                ON CONFLICT (granularity, dimension, dimension_id, bucket_start) DO UPDATE SET
+                    returns_count = sales_rollups.returns_count + excluded.returns_count,
+                    returned_units = sales_rollups.returned_units + excluded.returned_units,
+                    returned_revenue = sales_rollups.returned_revenue + excluded.returned_revenue,
+                    returned_cost = sales_rollups.returned_cost + excluded.returned_cost
+            """))
+
+
+def downgrade() -> None:
+    op.drop_index('ix_sales_rollups_range', table_name='sales_rollups')
+    op.drop_index(op.f('ix_sales_rollups_id'), table_name='sales_rollups')
+    op.drop_table('sales_rollups')
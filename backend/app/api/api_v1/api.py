@@ -1,8 +1,18 @@
 from fastapi import APIRouter
-from app.api.api_v1.endpoints import login, users, products, categories, suppliers, inventory, sales, customers
+from app.core.config import settings
+from app.api.api_v1.endpoints import login, users, products, categories, suppliers, inventory, sales, customers, monitoring, analytics, export, locations, stream
 
 api_router = APIRouter()
 
+# Async read routes take precedence over the matching sync routes below, so
+# they must keep the same ETags, projections and response encoding
+if settings.USE_ASYNC_DB:
+    from app.api.api_v1.endpoints import products_async, sales_async, inventory_async
+
+    api_router.include_router(products_async.router, prefix="/products", tags=["products"])
+    api_router.include_router(inventory_async.router, prefix="/inventory", tags=["inventory"])
+    api_router.include_router(sales_async.router, tags=["sales"])
+
 # Login routes
 api_router.include_router(login.router, prefix="/login", tags=["login"])
 
@@ -25,4 +35,19 @@ api_router.include_router(inventory.router, prefix="/inventory", tags=["inventor
 api_router.include_router(sales.router, tags=["sales"])
 
 # Customer routes
-api_router.include_router(customers.router, prefix="/customers", tags=["customers"]) 
\ No newline at end of file
+api_router.include_router(customers.router, prefix="/customers", tags=["customers"])
+
+# Monitoring routes
+api_router.include_router(monitoring.router, prefix="/monitoring", tags=["monitoring"])
+
+# Analytics routes
+api_router.include_router(analytics.router, prefix="/analytics", tags=["analytics"])
+
+# Export routes
+api_router.include_router(export.router, prefix="/export", tags=["export"])
+
+# Location routes
+api_router.include_router(locations.router, prefix="/locations", tags=["locations"])
+
+# Change stream routes
+api_router.include_router(stream.router, prefix="/stream", tags=["stream"])
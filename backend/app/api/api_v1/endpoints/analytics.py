@@ -0,0 +1,80 @@
+from typing import List, Literal, Optional
+from datetime import datetime
+from fastapi import APIRouter, Depends, HTTPException, Query
+from sqlalchemy.orm import Session
+
+from app import crud, schemas
+from app.api import deps
+from app.crud.crud_analytics import as_utc
+
+# Reads the sales rollups (folded buckets plus pending deltas) maintained on every
+# sale and return, so the cost of a query depends on the number of buckets in
+# the range, not of sales.
+router = APIRouter()
+
+Dimension = Literal["product", "category", "customer"]
+
+def check_range(start: datetime, end: datetime) -> None:
+    if as_utc(end) <= as_utc(start):
+        raise HTTPException(status_code=400, detail="end must be after start")
+
+@router.get("/summary", response_model=schemas.AnalyticsSummary)
+def read_summary(
+    db: Session = Depends(deps.get_db),
+    start: datetime = Query(...),
+    end: datetime = Query(...),
+    dimension: Dimension = "product",
+    dimension_id: Optional[int] = None,
+    current_user: schemas.UserPrincipal = Depends(deps.get_current_user),
+) -> dict:
+    """
+    Get revenue, units and margin over [start, end), in total or for one
+    product, category or customer. Ranges are aligned to the hour.
+    """
+    check_range(start, end)
+    totals = crud.analytics.get_totals(
+        db, start=start, end=end, dimension=dimension, dimension_id=dimension_id
+    )
+    return dict(totals, start=start, end=end, dimension=dimension, dimension_id=dimension_id)
+
+@router.get("/timeseries", response_model=List[schemas.AnalyticsBucket])
+def read_timeseries(
+    db: Session = Depends(deps.get_db),
+    start: datetime = Query(...),
+    end: datetime = Query(...),
+    granularity: Literal["hour", "day"] = "day",
+    dimension: Dimension = "product",
+    dimension_id: Optional[int] = None,
+    current_user: schemas.UserPrincipal = Depends(deps.get_current_user),
+) -> List[dict]:
+    """
+    Get totals per hour or day bucket over [start, end).
+    """
+    check_range(start, end)
+    return crud.analytics.get_timeseries(
+        db,
+        start=start,
+        end=end,
+        granularity=granularity,
+        dimension=dimension,
+        dimension_id=dimension_id,
+    )
+
+@router.get("/top", response_model=List[schemas.AnalyticsTopItem])
+def read_top(
+    db: Session = Depends(deps.get_db),
+    start: datetime = Query(...),
+    end: datetime = Query(...),
+    dimension: Dimension = "product",
+    metric: Literal["revenue", "units", "margin", "sales_count"] = "revenue",
+    limit: int = Query(10, gt=0, le=100),
+    current_user: schemas.UserPrincipal = Depends(deps.get_current_user),
+) -> List[dict]:
+    """
+    Get the top products, categories or customers by net revenue, net units,
+    margin or number of sales over [start, end).
+    """
+    check_range(start, end)
+    return crud.analytics.get_top(
+        db, start=start, end=end, dimension=dimension, metric=metric, limit=limit
+    )
@@ -1,5 +1,5 @@
-from typing import List
-from fastapi import APIRouter, Depends, HTTPException
+from typing import List, Optional
+from fastapi import APIRouter, Depends, HTTPException, Request, Response
 from sqlalchemy.orm import Session
 
 from app import crud, models
@@ -10,15 +10,21 @@ router = APIRouter()
 
 @router.get("", response_model=List[Category])
 def read_categories(
+    request: Request,
     db: Session = Depends(deps.get_db),
     skip: int = 0,
     limit: int = 100,
-) -> List[models.Category]:
+    after: Optional[int] = Depends(deps.get_cursor),
+) -> Response:
     """
-    Retrieve categories.
+    Retrieve categories, served from the reference data cache.
     """
-    categories = crud.category.get_multi(db, skip=skip, limit=limit)
-    return categories
+    page = crud.category.get_multi_page_cached(db, skip=skip, limit=limit, after=after)
+    response = deps.json_response(
+        request, page["items"], etag=page["etag"], last_modified=page["last_modified"]
+    )
+    deps.set_next_cursor(response, page["last_id"])
+    return response
 
 @router.post("", response_model=Category)
 def create_category(
@@ -53,14 +59,17 @@ def read_category(
     *,
     db: Session = Depends(deps.get_db),
     id: int,
-) -> models.Category:
+    request: Request,
+) -> Response:
     """
-    Get category by ID.
+    Get category by ID, served from the reference data cache.
     """
-    category = crud.category.get(db=db, id=id)
+    category = crud.category.get_cached(db, id=id)
     if not category:
         raise HTTPException(status_code=404, detail="Category not found")
-    return category
+    return deps.json_response(
+        request, category, last_modified=crud.category.last_modified_cached(db, id=id)
+    )
 
 @router.delete("/{id}", response_model=Category)
 def delete_category(
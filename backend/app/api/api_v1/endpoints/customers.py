@@ -1,5 +1,5 @@
-from typing import List
-from fastapi import APIRouter, Depends, HTTPException
+from typing import List, Optional
+from fastapi import APIRouter, Depends, HTTPException, Request, Response
 from sqlalchemy.orm import Session
 
 from app import crud, models
@@ -10,15 +10,25 @@ router = APIRouter()
 
 @router.get("", response_model=List[Customer])
 def read_customers(
+    request: Request,
+    response: Response,
     db: Session = Depends(deps.get_db),
     skip: int = 0,
     limit: int = 100,
+    after: Optional[int] = Depends(deps.get_cursor),
 ) -> List[models.Customer]:
     """
     Retrieve customers.
     """
-    customers = crud.customer.get_multi(db, skip=skip, limit=limit)
-    return customers
+    deps.check_page_not_modified(
+        request, response, db.query(models.Customer), models.Customer,
+        skip=skip, limit=limit + 1, after=after,
+    )
+    customers, last_id = crud.customer.get_multi_page(
+        db, skip=skip, limit=limit, after=after
+    )
+    deps.set_next_cursor(response, last_id)
+    return deps.model_response(response, List[Customer], customers)
 
 @router.post("", response_model=Customer)
 def create_customer(
@@ -51,12 +61,17 @@ def update_customer(
 @router.get("/{id}", response_model=Customer)
 def read_customer(
     *,
+    request: Request,
+    response: Response,
     db: Session = Depends(deps.get_db),
     id: int,
 ) -> models.Customer:
     """
     Get customer by ID.
     """
+    deps.check_page_not_modified(
+        request, response, db.query(models.Customer).filter(models.Customer.id == id), models.Customer
+    )
     customer = crud.customer.get(db=db, id=id)
     if not customer:
         raise HTTPException(status_code=404, detail="Customer not found")
@@ -0,0 +1,99 @@
+from typing import Any, Iterator, List, Literal, Optional
+from datetime import date, datetime
+import csv
+import enum
+import io
+import json
+
+from fastapi import APIRouter, Depends, HTTPException, Query
+from fastapi.responses import StreamingResponse
+from sqlalchemy.sql import Select
+
+from app import crud, schemas
+from app.api import deps
+from app.core.config import settings
+from app.db.session import SessionLocal
+
+router = APIRouter()
+
+MEDIA_TYPES = {"csv": "text/csv", "ndjson": "application/x-ndjson"}
+
+def _value(value: Any) -> Any:
+    if isinstance(value, enum.Enum):
+        return value.value
+    if isinstance(value, (datetime, date)):
+        return value.isoformat()
+    return value
+
+def _csv_lines(fields: List[str], batches: Iterator[List[Any]]) -> Iterator[str]:
+    buffer = io.StringIO()
+    writer = csv.writer(buffer)
+    writer.writerow(fields)
+    yield buffer.getvalue()
+    for rows in batches:
+        buffer.seek(0)
+        buffer.truncate()
+        writer.writerows([_value(value) for value in row] for row in rows)
+        yield buffer.getvalue()
+
+def _ndjson_lines(fields: List[str], batches: Iterator[List[Any]]) -> Iterator[str]:
+    for rows in batches:
+        yield "".join(
+            json.dumps({field: _value(value) for field, value in zip(fields, row)}) + "\n"
+            for row in rows
+        )
+
+def _stream(stmt: Select, fields: List[str], format: str) -> Iterator[str]:
+    # The request's session is closed once the endpoint returns, so the
+    # response body runs on a session of its own.
+    db = SessionLocal()
+    try:
+        batches = crud.export.stream(db, stmt, batch_size=settings.EXPORT_BATCH_SIZE)
+        lines = _csv_lines if format == "csv" else _ndjson_lines
+        yield from lines(fields, batches)
+    finally:
+        db.close()
+
+@router.get("/{entity}")
+def export_entity(
+    entity: Literal["sales", "products", "inventory"],
+    format: Literal["csv", "ndjson"] = "csv",
+    fields: Optional[str] = Query(None, description="Comma separated list of fields"),
+    start_date: Optional[date] = None,
+    end_date: Optional[date] = None,
+    current_user: schemas.UserPrincipal = Depends(deps.get_current_user),
+) -> StreamingResponse:
+    """
+    Stream all sales, products or inventory transactions of the current user
+    as CSV or NDJSON. Fields of related tables (e.g. product_name) are only
+    joined when requested in `fields`.
+    """
+    field_list = [name.strip() for name in fields.split(",") if name.strip()] if fields else None
+    try:
+        stmt = crud.export.build(
+            entity,
+            fields=field_list,
+            created_by=current_user.id,
+            start_date=datetime.combine(start_date, datetime.min.time()) if start_date else None,
+            end_date=datetime.combine(end_date, datetime.max.time()) if end_date else None,
+        )
+    except ValueError as e:
+        raise HTTPException(status_code=400, detail=str(e))
+
+    columns = [column.name for column in stmt.selected_columns]
+    filename = f"{entity}-{date.today().isoformat()}.{format}"
+    return StreamingResponse(
+        _stream(stmt, columns, format),
+        media_type=MEDIA_TYPES[format],
+        headers={"Content-Disposition": f'attachment; filename="{filename}"'},
+    )
+
+@router.get("/{entity}/fields", response_model=List[str])
+def read_export_fields(
+    entity: Literal["sales", "products", "inventory"],
+    current_user: schemas.UserPrincipal = Depends(deps.get_current_user),
+) -> List[str]:
+    """
+    List the fields that can be requested from `/export/{entity}`.
+    """
+    return crud.export.fields(entity)
@@ -1,30 +1,46 @@
-from typing import List
-from fastapi import APIRouter, Depends, HTTPException
+from typing import List, Optional
+from datetime import datetime
+from fastapi import APIRouter, Depends, HTTPException, Response
 from sqlalchemy.orm import Session, joinedload
 
-from app import crud, models
+from app import crud, models, schemas
 from app.api import deps
-from app.schemas.inventory import InventoryTransaction, InventoryTransactionCreate
+from app.core.metrics import STOCK_OUT_REJECTIONS
+from app.crud.base import Projection, paginate
+from app.schemas.product import ProductInDBBase
+from app.schemas.inventory import InventoryTransaction, InventoryTransactionCreate, StockLevel
 
 router = APIRouter()
 
 @router.get("/", response_model=List[InventoryTransaction])
 def read_inventory_transactions(
+    response: Response,
     db: Session = Depends(deps.get_db),
     skip: int = 0,
     limit: int = 100,
-    current_user: models.User = Depends(deps.get_current_user),
+    after: Optional[int] = Depends(deps.get_cursor),
+    projection: Optional[Projection] = Depends(
+        deps.get_projection(
+            models.InventoryTransaction, InventoryTransaction, expandable={"product": ProductInDBBase}
+        )
+    ),
+    current_user: schemas.UserPrincipal = Depends(deps.get_current_user),
 ) -> List[models.InventoryTransaction]:
     """
-    Get inventory transactions for the current user.
+    Get inventory transactions for the current user. `fields` and `expand`
+    return only the listed columns and embedded objects.
     """
-    return (
-        db.query(models.InventoryTransaction)
-        .filter(models.InventoryTransaction.created_by == current_user.id)
-        .options(joinedload(models.InventoryTransaction.product))
-        .offset(skip)
-        .limit(limit)
-        .all()
+    query = db.query(models.InventoryTransaction).filter(
+        models.InventoryTransaction.created_by == current_user.id
+    )
+    if projection is not None:
+        query = projection.apply(query)
+    transactions, last_id = paginate(
+        query, models.InventoryTransaction, skip=skip, limit=limit, after=after
+    )
+    deps.set_next_cursor(response, last_id)
+    return deps.model_response(
+        response, projection.type if projection else List[InventoryTransaction], transactions
     )
 
 @router.post("/", response_model=InventoryTransaction)
@@ -32,40 +48,56 @@ def create_inventory_transaction(
     *,
     db: Session = Depends(deps.get_db),
     transaction_in: InventoryTransactionCreate,
+    current_user: schemas.UserPrincipal = Depends(deps.get_current_user),
 ) -> models.InventoryTransaction:
     """
-    Create new inventory transaction.
+    Create new inventory transaction: IN adds to the stock, OUT takes from it
+    and ADJUSTMENT sets it to a counted quantity, at `location_id` or in the
+    unassigned stock.
     """
-    # Get the product
-    product = crud.product.get(db=db, id=transaction_in.product_id)
-    if not product:
-        raise HTTPException(status_code=404, detail="Product not found")
-
-    # Update product quantity based on transaction type
-    if transaction_in.transaction_type == "IN":
-        product.quantity += transaction_in.quantity
-    elif transaction_in.transaction_type == "OUT":
-        if product.quantity < transaction_in.quantity:
-            raise HTTPException(status_code=400, detail="Insufficient stock")
-        product.quantity -= transaction_in.quantity
-    elif transaction_in.transaction_type == "ADJUSTMENT":
-        product.quantity = transaction_in.quantity
-
-    # Create transaction
-    transaction = crud.inventory.create(db=db, obj_in=transaction_in)
-    
-    # Commit changes
-    db.commit()
-    db.refresh(product)
-    
+    if transaction_in.location_id is not None and not crud.location.get(db, id=transaction_in.location_id):
+        raise HTTPException(status_code=404, detail="Location not found")
+    transaction = crud.inventory.create_with_stock(
+        db, obj_in=transaction_in, created_by=current_user.id
+    )
+    if not transaction:
+        if crud.inventory.get_stock(db, product_id=transaction_in.product_id) is None:
+            raise HTTPException(status_code=404, detail="Product not found")
+        STOCK_OUT_REJECTIONS.labels("inventory").inc()
+        raise HTTPException(status_code=400, detail="Insufficient stock")
     return transaction
 
+@router.get("/product/{product_id}/stock", response_model=StockLevel)
+def read_product_stock(
+    *,
+    db: Session = Depends(deps.get_db),
+    product_id: int,
+    at: Optional[datetime] = None,
+    location_id: Optional[int] = None,
+    current_user: schemas.UserPrincipal = Depends(deps.get_current_user),
+) -> dict:
+    """
+    Get the current stock of a product, or its stock as of `at`, at
+    `location_id` or unassigned.
+    """
+    if crud.inventory.get_stock(db, product_id=product_id) is None:
+        raise HTTPException(status_code=404, detail="Product not found")
+    if location_id is not None and not crud.location.get(db, id=location_id):
+        raise HTTPException(status_code=404, detail="Location not found")
+    if at is not None:
+        stock = crud.inventory.get_stock_at(db, product_id=product_id, at=at, location_id=location_id)
+        if stock is None:
+            raise HTTPException(status_code=404, detail="No stock history for this time")
+    else:
+        stock = crud.inventory.get_stock(db, product_id=product_id, location_id=location_id) or 0
+    return {"product_id": product_id, "stock": stock, "at": at}
+
 @router.get("/product/{product_id}", response_model=List[InventoryTransaction])
 def read_product_transactions(
     *,
     db: Session = Depends(deps.get_db),
     product_id: int,
-    current_user: models.User = Depends(deps.get_current_user),
+    current_user: schemas.UserPrincipal = Depends(deps.get_current_user),
 ) -> List[models.InventoryTransaction]:
     """
     Get inventory transactions for a specific product and current user.
@@ -0,0 +1,62 @@
+from typing import List, Optional
+from fastapi import APIRouter, Depends, Response
+from sqlalchemy import select
+from sqlalchemy.ext.asyncio import AsyncSession
+
+from app import models, schemas
+from app.api import deps
+from app.crud import async_crud
+from app.crud.async_base import paginate_async
+from app.crud.base import Projection
+from app.schemas.inventory import InventoryTransaction
+from app.schemas.product import ProductInDBBase
+
+# Async versions of the inventory reads, mounted ahead of the sync router when
+# USE_ASYNC_DB is enabled, with the same projections. Transactions are still
+# created through the sync router.
+router = APIRouter()
+
+@router.get("/", response_model=List[InventoryTransaction])
+async def read_inventory_transactions(
+    response: Response,
+    db: AsyncSession = Depends(deps.get_async_db),
+    skip: int = 0,
+    limit: int = 100,
+    after: Optional[int] = Depends(deps.get_cursor),
+    projection: Optional[Projection] = Depends(
+        deps.get_projection(
+            models.InventoryTransaction, InventoryTransaction, expandable={"product": ProductInDBBase}
+        )
+    ),
+    current_user: schemas.UserPrincipal = Depends(deps.get_current_user_async),
+) -> List[models.InventoryTransaction]:
+    """
+    Get inventory transactions for the current user. `fields` and `expand`
+    return only the listed columns and embedded objects.
+    """
+    stmt = select(models.InventoryTransaction).where(
+        models.InventoryTransaction.created_by == current_user.id
+    )
+    if projection is not None:
+        stmt = projection.apply(stmt)
+    transactions, last_id = await paginate_async(
+        db, stmt, models.InventoryTransaction, skip=skip, limit=limit, after=after
+    )
+    deps.set_next_cursor(response, last_id)
+    return deps.model_response(
+        response, projection.type if projection else List[InventoryTransaction], transactions
+    )
+
+@router.get("/product/{product_id}", response_model=List[InventoryTransaction])
+async def read_product_transactions(
+    *,
+    db: AsyncSession = Depends(deps.get_async_db),
+    product_id: int,
+    current_user: schemas.UserPrincipal = Depends(deps.get_current_user_async),
+) -> List[models.InventoryTransaction]:
+    """
+    Get inventory transactions for a specific product and current user.
+    """
+    return await async_crud.inventory.get_by_product(
+        db, product_id=product_id, created_by=current_user.id
+    )
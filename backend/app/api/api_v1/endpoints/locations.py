@@ -0,0 +1,133 @@
+from typing import List, Optional
+from fastapi import APIRouter, Depends, HTTPException, Response
+from sqlalchemy.orm import Session
+
+from app import crud, models, schemas
+from app.api import deps
+from app.core.metrics import STOCK_OUT_REJECTIONS
+from app.schemas.location import (
+    Location, LocationCreate, LocationStock, ProductStock, StockTransfer, StockTransferResult
+)
+
+router = APIRouter()
+
+@router.get("", response_model=List[Location])
+def read_locations(
+    response: Response,
+    db: Session = Depends(deps.get_db),
+    skip: int = 0,
+    limit: int = 100,
+    after: Optional[int] = Depends(deps.get_cursor),
+    current_user: schemas.UserPrincipal = Depends(deps.get_current_user),
+) -> List[models.Location]:
+    """
+    Retrieve locations (warehouses and stores).
+    """
+    locations, last_id = crud.location.get_multi_page(db, skip=skip, limit=limit, after=after)
+    deps.set_next_cursor(response, last_id)
+    return locations
+
+@router.post("", response_model=Location)
+def create_location(
+    *,
+    db: Session = Depends(deps.get_db),
+    location_in: LocationCreate,
+    current_user: schemas.UserPrincipal = Depends(deps.get_current_user),
+) -> models.Location:
+    """
+    Create new location.
+    """
+    if crud.location.get_by_name(db, name=location_in.name):
+        raise HTTPException(status_code=400, detail="Location with this name already exists")
+    return crud.location.create(db, obj_in=location_in)
+
+@router.get("/stock/product/{product_id}", response_model=ProductStock)
+def read_product_stock_by_location(
+    *,
+    db: Session = Depends(deps.get_db),
+    product_id: int,
+    current_user: schemas.UserPrincipal = Depends(deps.get_current_user),
+) -> dict:
+    """
+    Get the stock of a product at every location, plus its unassigned stock.
+    """
+    unassigned = crud.inventory.get_stock(db, product_id=product_id)
+    if unassigned is None:
+        raise HTTPException(status_code=404, detail="Product not found")
+    levels = crud.stock_level.get_by_product(db, product_id=product_id)
+    return {
+        "product_id": product_id,
+        "unassigned": unassigned,
+        "total": unassigned + sum(level.stock for level in levels),
+        "locations": levels,
+    }
+
+@router.post("/transfers", response_model=StockTransferResult)
+def transfer_stock(
+    *,
+    db: Session = Depends(deps.get_db),
+    transfer_in: StockTransfer,
+    current_user: schemas.UserPrincipal = Depends(deps.get_current_user),
+) -> dict:
+    """
+    Move stock between locations. A missing location id stands for the
+    unassigned stock.
+    """
+    if transfer_in.from_location_id == transfer_in.to_location_id:
+        raise HTTPException(status_code=400, detail="Source and destination are the same")
+    for location_id in (transfer_in.from_location_id, transfer_in.to_location_id):
+        if location_id is not None and not crud.location.get(db, id=location_id):
+            raise HTTPException(status_code=404, detail="Location not found")
+    if crud.inventory.get_stock(db, product_id=transfer_in.product_id) is None:
+        raise HTTPException(status_code=404, detail="Product not found")
+    moved = crud.inventory.transfer(
+        db,
+        product_id=transfer_in.product_id,
+        quantity=transfer_in.quantity,
+        from_location_id=transfer_in.from_location_id,
+        to_location_id=transfer_in.to_location_id,
+        created_by=current_user.id,
+        notes=transfer_in.notes,
+    )
+    if not moved:
+        STOCK_OUT_REJECTIONS.labels("transfer").inc()
+        raise HTTPException(status_code=400, detail="Not enough stock")
+    out, into = moved
+    return {"out": out, "into": into}
+
+@router.get("/{id}", response_model=Location)
+def read_location(
+    *,
+    db: Session = Depends(deps.get_db),
+    id: int,
+    current_user: schemas.UserPrincipal = Depends(deps.get_current_user),
+) -> models.Location:
+    """
+    Get location by ID.
+    """
+    location = crud.location.get(db, id=id)
+    if not location:
+        raise HTTPException(status_code=404, detail="Location not found")
+    return location
+
+@router.get("/{id}/stock", response_model=List[LocationStock])
+def read_location_stock(
+    *,
+    response: Response,
+    db: Session = Depends(deps.get_db),
+    id: int,
+    skip: int = 0,
+    limit: int = 100,
+    after: Optional[int] = Depends(deps.get_cursor),
+    current_user: schemas.UserPrincipal = Depends(deps.get_current_user),
+) -> List[models.StockLevel]:
+    """
+    Get the stock of every product held at a location.
+    """
+    if not crud.location.get(db, id=id):
+        raise HTTPException(status_code=404, detail="Location not found")
+    levels, last_id = crud.stock_level.get_by_location_page(
+        db, location_id=id, skip=skip, limit=limit, after=after
+    )
+    deps.set_next_cursor(response, last_id)
+    return levels
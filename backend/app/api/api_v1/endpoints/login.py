@@ -9,19 +9,18 @@ from app import crud, models, schemas
 from app.api import deps
 from app.core import security
 from app.core.config import settings
-from app.core.security import get_password_hash
 
 router = APIRouter()
 
 @router.post("/access-token", response_model=schemas.Token)
-def login_access_token(
+async def login_access_token(
     db: Session = Depends(deps.get_db),
     form_data: OAuth2PasswordRequestForm = Depends()
 ) -> Any:
     """
     OAuth2 compatible token login, get an access token for future requests
     """
-    user = crud.user.authenticate(
+    user = await crud.user.authenticate(
         db, email=form_data.username, password=form_data.password
     )
     if not user:
@@ -37,8 +36,11 @@ def login_access_token(
     }
 
 @router.post("/test-token", response_model=schemas.User)
-def test_token(current_user: models.User = Depends(deps.get_current_user)) -> Any:
+def test_token(
+    db: Session = Depends(deps.get_db),
+    current_user: schemas.UserPrincipal = Depends(deps.get_current_user),
+) -> Any:
     """
     Test access token
     """
-    return current_user 
\ No newline at end of file
+    return crud.user.get(db, id=current_user.id) 
\ No newline at end of file
@@ -0,0 +1,70 @@
+from typing import Any, Dict
+from fastapi import APIRouter, Depends
+
+from app import schemas
+from app.api import deps
+from app.core.config import settings
+from app.core.passwords import password_hasher
+from app.db.query_stats import query_metrics
+from app.db.session import get_pool_stats
+
+router = APIRouter()
+
+@router.get("/db-pool")
+def read_db_pool_stats(
+    current_user: schemas.UserPrincipal = Depends(deps.get_current_active_superuser),
+) -> Dict[str, Any]:
+    """
+    Get connection pool usage of the worker serving this request.
+    Multiply the configured size by the number of workers to size the database.
+    """
+    return {
+        "pool": get_pool_stats(),
+        "config": {
+            "pool_size": settings.DB_POOL_SIZE,
+            "max_overflow": settings.DB_MAX_OVERFLOW,
+            "pool_timeout": settings.DB_POOL_TIMEOUT,
+            "pool_recycle": settings.DB_POOL_RECYCLE,
+            "pool_pre_ping": settings.DB_POOL_PRE_PING,
+        },
+    }
+
+@router.get("/password-hashing")
+def read_password_hashing_stats(
+    current_user: schemas.UserPrincipal = Depends(deps.get_current_active_superuser),
+) -> Dict[str, Any]:
+    """
+    Get password hash/verify counts and latencies (recent operations) of the
+    worker serving this request, and how many were rejected as busy.
+    """
+    return {
+        "stats": password_hasher.stats(),
+        "config": {
+            "bcrypt_rounds": settings.BCRYPT_ROUNDS,
+            "workers": settings.PASSWORD_HASH_WORKERS,
+            "concurrency": settings.PASSWORD_HASH_CONCURRENCY,
+            "queue_timeout": settings.PASSWORD_HASH_QUEUE_TIMEOUT,
+        },
+    }
+
+@router.get("/queries")
+def read_query_stats(
+    reset: bool = False,
+    current_user: schemas.UserPrincipal = Depends(deps.get_current_active_superuser),
+) -> Dict[str, Any]:
+    """
+    Get SQL statement counts and database time per route, most expensive
+    first, for the worker serving this request. `repeated_statements` counts
+    likely N+1 queries. `reset=true` starts the totals over.
+    """
+    routes = query_metrics.snapshot()
+    if reset:
+        query_metrics.reset()
+    return {
+        "routes": routes,
+        "config": {
+            "enabled": settings.QUERY_STATS_ENABLED,
+            "repeat_threshold": settings.QUERY_STATS_REPEAT_THRESHOLD,
+            "slow_ms": settings.QUERY_STATS_SLOW_MS,
+        },
+    }
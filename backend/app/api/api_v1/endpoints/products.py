@@ -1,40 +1,69 @@
-from typing import List, Dict, Any
-from fastapi import APIRouter, Depends, HTTPException
-from sqlalchemy.orm import Session, joinedload
+from typing import List, Dict, Any, Literal, Optional
+from fastapi import APIRouter, Depends, File, HTTPException, Query, Request, Response, UploadFile
+from sqlalchemy.orm import Session
+import io
 import logging
 
-from app import crud, models
+from app import crud, models, schemas
 from app.api import deps
-from app.schemas.product import Product, ProductCreate, ProductUpdate
+from app.crud.base import Projection, paginate
+from app.product_import import import_products
+from app.product_index import product_index
+from app.schemas.product_import import ProductImportReport
+from app.schemas.product import (
+    Category, Product, ProductCreate, ProductInDBBase, ProductLookup, ProductLookupResult,
+    ProductSearchResult, ProductUpdate, Supplier,
+)
 
 router = APIRouter()
 logger = logging.getLogger(__name__)
 
 @router.get("", response_model=List[Product])
 def read_products(
+    request: Request,
+    response: Response,
     db: Session = Depends(deps.get_db),
     skip: int = 0,
     limit: int = 100,
-    current_user: models.User = Depends(deps.get_current_user),
+    after: Optional[int] = Depends(deps.get_cursor),
+    projection: Optional[Projection] = Depends(
+        deps.get_projection(
+            models.Product, ProductInDBBase, expandable={"category": Category, "supplier": Supplier}
+        )
+    ),
+    current_user: schemas.UserPrincipal = Depends(deps.get_current_user),
 ) -> List[models.Product]:
     """
-    Get products for the current user.
+    Get products for the current user. `fields` and `expand` return only the
+    listed columns and embedded objects instead of the full product.
     """
-    return (
-        db.query(models.Product)
-        .filter(models.Product.created_by == current_user.id)
-        .options(joinedload(models.Product.category), joinedload(models.Product.supplier))
-        .offset(skip)
-        .limit(limit)
-        .all()
+    query = db.query(models.Product).filter(models.Product.created_by == current_user.id)
+    # One row past the page, which decides the next cursor
+    deps.check_page_not_modified(
+        request, response, query, models.Product, skip=skip, limit=limit + 1, after=after,
+        depends_on=(
+            crud.category.version(), crud.supplier.version(), projection.key if projection else ""
+        ),
+        changed=(models.Product.stock_levels_changed_at,),
     )
+    if projection is not None:
+        # Categories and suppliers come from the reference data cache, not a join
+        query = projection.apply(query, join=False)
+    products, last_id = paginate(query, models.Product, skip=skip, limit=limit, after=after)
+    deps.set_next_cursor(response, last_id)
+    if projection is None:
+        return deps.model_response(
+            response, List[Product], crud.product.with_references(db, products)
+        )
+    crud.product.with_references(db, products, references=projection.expand)
+    return deps.model_response(response, projection.type, products)
 
 @router.post("", response_model=Product)
 def create_product(
     *,
     db: Session = Depends(deps.get_db),
     product_in: ProductCreate,
-    current_user: models.User = Depends(deps.get_current_user),
+    current_user: schemas.UserPrincipal = Depends(deps.get_current_user),
 ) -> models.Product:
     """
     Create new product.
@@ -59,6 +88,17 @@ def create_product(
 
         # Create product
         product = crud.product.create(db=db, obj_in=product_data)
+
+        # Opening balance, so stock history starts at creation
+        crud.inventory.record(db, entries=[{
+            "product_id": product.id,
+            "transaction_type": models.TransactionType.ADJUSTMENT,
+            "quantity": product.stock,
+            "balance_after": product.stock,
+            "reference": f"product:{product.id}",
+            "created_by": current_user.id,
+        }])
+        db.commit()
         return product
 
     except HTTPException as e:
@@ -71,15 +111,67 @@ def create_product(
             detail=f"Error creating product: {str(e)}"
         )
 
+@router.post("/import", response_model=ProductImportReport)
+def import_products_file(
+    *,
+    db: Session = Depends(deps.get_db),
+    file: UploadFile = File(...),
+    format: Optional[Literal["csv", "ndjson"]] = None,
+    current_user: schemas.UserPrincipal = Depends(deps.get_current_user),
+) -> ProductImportReport:
+    """
+    Create or update products in bulk from a CSV or NDJSON file, matched by SKU.
+    Rows that fail validation are skipped and listed in the report.
+    """
+    if format is None:
+        format = "ndjson" if (file.filename or "").endswith((".ndjson", ".jsonl")) else "csv"
+    stream = io.TextIOWrapper(file.file, encoding="utf-8-sig", newline="")
+    return import_products(db, stream, format=format, created_by=current_user.id)
+
+@router.get("/search", response_model=List[ProductSearchResult])
+def search_products(
+    db: Session = Depends(deps.get_db),
+    q: str = Query(..., min_length=1, max_length=100),
+    skip: int = 0,
+    limit: int = Query(20, ge=1, le=100),
+    current_user: schemas.UserPrincipal = Depends(deps.get_current_user),
+) -> List[Any]:
+    """
+    Search the current user's products by name, SKU, barcode or description,
+    best matches first.
+    """
+    return crud.product.search(db, q=q, created_by=current_user.id, skip=skip, limit=limit)
+
+@router.post("/lookup", response_model=ProductLookupResult)
+def lookup_products(
+    *,
+    db: Session = Depends(deps.get_db),
+    lookup_in: ProductLookup,
+    current_user: schemas.UserPrincipal = Depends(deps.get_current_user),
+) -> dict:
+    """
+    Resolve a burst of scanned barcodes or SKUs in one call. Served from the
+    in-process product index; only codes it does not know hit the database.
+    """
+    products = product_index.lookup(db, lookup_in.codes)
+    missing = [code for code in dict.fromkeys(lookup_in.codes) if code not in products]
+    return {"products": products, "missing": missing}
+
 @router.get("/low-stock", response_model=List[Product])
 def read_low_stock_products(
+    response: Response,
     db: Session = Depends(deps.get_db),
+    skip: int = 0,
+    limit: int = 100,
+    after: Optional[int] = Depends(deps.get_cursor),
 ) -> List[models.Product]:
     """
-    Get products with low stock (quantity <= min_quantity).
+    Get products with low stock (quantity <= min_quantity), from the low
+    stock set kept up to date on every stock change.
     """
-    products = crud.product.get_low_stock(db=db)
-    return products
+    products, last_id = crud.product.get_low_stock(db=db, skip=skip, limit=limit, after=after)
+    deps.set_next_cursor(response, last_id)
+    return deps.model_response(response, List[Product], products)
 
 @router.get("/sku/{sku}", response_model=Product)
 def read_product_by_sku(
@@ -136,12 +228,19 @@ def read_products_by_supplier(
 @router.get("/{id}", response_model=Product)
 def read_product(
     *,
+    request: Request,
+    response: Response,
     db: Session = Depends(deps.get_db),
     id: int,
 ) -> models.Product:
     """
     Get product by ID.
     """
+    deps.check_page_not_modified(
+        request, response, db.query(models.Product).filter(models.Product.id == id), models.Product,
+        depends_on=(crud.category.version(), crud.supplier.version()),
+        changed=(models.Product.stock_levels_changed_at,),
+    )
     product = crud.product.get(db=db, id=id)
     if not product:
         raise HTTPException(status_code=404, detail="Product not found")
@@ -153,14 +252,26 @@ def update_product(
     db: Session = Depends(deps.get_db),
     id: int,
     product_in: ProductUpdate,
+    current_user: schemas.UserPrincipal = Depends(deps.get_current_user),
 ) -> models.Product:
     """
-    Update a product.
+    Update a product. A changed stock is recorded as an inventory ADJUSTMENT.
     """
     product = crud.product.get(db=db, id=id)
     if not product:
         raise HTTPException(status_code=404, detail="Product not found")
-    product = crud.product.update(db=db, db_obj=product, obj_in=product_in)
+    update_data = product_in.model_dump(exclude_unset=True)
+    stock = update_data.pop("stock", None)
+    if stock is not None and stock != product.stock:
+        crud.inventory.apply(
+            db,
+            product_id=id,
+            transaction_type=models.TransactionType.ADJUSTMENT,
+            quantity=stock,
+            created_by=current_user.id,
+            reference=f"product:{id}",
+        )
+    product = crud.product.update(db=db, db_obj=product, obj_in=update_data)
     return product
 
 @router.delete("/{id}", response_model=Product)
@@ -170,10 +281,15 @@ def delete_product(
     id: int,
 ) -> models.Product:
     """
-    Delete a product.
+    Delete a product. Products with stock or sales history cannot be
+    deleted: their ledger rows are kept for good.
     """
     product = crud.product.get(db=db, id=id)
     if not product:
         raise HTTPException(status_code=404, detail="Product not found")
+    if crud.product.has_history(db, id=id):
+        raise HTTPException(
+            status_code=409, detail="Product has stock or sales history and cannot be deleted"
+        )
     product = crud.product.remove(db=db, id=id)
     return product 
\ No newline at end of file
@@ -0,0 +1,108 @@
+from typing import List, Optional
+from fastapi import APIRouter, Depends, HTTPException, Request, Response
+from sqlalchemy import select
+from sqlalchemy.ext.asyncio import AsyncSession
+
+from app import crud, models, schemas
+from app.api import deps
+from app.crud import async_crud
+from app.crud.async_base import paginate_async
+from app.crud.base import Projection
+from app.schemas.product import Category, Product, ProductInDBBase, Supplier
+
+# Async versions of the hot product reads, mounted ahead of the sync router
+# when USE_ASYNC_DB is enabled, with the same ETags, projections and
+# reference data cache. `{id:int}` lets /low-stock etc. fall through.
+router = APIRouter()
+
+@router.get("", response_model=List[Product])
+async def read_products(
+    request: Request,
+    response: Response,
+    db: AsyncSession = Depends(deps.get_async_db),
+    skip: int = 0,
+    limit: int = 100,
+    after: Optional[int] = Depends(deps.get_cursor),
+    projection: Optional[Projection] = Depends(
+        deps.get_projection(
+            models.Product, ProductInDBBase, expandable={"category": Category, "supplier": Supplier}
+        )
+    ),
+    current_user: schemas.UserPrincipal = Depends(deps.get_current_user_async),
+) -> List[models.Product]:
+    """
+    Get products for the current user. `fields` and `expand` return only the
+    listed columns and embedded objects instead of the full product.
+    """
+    stmt = select(models.Product).where(models.Product.created_by == current_user.id)
+    # One row past the page, which decides the next cursor
+    await deps.check_page_not_modified_async(
+        request, response, db, stmt, models.Product, skip=skip, limit=limit + 1, after=after,
+        depends_on=(
+            crud.category.version(), crud.supplier.version(), projection.key if projection else ""
+        ),
+        changed=(models.Product.stock_levels_changed_at,),
+    )
+    if projection is not None:
+        # Categories and suppliers come from the reference data cache, not a join
+        stmt = projection.apply(stmt, join=False)
+    products, last_id = await paginate_async(
+        db, stmt, models.Product, skip=skip, limit=limit, after=after
+    )
+    deps.set_next_cursor(response, last_id)
+    if projection is None:
+        return deps.model_response(
+            response, List[Product], await async_crud.product.with_references(db, products)
+        )
+    await async_crud.product.with_references(db, products, references=projection.expand)
+    return deps.model_response(response, projection.type, products)
+
+@router.get("/sku/{sku}", response_model=Product)
+async def read_product_by_sku(
+    *,
+    db: AsyncSession = Depends(deps.get_async_db),
+    sku: str,
+) -> models.Product:
+    """
+    Get product by SKU.
+    """
+    product = await async_crud.product.get_by_sku(db, sku=sku)
+    if not product:
+        raise HTTPException(status_code=404, detail="Product not found")
+    return product
+
+@router.get("/barcode/{barcode}", response_model=Product)
+async def read_product_by_barcode(
+    *,
+    db: AsyncSession = Depends(deps.get_async_db),
+    barcode: str,
+) -> models.Product:
+    """
+    Get product by barcode.
+    """
+    product = await async_crud.product.get_by_barcode(db, barcode=barcode)
+    if not product:
+        raise HTTPException(status_code=404, detail="Product not found")
+    return product
+
+@router.get("/{id:int}", response_model=Product)
+async def read_product(
+    *,
+    request: Request,
+    response: Response,
+    db: AsyncSession = Depends(deps.get_async_db),
+    id: int,
+) -> models.Product:
+    """
+    Get product by ID.
+    """
+    await deps.check_page_not_modified_async(
+        request, response, db, select(models.Product).where(models.Product.id == id),
+        models.Product,
+        depends_on=(crud.category.version(), crud.supplier.version()),
+        changed=(models.Product.stock_levels_changed_at,),
+    )
+    product = await async_crud.product.get(db, id=id)
+    if not product:
+        raise HTTPException(status_code=404, detail="Product not found")
+    return product
@@ -1,12 +1,16 @@
 from typing import List, Optional
 from datetime import datetime, date
-from fastapi import APIRouter, Depends, HTTPException, Query
+from fastapi import APIRouter, Depends, HTTPException, Query, Response
 from sqlalchemy.orm import Session, joinedload
 
-from app import crud, models
+from app import crud, models, schemas
 from app.api import deps
+from app.core.metrics import STOCK_OUT_REJECTIONS
+from app.crud.base import Projection, paginate
+from app.schemas.product import ProductInDBBase
 from app.schemas.sale import (
     Sale,
+    SaleInDBBase,
     SaleCreate,
     SaleUpdate,
     Return,
@@ -23,42 +27,67 @@ def create_sale(
     *,
     db: Session = Depends(deps.get_db),
     sale_in: SaleCreate,
-    current_user: models.User = Depends(deps.get_current_user),
+    current_user: schemas.UserPrincipal = Depends(deps.get_current_user),
 ) -> models.Sale:
     """
-    Create new sale.
+    Create new sale. With a location_id the stock is taken from that
+    location, or from another one when it does not have enough.
     """
-    # Check if product exists and has enough stock
-    product = crud.product.get(db, id=sale_in.product_id)
-    if not product:
-        raise HTTPException(status_code=404, detail="Product not found")
-    if product.stock < sale_in.quantity:
+    if not crud.customer.get(db, id=sale_in.customer_id):
+        raise HTTPException(status_code=404, detail="Customer not found")
+    if sale_in.location_id is not None and not crud.location.get(db, id=sale_in.location_id):
+        raise HTTPException(status_code=404, detail="Location not found")
+    # Decrement stock and insert the sale in a single transaction
+    sale = crud.sale.create_with_stock(db, obj_in=sale_in, created_by=current_user.id)
+    if not sale:
+        if not crud.product.get(db, id=sale_in.product_id):
+            raise HTTPException(status_code=404, detail="Product not found")
+        STOCK_OUT_REJECTIONS.labels("sale").inc()
         raise HTTPException(status_code=400, detail="Not enough stock")
-
-    # Create sale
-    sale = crud.sale.create_with_total(db, obj_in=sale_in, created_by=current_user.id)
-
-    # Update product stock
-    crud.product.update(
-        db,
-        db_obj=product,
-        obj_in={"stock": product.stock - sale_in.quantity},
-    )
-
+    crud.product.with_references(db, [sale.product])
     return sale
 
+@router.post("/sales/batch", response_model=List[Sale])
+def create_sales_batch(
+    *,
+    db: Session = Depends(deps.get_db),
+    sales_in: List[SaleCreate],
+    current_user: schemas.UserPrincipal = Depends(deps.get_current_user),
+) -> List[models.Sale]:
+    """
+    Create several sales at once, e.g. all lines of a checkout.
+    Either every line is recorded or none is.
+    """
+    if not sales_in:
+        raise HTTPException(status_code=400, detail="No sales to create")
+    sales, errors = crud.sale.create_batch(db, obj_in=sales_in, created_by=current_user.id)
+    if errors:
+        if any(error["detail"] == "Not enough stock" for error in errors):
+            STOCK_OUT_REJECTIONS.labels("sale").inc()
+        raise HTTPException(status_code=400, detail=errors)
+    crud.product.with_references(db, [sale.product for sale in sales])
+    return sales
+
 @router.get("/sales", response_model=List[Sale])
 def read_sales(
+    response: Response,
     db: Session = Depends(deps.get_db),
     skip: int = 0,
     limit: int = 100,
+    after: Optional[int] = Depends(deps.get_cursor),
     start_date: Optional[date] = None,
     end_date: Optional[date] = None,
     customer_id: Optional[int] = None,
-    current_user: models.User = Depends(deps.get_current_user),
+    projection: Optional[Projection] = Depends(
+        deps.get_projection(
+            models.Sale, SaleInDBBase, expandable={"product": ProductInDBBase, "customer": Customer}
+        )
+    ),
+    current_user: schemas.UserPrincipal = Depends(deps.get_current_user),
 ) -> List[models.Sale]:
     """
-    Retrieve sales for the current user.
+    Retrieve sales for the current user. `fields` and `expand` return only the
+    listed columns and embedded objects instead of the full sale.
     """
     query = db.query(models.Sale).filter(models.Sale.created_by == current_user.id)
     
@@ -70,14 +99,24 @@ def read_sales(
             models.Sale.created_at <= datetime.combine(end_date, datetime.max.time())
         )
     
-    return query.options(joinedload(models.Sale.product), joinedload(models.Sale.customer)).offset(skip).limit(limit).all()
+    if projection is not None:
+        sales, last_id = paginate(
+            projection.apply(query), models.Sale, skip=skip, limit=limit, after=after
+        )
+        deps.set_next_cursor(response, last_id)
+        return deps.model_response(response, projection.type, sales)
+    query = query.options(joinedload(models.Sale.product), joinedload(models.Sale.customer))
+    sales, last_id = paginate(query, models.Sale, skip=skip, limit=limit, after=after)
+    crud.product.with_references(db, [sale.product for sale in sales])
+    deps.set_next_cursor(response, last_id)
+    return deps.model_response(response, List[Sale], sales)
 
 @router.get("/sales/summary")
 def get_sales_summary(
     db: Session = Depends(deps.get_db),
     start_date: date = Query(...),
     end_date: date = Query(...),
-    current_user: models.User = Depends(deps.get_current_user),
+    current_user: schemas.UserPrincipal = Depends(deps.get_current_user),
 ) -> dict:
     """
     Get sales summary for date range.
@@ -94,7 +133,7 @@ def create_customer(
     *,
     db: Session = Depends(deps.get_db),
     customer_in: CustomerCreate,
-    current_user: models.User = Depends(deps.get_current_user),
+    current_user: schemas.UserPrincipal = Depends(deps.get_current_user),
 ) -> models.Customer:
     """
     Create new customer.
@@ -110,15 +149,19 @@ def create_customer(
 
 @router.get("/customers/", response_model=List[Customer])
 def read_customers(
+    response: Response,
     db: Session = Depends(deps.get_db),
     skip: int = 0,
     limit: int = 100,
-    current_user: models.User = Depends(deps.get_current_user),
+    after: Optional[int] = Depends(deps.get_cursor),
+    current_user: schemas.UserPrincipal = Depends(deps.get_current_user),
 ) -> List[models.Customer]:
     """
     Retrieve customers.
     """
-    return crud.customer.get_multi(db, skip=skip, limit=limit)
+    customers, last_id = crud.customer.get_multi_page(db, skip=skip, limit=limit, after=after)
+    deps.set_next_cursor(response, last_id)
+    return customers
 
 # Return endpoints
 @router.post("/returns/", response_model=Return)
@@ -126,7 +169,7 @@ def create_return(
     *,
     db: Session = Depends(deps.get_db),
     return_in: ReturnCreate,
-    current_user: models.User = Depends(deps.get_current_user),
+    current_user: schemas.UserPrincipal = Depends(deps.get_current_user),
 ) -> models.Return:
     """
     Create new return.
@@ -143,35 +186,44 @@ def create_return(
             detail="Return quantity cannot be greater than sale quantity",
         )
 
-    # Create return
-    return_ = crud.return_.create_with_user(
-        db, obj_in=return_in, created_by=current_user.id
-    )
-
-    # Update product stock
-    product = crud.product.get(db, id=return_in.product_id)
-    crud.product.update(
-        db,
-        db_obj=product,
-        obj_in={"stock": product.stock + return_in.quantity},
+    # Create return and put the quantity back into stock in a single transaction
+    return_ = crud.return_.create_with_stock(
+        db, obj_in=return_in, sale=sale, created_by=current_user.id
     )
+    if not return_:
+        raise HTTPException(status_code=404, detail="Product not found")
 
     return return_
 
 @router.get("/returns/", response_model=List[Return])
 def read_returns(
+    response: Response,
     db: Session = Depends(deps.get_db),
     skip: int = 0,
     limit: int = 100,
+    after: Optional[int] = Depends(deps.get_cursor),
     sale_id: Optional[int] = None,
     product_id: Optional[int] = None,
-    current_user: models.User = Depends(deps.get_current_user),
+    projection: Optional[Projection] = Depends(
+        deps.get_projection(
+            models.Return, Return, expandable={"sale": SaleInDBBase, "product": ProductInDBBase}
+        )
+    ),
+    current_user: schemas.UserPrincipal = Depends(deps.get_current_user),
 ) -> List[models.Return]:
     """
-    Retrieve returns.
+    Retrieve returns. `fields` and `expand` return only the listed columns
+    and embedded objects.
     """
+    query = db.query(models.Return)
     if sale_id:
-        return crud.return_.get_by_sale(db, sale_id=sale_id)
+        query = query.filter(models.Return.sale_id == sale_id)
     if product_id:
-        return crud.return_.get_by_product(db, product_id=product_id)
-    return crud.return_.get_multi(db, skip=skip, limit=limit) 
\ No newline at end of file
+        query = query.filter(models.Return.product_id == product_id)
+    if projection is not None:
+        query = projection.apply(query)
+    returns, last_id = paginate(query, models.Return, skip=skip, limit=limit, after=after)
+    deps.set_next_cursor(response, last_id)
+    return deps.model_response(
+        response, projection.type if projection else List[Return], returns
+    )
\ No newline at end of file
@@ -0,0 +1,79 @@
+from typing import List, Optional
+from datetime import datetime, date
+from fastapi import APIRouter, Depends, Query, Response
+from sqlalchemy import select
+from sqlalchemy.ext.asyncio import AsyncSession
+from sqlalchemy.orm import joinedload
+
+from app import models, schemas
+from app.api import deps
+from app.crud import async_crud
+from app.crud.async_base import paginate_async
+from app.crud.base import Projection
+from app.schemas.customer import Customer
+from app.schemas.product import ProductInDBBase
+from app.schemas.sale import Sale, SaleInDBBase
+
+# Async versions of the sales reads, mounted ahead of the sync router when
+# USE_ASYNC_DB is enabled, with the same projections and reference data
+# cache. Sales are still created through the sync router.
+router = APIRouter()
+
+@router.get("/sales", response_model=List[Sale])
+async def read_sales(
+    response: Response,
+    db: AsyncSession = Depends(deps.get_async_db),
+    skip: int = 0,
+    limit: int = 100,
+    after: Optional[int] = Depends(deps.get_cursor),
+    start_date: Optional[date] = None,
+    end_date: Optional[date] = None,
+    customer_id: Optional[int] = None,
+    projection: Optional[Projection] = Depends(
+        deps.get_projection(
+            models.Sale, SaleInDBBase, expandable={"product": ProductInDBBase, "customer": Customer}
+        )
+    ),
+    current_user: schemas.UserPrincipal = Depends(deps.get_current_user_async),
+) -> List[models.Sale]:
+    """
+    Retrieve sales for the current user. `fields` and `expand` return only the
+    listed columns and embedded objects instead of the full sale.
+    """
+    stmt = select(models.Sale).where(models.Sale.created_by == current_user.id)
+
+    if customer_id:
+        stmt = stmt.where(models.Sale.customer_id == customer_id)
+    if start_date and end_date:
+        stmt = stmt.where(
+            models.Sale.created_at >= datetime.combine(start_date, datetime.min.time()),
+            models.Sale.created_at <= datetime.combine(end_date, datetime.max.time())
+        )
+
+    if projection is not None:
+        sales, last_id = await paginate_async(
+            db, projection.apply(stmt), models.Sale, skip=skip, limit=limit, after=after
+        )
+        deps.set_next_cursor(response, last_id)
+        return deps.model_response(response, projection.type, sales)
+    stmt = stmt.options(joinedload(models.Sale.product), joinedload(models.Sale.customer))
+    sales, last_id = await paginate_async(db, stmt, models.Sale, skip=skip, limit=limit, after=after)
+    await async_crud.product.with_references(db, [sale.product for sale in sales])
+    deps.set_next_cursor(response, last_id)
+    return deps.model_response(response, List[Sale], sales)
+
+@router.get("/sales/summary")
+async def get_sales_summary(
+    db: AsyncSession = Depends(deps.get_async_db),
+    start_date: date = Query(...),
+    end_date: date = Query(...),
+    current_user: schemas.UserPrincipal = Depends(deps.get_current_user_async),
+) -> dict:
+    """
+    Get sales summary for date range.
+    """
+    return await async_crud.sale.get_sales_summary(
+        db,
+        start_date=datetime.combine(start_date, datetime.min.time()),
+        end_date=datetime.combine(end_date, datetime.max.time()),
+    )
@@ -0,0 +1,106 @@
+from typing import Any, AsyncIterator, FrozenSet, Optional
+import asyncio
+
+from fastapi import APIRouter, Depends, HTTPException, Request, WebSocket
+from fastapi.concurrency import run_in_threadpool
+from fastapi.responses import StreamingResponse
+import orjson
+
+from app import schemas
+from app.api import deps
+from app.core.config import settings
+from app.core.stream import TOPICS, stream_broker
+
+router = APIRouter()
+
+def parse_topics(topics: Optional[str]) -> FrozenSet[str]:
+    if not topics:
+        return frozenset(TOPICS)
+    requested = frozenset(topic.strip() for topic in topics.split(",") if topic.strip())
+    unknown = requested - set(TOPICS)
+    if unknown:
+        raise HTTPException(status_code=400, detail=f"Unknown topics: {', '.join(sorted(unknown))}")
+    return requested
+
+def get_topics(topics: Optional[str] = None) -> FrozenSet[str]:
+    return parse_topics(topics)
+
+def sse_message(event: str, data: Any) -> bytes:
+    return b"event: " + event.encode() + b"\ndata: " + orjson.dumps(data) + b"\n\n"
+
+@router.get("")
+async def stream_events(
+    request: Request,
+    topics: FrozenSet[str] = Depends(get_topics),
+    current_user: schemas.UserPrincipal = Depends(deps.get_stream_user),
+) -> StreamingResponse:
+    """
+    Server-Sent Events feed of committed changes: `stock` (new balance after
+    each movement), `sale`, `return`, `product` and `low_stock`. `topics`
+    picks a comma separated subset. A `reset` event means the client fell
+    behind and should re-fetch what it shows.
+    """
+    subscription = stream_broker.subscribe(topics)
+
+    async def events() -> AsyncIterator[bytes]:
+        try:
+            yield b"retry: 3000\n\n"
+            while not await request.is_disconnected():
+                if subscription.overflowed:
+                    yield sse_message("reset", {})
+                    return
+                message = await subscription.get(settings.STREAM_HEARTBEAT_SECONDS)
+                if message is None:
+                    # Keeps proxies from closing an idle connection
+                    yield b": keep-alive\n\n"
+                else:
+                    yield sse_message(message["topic"], message["data"])
+        finally:
+            stream_broker.unsubscribe(subscription)
+
+    return StreamingResponse(
+        events(),
+        media_type="text/event-stream",
+        headers={"Cache-Control": "no-cache", "X-Accel-Buffering": "no"},
+    )
+
+@router.websocket("/ws")
+async def stream_events_ws(
+    websocket: WebSocket, topics: Optional[str] = None, token: Optional[str] = None
+) -> None:
+    """
+    The same feed over a WebSocket, one JSON object `{"topic", "data"}` per
+    message. Authenticates with the `token` query parameter.
+    """
+    try:
+        await run_in_threadpool(deps.get_stream_user, None, token)
+        subscribed = parse_topics(topics)
+    except HTTPException as e:
+        await websocket.close(code=1008, reason=str(e.detail))
+        return
+    await websocket.accept()
+    subscription = stream_broker.subscribe(subscribed)
+
+    async def send() -> None:
+        while not subscription.overflowed:
+            message = await subscription.get(settings.STREAM_HEARTBEAT_SECONDS)
+            if message is not None:
+                await websocket.send_text(orjson.dumps(message).decode())
+        await websocket.send_text('{"topic":"reset","data":{}}')
+
+    async def receive() -> None:
+        # Nothing is expected from the client; this only notices it leaving
+        while (await websocket.receive())["type"] != "websocket.disconnect":
+            pass
+
+    sender = asyncio.create_task(send())
+    receiver = asyncio.create_task(receive())
+    try:
+        done, _ = await asyncio.wait((sender, receiver), return_when=asyncio.FIRST_COMPLETED)
+    finally:
+        stream_broker.unsubscribe(subscription)
+        sender.cancel()
+        receiver.cancel()
+    # The client fell behind, rather than left
+    if sender in done and sender.exception() is None:
+        await websocket.close()
@@ -1,5 +1,5 @@
-from typing import List
-from fastapi import APIRouter, Depends, HTTPException
+from typing import List, Optional
+from fastapi import APIRouter, Depends, HTTPException, Request, Response
 from sqlalchemy.orm import Session
 
 from app import crud, models
@@ -10,15 +10,21 @@ router = APIRouter()
 
 @router.get("", response_model=List[Supplier])
 def read_suppliers(
+    request: Request,
     db: Session = Depends(deps.get_db),
     skip: int = 0,
     limit: int = 100,
-) -> List[models.Supplier]:
+    after: Optional[int] = Depends(deps.get_cursor),
+) -> Response:
     """
-    Retrieve suppliers.
+    Retrieve suppliers, served from the reference data cache.
     """
-    suppliers = crud.supplier.get_multi(db, skip=skip, limit=limit)
-    return suppliers
+    page = crud.supplier.get_multi_page_cached(db, skip=skip, limit=limit, after=after)
+    response = deps.json_response(
+        request, page["items"], etag=page["etag"], last_modified=page["last_modified"]
+    )
+    deps.set_next_cursor(response, page["last_id"])
+    return response
 
 @router.post("", response_model=Supplier)
 def create_supplier(
@@ -53,14 +59,17 @@ def read_supplier(
     *,
     db: Session = Depends(deps.get_db),
     id: int,
-) -> models.Supplier:
+    request: Request,
+) -> Response:
     """
-    Get supplier by ID.
+    Get supplier by ID, served from the reference data cache.
     """
-    supplier = crud.supplier.get(db=db, id=id)
+    supplier = crud.supplier.get_cached(db, id=id)
     if not supplier:
         raise HTTPException(status_code=404, detail="Supplier not found")
-    return supplier
+    return deps.json_response(
+        request, supplier, last_modified=crud.supplier.last_modified_cached(db, id=id)
+    )
 
 @router.delete("/{id}", response_model=Supplier)
 def delete_supplier(
@@ -1,47 +1,36 @@
-from typing import Any, List
-from fastapi import APIRouter, Body, Depends, HTTPException
-from fastapi.encoders import jsonable_encoder
+from typing import Any, List, Optional
+from fastapi import APIRouter, Body, Depends, HTTPException, Response
 from sqlalchemy.orm import Session
+from starlette.concurrency import run_in_threadpool
+from app import crud
 from app.api import deps
-from app.core.security import get_password_hash
-from app.schemas.user import User, UserCreate, UserUpdate
+from app.core.passwords import password_hasher
+from app.crud.base import paginate
+from app.schemas.user import User, UserCreate, UserPrincipal
 from app.models.user import User as UserModel
 
 router = APIRouter()
 
 @router.get("/", response_model=List[User])
 def read_users(
+    response: Response,
     db: Session = Depends(deps.get_db),
     skip: int = 0,
     limit: int = 100,
-    current_user: UserModel = Depends(deps.get_current_active_superuser),
+    after: Optional[int] = Depends(deps.get_cursor),
+    current_user: UserPrincipal = Depends(deps.get_current_active_superuser),
 ) -> Any:
     """
     Retrieve users.
     """
-    users = db.query(UserModel).offset(skip).limit(limit).all()
+    users, last_id = paginate(db.query(UserModel), UserModel, skip=skip, limit=limit, after=after)
+    deps.set_next_cursor(response, last_id)
     return users
 
-@router.post("/", response_model=User)
-def create_user(
-    *,
-    db: Session = Depends(deps.get_db),
-    user_in: UserCreate,
-    current_user: UserModel = Depends(deps.get_current_active_superuser),
-) -> Any:
-    """
-    Create new user.
-    """
-    user = db.query(UserModel).filter(UserModel.email == user_in.email).first()
-    if user:
-        raise HTTPException(
-            status_code=400,
-            detail="The user with this username already exists in the system.",
-        )
-    
+def _add_user(db: Session, *, user_in: UserCreate, hashed_password: str) -> UserModel:
     user = UserModel(
         email=user_in.email,
-        hashed_password=get_password_hash(user_in.password),
+        hashed_password=hashed_password,
         full_name=user_in.full_name,
         is_superuser=False,
     )
@@ -50,8 +39,33 @@ def create_user(
     db.refresh(user)
     return user
 
+async def _register(db: Session, user_in: UserCreate) -> UserModel:
+    # Async so that waiting for the password hasher holds no threadpool
+    # thread; the queries run on the threadpool
+    if await run_in_threadpool(crud.user.get_by_email, db, email=user_in.email):
+        raise HTTPException(
+            status_code=400,
+            detail="The user with this username already exists in the system.",
+        )
+    hashed_password = await password_hasher.hash(user_in.password)
+    return await run_in_threadpool(
+        _add_user, db, user_in=user_in, hashed_password=hashed_password
+    )
+
+@router.post("/", response_model=User)
+async def create_user(
+    *,
+    db: Session = Depends(deps.get_db),
+    user_in: UserCreate,
+    current_user: UserPrincipal = Depends(deps.get_current_active_superuser),
+) -> Any:
+    """
+    Create new user.
+    """
+    return await _register(db, user_in)
+
 @router.post("/register", response_model=User)
-def register_user(
+async def register_user(
     *,
     db: Session = Depends(deps.get_db),
     user_in: UserCreate,
@@ -59,77 +73,52 @@ def register_user(
     """
     Register a new user.
     """
-    user = db.query(UserModel).filter(UserModel.email == user_in.email).first()
-    if user:
-        raise HTTPException(
-            status_code=400,
-            detail="The user with this username already exists in the system.",
-        )
-    
-    user = UserModel(
-        email=user_in.email,
-        hashed_password=get_password_hash(user_in.password),
-        full_name=user_in.full_name,
-        is_superuser=False,
-    )
-    db.add(user)
-    db.commit()
-    db.refresh(user)
-    return user
+    return await _register(db, user_in)
 
 @router.put("/me", response_model=User)
-def update_user_me(
+async def update_user_me(
     *,
     db: Session = Depends(deps.get_db),
     password: str = Body(None),
     full_name: str = Body(None),
     email: str = Body(None),
-    current_user: UserModel = Depends(deps.get_current_active_user),
+    current_user: UserPrincipal = Depends(deps.get_current_active_user),
 ) -> Any:
     """
     Update own user.
     """
-    current_user_data = jsonable_encoder(current_user)
-    user_in = UserUpdate(**current_user_data)
-    if password is not None:
-        user_in.password = password
-    if full_name is not None:
-        user_in.full_name = full_name
-    if email is not None:
-        user_in.email = email
-    
-    user = current_user
+    user_in = {}
     if password is not None:
-        user.hashed_password = get_password_hash(password)
+        user_in["hashed_password"] = await password_hasher.hash(password)
     if full_name is not None:
-        user.full_name = full_name
+        user_in["full_name"] = full_name
     if email is not None:
-        user.email = email
-    db.add(user)
-    db.commit()
-    db.refresh(user)
-    return user
+        user_in["email"] = email
+
+    user = await run_in_threadpool(crud.user.get, db, id=current_user.id)
+    return await run_in_threadpool(crud.user.update, db, db_obj=user, obj_in=user_in)
 
 @router.get("/me", response_model=User)
 def read_user_me(
-    current_user: UserModel = Depends(deps.get_current_active_user),
+    db: Session = Depends(deps.get_db),
+    current_user: UserPrincipal = Depends(deps.get_current_active_user),
 ) -> Any:
     """
     Get current user.
     """
-    return current_user
+    return crud.user.get(db, id=current_user.id)
 
 @router.get("/{user_id}", response_model=User)
 def read_user_by_id(
     user_id: int,
-    current_user: UserModel = Depends(deps.get_current_active_user),
+    current_user: UserPrincipal = Depends(deps.get_current_active_user),
     db: Session = Depends(deps.get_db),
 ) -> Any:
     """
     Get a specific user by id.
     """
     user = db.query(UserModel).filter(UserModel.id == user_id).first()
-    if user == current_user:
+    if user and user.id == current_user.id:
         return user
     if not current_user.is_superuser:
         raise HTTPException(
@@ -1,21 +1,44 @@
-from typing import Generator, Optional
+from typing import Any, AsyncGenerator, Callable, Dict, Generator, Optional, Tuple, Type
+from datetime import datetime
+import hashlib
 import logging
-from fastapi import Depends, HTTPException, status
+import time
+from fastapi import Depends, HTTPException, Query, Request, Response, status
+from fastapi.responses import ORJSONResponse
 from fastapi.security import OAuth2PasswordBearer
 from jose import jwt, JWTError
-from pydantic import ValidationError
-from sqlalchemy.orm import Session
+from pydantic import BaseModel, ValidationError
+from sqlalchemy.ext.asyncio import AsyncSession
+from sqlalchemy.orm import Query as SQLQuery, Session
+from sqlalchemy.sql import Select
 from app import crud, models, schemas
 from app.core import security
+from app.core.cache import get_cache
 from app.core.config import settings
+from app.core.etag import NotModified, http_date, is_fresh, make_etag, version_etag
+from app.core.pagination import decode_cursor, encode_cursor
+from app.core.serialization import dump_json
+from app.crud import async_crud
+from app.crud.async_base import page_version_async
+from app.crud.base import Projection, page_version
+from app.db.async_session import AsyncSessionLocal, get_async_engine
 from app.db.session import SessionLocal
 
-logging.basicConfig(level=logging.DEBUG)
 logger = logging.getLogger(__name__)
 
 reusable_oauth2 = OAuth2PasswordBearer(
     tokenUrl=f"{settings.API_V1_STR}/login/access-token"
 )
+optional_oauth2 = OAuth2PasswordBearer(
+    tokenUrl=f"{settings.API_V1_STR}/login/access-token", auto_error=False
+)
+
+# Decoded tokens, keyed by a hash of the token so raw tokens never leave the process
+token_cache = get_cache(
+    "auth:token",
+    ttl=settings.AUTH_CACHE_TTL_SECONDS,
+    max_size=settings.AUTH_CACHE_MAX_SIZE,
+)
 
 def get_db() -> Generator:
     try:
@@ -24,43 +47,242 @@ def get_db() -> Generator:
     finally:
         db.close()
 
-def get_current_user(
-    db: Session = Depends(get_db),
-    token: str = Depends(reusable_oauth2)
-) -> models.User:
+async def get_async_db() -> AsyncGenerator:
+    get_async_engine()
+    async with AsyncSessionLocal() as db:
+        yield db
+
+def get_cursor(after: Optional[str] = None) -> Optional[int]:
+    """
+    Decode the opaque `after` cursor of list endpoints into the last seen id.
+    """
+    if after is None:
+        return None
+    try:
+        return decode_cursor(after)
+    except ValueError:
+        raise HTTPException(status_code=400, detail="Invalid cursor")
+
+def set_next_cursor(response: Response, last_id: Optional[int]) -> None:
+    """
+    Expose the cursor of the next page in the X-Next-Cursor header.
+    """
+    if last_id is not None:
+        response.headers["X-Next-Cursor"] = encode_cursor(last_id)
+
+def json_response(
+    request: Request, payload: Any, *, etag: Optional[str] = None, last_modified: Optional[str] = None
+) -> Response:
+    """
+    Respond with an already JSON-ready payload, skipping response_model
+    serialization, or with 304 Not Modified when the client's copy is current.
+    """
+    headers = {"ETag": etag or make_etag(payload)}
+    if last_modified:
+        headers["Last-Modified"] = last_modified
+    if is_fresh(request.headers, etag=headers["ETag"], last_modified=last_modified):
+        return Response(status_code=304, headers=headers)
+    return ORJSONResponse(payload, headers=headers)
+
+def check_not_modified(
+    request: Request, response: Response, *, version: str, last_modified: Optional[datetime] = None
+) -> None:
+    """
+    Set ETag (from `version`) and Last-Modified on the response, or raise
+    NotModified when they match the request, before the data is loaded.
+    """
+    headers = {"ETag": version_etag(version)}
+    if last_modified is not None:
+        headers["Last-Modified"] = http_date(last_modified)
+    if is_fresh(request.headers, etag=headers["ETag"], last_modified=headers.get("Last-Modified")):
+        raise NotModified(headers)
+    response.headers.update(headers)
+
+def check_page_not_modified(
+    request: Request,
+    response: Response,
+    query: SQLQuery,
+    model: Any,
+    *,
+    skip: int = 0,
+    limit: int = 1,
+    after: Optional[int] = None,
+    depends_on: Tuple[str, ...] = (),
+    changed: Tuple[Any, ...] = (),
+) -> None:
+    """
+    `check_not_modified` for a page of `query` as returned by `paginate`,
+    versioned by `page_version`. `depends_on` adds the versions of other data
+    embedded in the response, and `changed` the timestamps of related rows.
+    Empty pages are left alone so that a missing object still gets its 404.
+    """
+    version, last_modified = page_version(
+        query, model, skip=skip, limit=limit, after=after, changed=changed
+    )
+    if last_modified is not None:
+        check_not_modified(
+            request, response, version=":".join((version, *depends_on)), last_modified=last_modified
+        )
+
+async def check_page_not_modified_async(
+    request: Request,
+    response: Response,
+    db: AsyncSession,
+    stmt: Select,
+    model: Any,
+    *,
+    skip: int = 0,
+    limit: int = 1,
+    after: Optional[int] = None,
+    depends_on: Tuple[str, ...] = (),
+    changed: Tuple[Any, ...] = (),
+) -> None:
+    """
+    `check_page_not_modified` for a `select()` run on an AsyncSession.
+    """
+    version, last_modified = await page_version_async(
+        db, stmt, model, skip=skip, limit=limit, after=after, changed=changed
+    )
+    if last_modified is not None:
+        check_not_modified(
+            request, response, version=":".join((version, *depends_on)), last_modified=last_modified
+        )
+
+def get_projection(
+    model: Any, schema: Type[BaseModel], *, expandable: Optional[Dict[str, Type[BaseModel]]] = None
+) -> Callable[..., Optional[Projection]]:
+    """
+    Dependency for the `fields` and `expand` query parameters of a list
+    endpoint whose slim item schema is `schema`. `expandable` maps the
+    relationships that can be embedded to their schema. Resolves to None when
+    neither parameter is given, i.e. the endpoint's full response.
+    """
+    expandable = expandable or {}
+
+    def dependency(
+        fields: Optional[str] = Query(
+            None, description=f"Comma-separated subset of: {', '.join(schema.model_fields)}"
+        ),
+        expand: Optional[str] = Query(
+            None, description=f"Comma-separated subset of: {', '.join(expandable) or 'none'}"
+        ),
+    ) -> Optional[Projection]:
+        if fields is None and expand is None:
+            return None
+        names = [name.strip() for name in (fields or "").split(",") if name.strip()]
+        relations = [name.strip() for name in (expand or "").split(",") if name.strip()]
+        unknown = [name for name in names if name not in schema.model_fields]
+        unknown += [name for name in relations if name not in expandable]
+        if unknown:
+            raise HTTPException(status_code=400, detail=f"Unknown fields: {', '.join(unknown)}")
+        return Projection(
+            model,
+            schema,
+            fields=names or schema.model_fields,
+            expand={name: expandable[name] for name in relations},
+        )
+
+    return dependency
+
+def model_response(response: Response, tp: Any, content: Any) -> Response:
+    """
+    Serialize `content` as `tp` straight to JSON bytes, instead of FastAPI's
+    response_model validation and encoding, keeping the headers (cursor,
+    ETag) already set on the endpoint's `response`.
+    """
+    return Response(
+        content=dump_json(tp, content),
+        media_type="application/json",
+        headers=dict(response.headers),
+    )
+
+def decode_token(token: str) -> int:
+    """
+    Return the user id of a valid access token, skipping jwt.decode for tokens
+    seen within AUTH_CACHE_TTL_SECONDS.
+    """
+    key = hashlib.sha256(token.encode()).hexdigest()
+    cached = token_cache.get(key)
+    if cached is not None and cached["exp"] > time.time():
+        return cached["sub"]
     try:
-        logger.debug(f"Attempting to decode token: {token[:20]}...")
         payload = jwt.decode(
             token, settings.SECRET_KEY, algorithms=[settings.ALGORITHM]
         )
-        logger.debug(f"Token payload: {payload}")
         token_data = schemas.TokenPayload(**payload)
-        logger.debug(f"Token data: {token_data}")
     except (JWTError, ValidationError) as e:
-        logger.error(f"Token validation error: {str(e)}")
+        logger.warning("Token validation error: %s", e)
         raise HTTPException(
             status_code=status.HTTP_403_FORBIDDEN,
             detail=f"Could not validate credentials: {str(e)}",
         )
-    
-    logger.debug(f"Looking up user with id: {token_data.sub}")
-    user = crud.user.get(db, id=int(token_data.sub))
+    if token_data.sub is None:
+        raise HTTPException(
+            status_code=status.HTTP_403_FORBIDDEN,
+            detail="Could not validate credentials",
+        )
+    exp = payload.get("exp", time.time() + settings.AUTH_CACHE_TTL_SECONDS)
+    token_cache.set(
+        key,
+        {"sub": token_data.sub, "exp": exp},
+        ttl=min(settings.AUTH_CACHE_TTL_SECONDS, exp - time.time()),
+    )
+    return token_data.sub
+
+def get_user_for_token(db: Session, token: str) -> schemas.UserPrincipal:
+    user_id = decode_token(token)
+    user = crud.user.get_principal(db, id=user_id)
+    if not user:
+        logger.warning("User not found with id: %s", user_id)
+        raise HTTPException(status_code=404, detail="User not found")
+    return user
+
+def get_current_user(
+    db: Session = Depends(get_db),
+    token: str = Depends(reusable_oauth2)
+) -> schemas.UserPrincipal:
+    return get_user_for_token(db, token)
+
+def get_stream_user(
+    header_token: Optional[str] = Depends(optional_oauth2),
+    token: Optional[str] = None,
+) -> schemas.UserPrincipal:
+    """
+    Authenticate a long-lived connection from the Authorization header or,
+    for clients that cannot set headers (EventSource, browser WebSockets),
+    the `token` query parameter. The session is closed before the stream
+    starts instead of being held for its whole life.
+    """
+    token = header_token or token
+    if not token:
+        raise HTTPException(status_code=401, detail="Not authenticated")
+    db = SessionLocal()
+    try:
+        return get_user_for_token(db, token)
+    finally:
+        db.close()
+
+async def get_current_user_async(
+    db: AsyncSession = Depends(get_async_db),
+    token: str = Depends(reusable_oauth2)
+) -> schemas.UserPrincipal:
+    user_id = decode_token(token)
+    user = await async_crud.user.get_principal(db, id=user_id)
     if not user:
-        logger.error(f"User not found with id: {token_data.sub}")
+        logger.warning("User not found with id: %s", user_id)
         raise HTTPException(status_code=404, detail="User not found")
-    logger.debug(f"Found user: {user.email}")
     return user
 
 def get_current_active_user(
-    current_user: models.User = Depends(get_current_user),
-) -> models.User:
+    current_user: schemas.UserPrincipal = Depends(get_current_user),
+) -> schemas.UserPrincipal:
     if not crud.user.is_active(current_user):
         raise HTTPException(status_code=400, detail="Inactive user")
     return current_user
 
 def get_current_active_superuser(
-    current_user: models.User = Depends(get_current_user),
-) -> models.User:
+    current_user: schemas.UserPrincipal = Depends(get_current_user),
+) -> schemas.UserPrincipal:
     if not crud.user.is_superuser(current_user):
         raise HTTPException(
             status_code=400, detail="The user doesn't have enough privileges"
@@ -0,0 +1,75 @@
+"""
+Prepare the database for the app: apply the alembic migrations, create any
+table they do not cover, seed the admin user, categories and suppliers, and
+rebuild the low stock set.
+
+Run once per deploy before starting the workers (start.sh does), so that the
+workers can boot with FAST_BOOT=true and skip all database work:
+
+    python -m app.bootstrap
+
+Every step is idempotent, and concurrent runs on PostgreSQL wait for each
+other on an advisory lock. The migrations are written for PostgreSQL; on other
+databases only the tables are created.
+"""
+from pathlib import Path
+import logging
+import time
+
+from alembic import command
+from alembic.config import Config
+from sqlalchemy import text
+
+from app import crud
+from app.db import base  # noqa: F401
+from app.db.init_db import init_db
+from app.db.session import SessionLocal, engine
+from app.initial_data import init_db as init_initial_data
+
+logger = logging.getLogger(__name__)
+
+BACKEND_DIR = Path(__file__).resolve().parent.parent
+# Arbitrary key shared by every bootstrap run
+ADVISORY_LOCK_ID = 720_190
+
+def migrate() -> None:
+    config = Config(str(BACKEND_DIR / "alembic.ini"))
+    config.set_main_option("script_location", str(BACKEND_DIR / "alembic"))
+    command.upgrade(config, "head")
+
+def _bootstrap(*, migrate_schema: bool) -> None:
+    if migrate_schema:
+        migrate()
+    db = SessionLocal()
+    try:
+        init_db(db)
+        init_initial_data(db)
+        # Catches up with stock changed outside the app, e.g. by hand in SQL
+        crud.low_stock.sync(db)
+        db.commit()
+    finally:
+        db.close()
+
+def bootstrap(*, migrate_schema: bool = True) -> None:
+    """
+    Run every step, one process at a time on PostgreSQL. Workers started
+    without FAST_BOOT call this with `migrate_schema=False`.
+    """
+    started = time.monotonic()
+    if engine.dialect.name == "postgresql":
+        with engine.connect() as lock:
+            lock.execute(text("SELECT pg_advisory_lock(:id)"), {"id": ADVISORY_LOCK_ID})
+            try:
+                _bootstrap(migrate_schema=migrate_schema)
+            finally:
+                lock.execute(text("SELECT pg_advisory_unlock(:id)"), {"id": ADVISORY_LOCK_ID})
+    else:
+        _bootstrap(migrate_schema=False)
+    logger.info("Bootstrap finished in %.2fs", time.monotonic() - started)
+
+def main() -> None:
+    logging.basicConfig(level=logging.INFO)
+    bootstrap()
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,145 @@
+import json
+import logging
+import threading
+import time
+from collections import OrderedDict
+from typing import Any, Dict, Iterable, Optional, Tuple, Union
+
+from app.core.config import settings
+
+try:
+    import redis
+except ImportError:  # redis is only needed when CACHE_BACKEND=redis
+    redis = None
+
+logger = logging.getLogger(__name__)
+
+class MemoryCache:
+    """
+    Thread-safe in-process LRU cache whose entries expire after `ttl` seconds.
+    """
+
+    def __init__(self, namespace: str, *, ttl: float, max_size: int = 10000):
+        self.namespace = namespace
+        self.ttl = ttl
+        self.max_size = max_size
+        self._data: "OrderedDict[str, Tuple[float, Any]]" = OrderedDict()
+        self._lock = threading.Lock()
+
+    def get(self, key: str) -> Optional[Any]:
+        with self._lock:
+            item = self._data.get(key)
+            if item is None:
+                return None
+            expires_at, value = item
+            if expires_at <= time.monotonic():
+                del self._data[key]
+                return None
+            self._data.move_to_end(key)
+            return value
+
+    def get_many(self, keys: Iterable[str]) -> Dict[str, Any]:
+        found = {}
+        for key in keys:
+            value = self.get(key)
+            if value is not None:
+                found[key] = value
+        return found
+
+    def set(self, key: str, value: Any, ttl: Optional[float] = None) -> None:
+        expires_at = time.monotonic() + (self.ttl if ttl is None else ttl)
+        with self._lock:
+            self._data[key] = (expires_at, value)
+            self._data.move_to_end(key)
+            while len(self._data) > self.max_size:
+                self._data.popitem(last=False)
+
+    def delete(self, key: str) -> None:
+        with self._lock:
+            self._data.pop(key, None)
+
+    def clear(self) -> None:
+        with self._lock:
+            self._data.clear()
+
+class RedisCache:
+    """
+    Cache shared by every worker, storing JSON-encoded values in Redis.
+
+    Redis errors are logged and treated as cache misses so that an unavailable
+    Redis only costs performance.
+    """
+
+    def __init__(self, namespace: str, *, ttl: float, client: Any):
+        self.namespace = namespace
+        self.ttl = ttl
+        self.client = client
+
+    def _key(self, key: str) -> str:
+        return f"{self.namespace}:{key}"
+
+    def get(self, key: str) -> Optional[Any]:
+        try:
+            raw = self.client.get(self._key(key))
+        except redis.RedisError as e:
+            logger.warning("Redis cache get failed: %s", e)
+            return None
+        return None if raw is None else json.loads(raw)
+
+    def get_many(self, keys: Iterable[str]) -> Dict[str, Any]:
+        keys = list(keys)
+        if not keys:
+            return {}
+        try:
+            raws = self.client.mget([self._key(key) for key in keys])
+        except redis.RedisError as e:
+            logger.warning("Redis cache get failed: %s", e)
+            return {}
+        return {key: json.loads(raw) for key, raw in zip(keys, raws) if raw is not None}
+
+    def set(self, key: str, value: Any, ttl: Optional[float] = None) -> None:
+        ttl_ms = max(1, int((self.ttl if ttl is None else ttl) * 1000))
+        try:
+            self.client.set(self._key(key), json.dumps(value), px=ttl_ms)
+        except redis.RedisError as e:
+            logger.warning("Redis cache set failed: %s", e)
+
+    def delete(self, key: str) -> None:
+        try:
+            self.client.delete(self._key(key))
+        except redis.RedisError as e:
+            logger.warning("Redis cache delete failed: %s", e)
+
+    def clear(self) -> None:
+        try:
+            keys = list(self.client.scan_iter(match=self._key("*"), count=500))
+            if keys:
+                self.client.delete(*keys)
+        except redis.RedisError as e:
+            logger.warning("Redis cache clear failed: %s", e)
+
+Cache = Union[MemoryCache, RedisCache]
+
+_redis_client = None
+
+def get_redis() -> Any:
+    global _redis_client
+    if redis is None:
+        raise RuntimeError("The redis package is required for the redis backends")
+    if _redis_client is None:
+        _redis_client = redis.Redis(
+            host=settings.REDIS_HOST,
+            port=settings.REDIS_PORT,
+            socket_timeout=settings.REDIS_SOCKET_TIMEOUT,
+        )
+    return _redis_client
+
+def get_cache(namespace: str, *, ttl: float, max_size: int = 10000) -> Cache:
+    """
+    Return a cache for `namespace` using the backend selected by CACHE_BACKEND.
+
+    Values must be JSON serializable so that both backends behave the same.
+    """
+    if settings.CACHE_BACKEND == "redis":
+        return RedisCache(namespace, ttl=ttl, client=get_redis())
+    return MemoryCache(namespace, ttl=ttl, max_size=max_size)
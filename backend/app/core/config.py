@@ -43,12 +43,82 @@ class Settings(BaseSettings):
             return v
         return f"postgresql://{values.get('POSTGRES_USER')}:{values.get('POSTGRES_PASSWORD')}@{values.get('POSTGRES_SERVER')}:5432/{values.get('POSTGRES_DB')}"  # 添加端口号
 
+    # Connection pool settings, sized per worker process
+    DB_POOL_SIZE: int = 5
+    DB_MAX_OVERFLOW: int = 10
+    DB_POOL_TIMEOUT: int = 30  # seconds to wait for a free connection
+    DB_POOL_RECYCLE: int = -1  # seconds before a connection is replaced, -1 disables
+    DB_POOL_PRE_PING: bool = True  # test connections on checkout
+    DB_STATEMENT_TIMEOUT_MS: int = 0  # PostgreSQL statement_timeout, 0 disables
+    DB_EXECUTEMANY_MODE: str = "values_plus_batch"  # psycopg2 only
+
+    # Serve the hot product/sales/inventory reads from async endpoints (asyncpg)
+    USE_ASYNC_DB: bool = False
+
     # JWT settings
     ALGORITHM: str = "HS256"
 
     # Redis settings
     REDIS_HOST: str = "localhost"
     REDIS_PORT: int = 6379
+    REDIS_SOCKET_TIMEOUT: float = 0.5
+
+    # Sales rollups: how often (0 = never) and how many appended deltas are folded into the buckets
+    ANALYTICS_FOLD_SECONDS: float = 5
+    ANALYTICS_FOLD_BATCH_SIZE: int = 10000
+
+    # Cache settings
+    CACHE_BACKEND: str = "memory"  # "memory" (per worker) or "redis" (shared)
+    AUTH_CACHE_TTL_SECONDS: int = 60
+    AUTH_CACHE_MAX_SIZE: int = 10000
+    REFERENCE_CACHE_TTL_SECONDS: int = 300  # categories and suppliers
+    REFERENCE_CACHE_MAX_SIZE: int = 10000
+
+    # Conditional GETs: largest JSON body the middleware hashes for an ETag
+    ETAG_MAX_BODY_BYTES: int = 1_000_000
+
+    # Rows fetched per round trip by the /export endpoints
+    EXPORT_BATCH_SIZE: int = 1000
+
+    # Product import: rows per validation/upsert batch, errors kept in the report
+    IMPORT_BATCH_SIZE: int = 5000
+    IMPORT_MAX_ERRORS: int = 1000
+
+    # In-process barcode/SKU index behind POST /products/lookup, warmed at startup
+    PRODUCT_INDEX_ENABLED: bool = True
+    PRODUCT_INDEX_REFRESH_SECONDS: float = 30  # picks up changes made by other workers
+
+    # Skip table creation and seeding at worker startup, done by `python -m app.bootstrap`
+    FAST_BOOT: bool = False
+
+    # Password hashing: bcrypt cost, and the process pool it runs on (0 = in the request thread)
+    BCRYPT_ROUNDS: int = 12
+    PASSWORD_HASH_WORKERS: int = 2
+    PASSWORD_HASH_CONCURRENCY: int = 4  # queued or running; more waits, then gets a 503
+    PASSWORD_HASH_QUEUE_TIMEOUT: float = 2.0
+
+    # Low stock digests: "log", "smtp" or "none", sent at most every LOW_STOCK_DIGEST_SECONDS
+    LOW_STOCK_NOTIFY_SINK: str = "log"
+    LOW_STOCK_DIGEST_SECONDS: float = 300
+    LOW_STOCK_NOTIFY_FROM: str = "inventory@example.com"
+    LOW_STOCK_NOTIFY_TO: str = "admin@example.com"  # comma separated
+    SMTP_HOST: str = "localhost"
+    SMTP_PORT: int = 25
+
+    # Change stream (/stream): "memory" (per worker) or "redis" (pub/sub shared by all workers)
+    STREAM_BACKEND: str = "memory"
+    STREAM_REDIS_CHANNEL: str = "inventory:stream"
+    STREAM_QUEUE_SIZE: int = 1000  # messages a client may fall behind before a reset
+    STREAM_HEARTBEAT_SECONDS: float = 15
+
+    # Per-request SQL statement counts and timings; X-DB-* response headers are for debugging only
+    QUERY_STATS_ENABLED: bool = True
+    QUERY_STATS_HEADERS: bool = False
+    QUERY_STATS_REPEAT_THRESHOLD: int = 10  # runs of one statement in a request that log an N+1 warning
+    QUERY_STATS_SLOW_MS: float = 500
+
+    # Prometheus /metrics; set PROMETHEUS_MULTIPROC_DIR when running several workers
+    METRICS_ENABLED: bool = True
 
     class Config:
         case_sensitive = True
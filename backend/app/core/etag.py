@@ -0,0 +1,68 @@
+import hashlib
+from datetime import datetime, timezone
+from email.utils import format_datetime, parsedate_to_datetime
+from typing import Any, Dict, Mapping, Optional
+
+import orjson
+from fastapi import HTTPException
+
+class NotModified(HTTPException):
+    """
+    Raised by an endpoint when the client's cached copy is current, so that a
+    304 is sent before the response is loaded or serialized.
+    """
+
+    def __init__(self, headers: Dict[str, str]):
+        super().__init__(status_code=304, headers=headers)
+
+def make_etag(payload: Any) -> str:
+    """
+    Strong ETag for a JSON-serializable response payload.
+    """
+    return body_etag(orjson.dumps(payload, option=orjson.OPT_SORT_KEYS))
+
+def body_etag(body: bytes) -> str:
+    """
+    Strong ETag for an already rendered response body.
+    """
+    return '"' + hashlib.sha1(body).hexdigest() + '"'
+
+def version_etag(version: str) -> str:
+    """
+    Weak ETag for a version string describing the data behind a response.
+    """
+    return 'W/"' + hashlib.sha1(version.encode()).hexdigest() + '"'
+
+def http_date(at: datetime) -> str:
+    at = at.astimezone(timezone.utc) if at.tzinfo else at.replace(tzinfo=timezone.utc)
+    return format_datetime(at.replace(microsecond=0), usegmt=True)
+
+def etag_matches(if_none_match: Optional[str], etag: str) -> bool:
+    """
+    Whether an If-None-Match header value matches `etag`, using the weak
+    comparison that RFC 7232 prescribes for If-None-Match.
+    """
+    if not if_none_match:
+        return False
+    if if_none_match.strip() == "*":
+        return True
+    candidates = (tag.strip() for tag in if_none_match.split(","))
+    return etag.removeprefix("W/") in (tag.removeprefix("W/") for tag in candidates)
+
+def is_fresh(
+    request_headers: Mapping[str, str], *, etag: Optional[str], last_modified: Optional[str]
+) -> bool:
+    """
+    Whether the client's copy, described by If-None-Match or else
+    If-Modified-Since, matches the current ETag / Last-Modified.
+    """
+    if_none_match = request_headers.get("if-none-match")
+    if if_none_match is not None:
+        return etag is not None and etag_matches(if_none_match, etag)
+    if_modified_since = request_headers.get("if-modified-since")
+    if not if_modified_since or not last_modified:
+        return False
+    try:
+        return parsedate_to_datetime(last_modified) <= parsedate_to_datetime(if_modified_since)
+    except (TypeError, ValueError):
+        return False
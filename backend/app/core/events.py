@@ -0,0 +1,61 @@
+"""
+In-process publish/subscribe for domain events.
+
+`publish_after_commit` queues an event on a session; it reaches the topic's
+subscribers only once that session commits, and is dropped on rollback, so
+nobody hears about a sale that never happened. Subscribers run in the
+committing thread and must return quickly (buffer the event, hand it off).
+"""
+from collections import defaultdict
+from typing import Any, Callable, DefaultDict, Dict, List
+import logging
+import threading
+
+from sqlalchemy import event
+from sqlalchemy.orm import Session
+
+logger = logging.getLogger(__name__)
+
+Handler = Callable[[str, Dict[str, Any]], None]
+
+PENDING_EVENTS = "pending_events"
+
+class EventBus:
+    def __init__(self) -> None:
+        self._subscribers: DefaultDict[str, List[Handler]] = defaultdict(list)
+        self._lock = threading.Lock()
+
+    def subscribe(self, topic: str, handler: Handler) -> None:
+        with self._lock:
+            self._subscribers[topic].append(handler)
+
+    def unsubscribe(self, topic: str, handler: Handler) -> None:
+        with self._lock:
+            if handler in self._subscribers[topic]:
+                self._subscribers[topic].remove(handler)
+
+    def publish(self, topic: str, payload: Dict[str, Any]) -> None:
+        with self._lock:
+            handlers = list(self._subscribers[topic])
+        for handler in handlers:
+            try:
+                handler(topic, payload)
+            except Exception:
+                logger.exception("Subscriber of %s failed", topic)
+
+bus = EventBus()
+
+def publish_after_commit(db: Session, topic: str, payload: Dict[str, Any]) -> None:
+    if not db.in_transaction():
+        # Otherwise a rollback before any SQL is a no-op that keeps the event
+        db.begin()
+    db.info.setdefault(PENDING_EVENTS, []).append((topic, payload))
+
+@event.listens_for(Session, "after_commit")
+def _deliver_pending(session: Session) -> None:
+    for topic, payload in session.info.pop(PENDING_EVENTS, []):
+        bus.publish(topic, payload)
+
+@event.listens_for(Session, "after_rollback")
+def _drop_pending(session: Session) -> None:
+    session.info.pop(PENDING_EVENTS, None)
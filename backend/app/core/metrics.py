@@ -0,0 +1,124 @@
+"""
+Prometheus metrics served at /metrics.
+
+Requests are labelled by route template (e.g. /api/v1/products/{id}), never
+by raw URL, so the number of series stays bounded. Under several worker
+processes, set PROMETHEUS_MULTIPROC_DIR to an empty directory before the
+workers start: each worker then writes its samples there and /metrics, served
+by any of them, adds up all workers.
+"""
+from typing import Any, Dict, Optional, Tuple
+import os
+
+from prometheus_client import (
+    CONTENT_TYPE_LATEST, REGISTRY, CollectorRegistry, Counter, Gauge, Histogram,
+    generate_latest, multiprocess,
+)
+from sqlalchemy import event
+from sqlalchemy.engine import Engine
+
+from app.core.events import bus
+
+REQUESTS = Counter(
+    "http_requests_total", "HTTP requests by route and status", ["method", "route", "status"]
+)
+REQUEST_DURATION = Histogram(
+    "http_request_duration_seconds",
+    "Time from receiving a request to sending the last byte of its response",
+    ["method", "route"],
+    buckets=(0.005, 0.01, 0.025, 0.05, 0.1, 0.25, 0.5, 1, 2.5, 5, 10, 30),
+)
+RESPONSE_SIZE = Histogram(
+    "http_response_size_bytes", "Response body sizes", ["method", "route"],
+    buckets=(100, 1_000, 10_000, 100_000, 1_000_000, 10_000_000),
+)
+REQUESTS_IN_PROGRESS = Gauge(
+    "http_requests_in_progress", "Requests being served", multiprocess_mode="livesum"
+)
+
+DB_POOL_SIZE = Gauge(
+    "db_pool_size", "Configured connection pool size", multiprocess_mode="livesum"
+)
+DB_POOL_MAX_OVERFLOW = Gauge(
+    "db_pool_max_overflow", "Connections allowed beyond the pool size", multiprocess_mode="livesum"
+)
+DB_POOL_CHECKED_OUT = Gauge(
+    "db_pool_checked_out", "Connections in use", multiprocess_mode="livesum"
+)
+DB_POOL_WAIT = Histogram(
+    "db_pool_wait_seconds", "Time spent waiting for a free connection, when the pool was exhausted",
+    buckets=(0.001, 0.01, 0.05, 0.1, 0.25, 0.5, 1, 2.5, 5, 10, 30),
+)
+DB_POOL_TIMEOUTS = Counter(
+    "db_pool_timeouts_total", "Checkouts that gave up waiting for a free connection"
+)
+
+SALES_CREATED = Counter("inventory_sales_created_total", "Committed sales")
+UNITS_SOLD = Counter("inventory_units_sold_total", "Units sold by committed sales")
+STOCK_OUT_REJECTIONS = Counter(
+    "inventory_stock_out_rejections_total",
+    "Sales, stock movements and transfers refused for lack of stock",
+    ["operation"],
+)
+
+def route_label(scope: Dict[str, Any]) -> str:
+    route = scope.get("route")
+    return route.path if route is not None else "<unmatched>"
+
+def observe_request(
+    scope: Dict[str, Any], status: int, seconds: float, size: int
+) -> None:
+    method, route = scope["method"], route_label(scope)
+    REQUESTS.labels(method, route, str(status)).inc()
+    REQUEST_DURATION.labels(method, route).observe(seconds)
+    RESPONSE_SIZE.labels(method, route).observe(size)
+
+def _on_sale(topic: str, payload: Dict[str, Any]) -> None:
+    SALES_CREATED.inc()
+    UNITS_SOLD.inc(payload.get("quantity") or 0)
+
+def _on_checkout(dbapi_connection: Any, connection_record: Any, connection_proxy: Any) -> None:
+    DB_POOL_CHECKED_OUT.inc()
+
+def _on_checkin(dbapi_connection: Any, connection_record: Any) -> None:
+    DB_POOL_CHECKED_OUT.dec()
+
+_engine: Optional[Engine] = None
+
+def start(engine: Engine) -> None:
+    """
+    Start counting committed sales and the connections of `engine`.
+    """
+    global _engine
+    if _engine is not None:
+        return
+    _engine = engine
+    bus.subscribe("sale", _on_sale)
+    pool = engine.pool
+    if hasattr(pool, "size") and hasattr(pool, "_max_overflow"):
+        DB_POOL_SIZE.set(pool.size())
+        DB_POOL_MAX_OVERFLOW.set(max(0, pool._max_overflow))
+    event.listen(pool, "checkout", _on_checkout)
+    event.listen(pool, "checkin", _on_checkin)
+
+def stop() -> None:
+    global _engine
+    if _engine is None:
+        return
+    bus.unsubscribe("sale", _on_sale)
+    event.remove(_engine.pool, "checkout", _on_checkout)
+    event.remove(_engine.pool, "checkin", _on_checkin)
+    _engine = None
+    if os.environ.get("PROMETHEUS_MULTIPROC_DIR"):
+        # Drop this worker's live gauges (in flight requests, pool) from the totals
+        multiprocess.mark_process_dead(os.getpid())
+
+def render() -> Tuple[bytes, str]:
+    """
+    All metrics in the Prometheus text format, and its content type.
+    """
+    if os.environ.get("PROMETHEUS_MULTIPROC_DIR"):
+        registry = CollectorRegistry()
+        multiprocess.MultiProcessCollector(registry)
+        return generate_latest(registry), CONTENT_TYPE_LATEST
+    return generate_latest(REGISTRY), CONTENT_TYPE_LATEST
@@ -0,0 +1,152 @@
+"""
+Password hashing and verification off the request threads.
+
+bcrypt is deliberately slow, so every hash/verify runs on a small process
+pool (PASSWORD_HASH_WORKERS processes per app worker) and is awaited from
+async handlers: a login waiting for its turn or its result holds no thread of
+the threadpool that serves the rest of the API. At most
+PASSWORD_HASH_CONCURRENCY operations are queued or running at once; a request
+that cannot get a slot within PASSWORD_HASH_QUEUE_TIMEOUT seconds gets a 503,
+so a burst of logins cannot stall product and sale traffic. With
+PASSWORD_HASH_WORKERS=0 the work runs on the event loop's default thread
+executor, still bounded.
+"""
+from collections import deque
+from concurrent.futures import Executor, ProcessPoolExecutor
+from typing import Any, Callable, Deque, Dict, Optional, Tuple
+import asyncio
+import multiprocessing
+import statistics
+import threading
+import time
+
+from fastapi import HTTPException
+
+from app.core.config import settings
+from app.core.security import pwd_context
+
+class PasswordHashBusy(HTTPException):
+    """
+    Raised when every password hashing slot stays busy for longer than
+    PASSWORD_HASH_QUEUE_TIMEOUT.
+    """
+
+    def __init__(self) -> None:
+        super().__init__(
+            status_code=503,
+            detail="Too many password operations in progress, retry shortly",
+            headers={"Retry-After": "1"},
+        )
+
+def _hash(password: str) -> str:
+    return pwd_context.hash(password)
+
+def _verify_and_update(password: str, hashed_password: str) -> Tuple[bool, Optional[str]]:
+    return pwd_context.verify_and_update(password, hashed_password)
+
+class PasswordHasher:
+    def __init__(self, *, workers: int, concurrency: int, queue_timeout: float):
+        self.workers = workers
+        self.concurrency = concurrency
+        self.queue_timeout = queue_timeout
+        self._slots: Optional[asyncio.Semaphore] = None
+        self._slots_loop: Optional[asyncio.AbstractEventLoop] = None
+        self._executor: Optional[Executor] = None
+        self._executor_lock = threading.Lock()
+        self._stats_lock = threading.Lock()
+        self._latencies: Dict[str, Deque[float]] = {
+            "hash": deque(maxlen=1000), "verify": deque(maxlen=1000)
+        }
+        self._counts: Dict[str, int] = {"hash": 0, "verify": 0, "rehash": 0, "rejected": 0}
+        self._in_flight = 0
+
+    def _get_executor(self) -> Executor:
+        # Created on first use, in the worker process that uses it; spawned
+        # rather than forked because the app process runs threads
+        with self._executor_lock:
+            if self._executor is None:
+                self._executor = ProcessPoolExecutor(
+                    max_workers=self.workers, mp_context=multiprocessing.get_context("spawn")
+                )
+            return self._executor
+
+    def _get_slots(self) -> asyncio.Semaphore:
+        # Bound to the event loop that uses it, which only changes in tests
+        loop = asyncio.get_running_loop()
+        if self._slots is None or self._slots_loop is not loop:
+            self._slots = asyncio.Semaphore(self.concurrency)
+            self._slots_loop = loop
+        return self._slots
+
+    async def _run(self, kind: str, fn: Callable[..., Any], *args: Any) -> Any:
+        slots = self._get_slots()
+        try:
+            await asyncio.wait_for(slots.acquire(), self.queue_timeout)
+        except asyncio.TimeoutError:
+            with self._stats_lock:
+                self._counts["rejected"] += 1
+            raise PasswordHashBusy()
+        started = time.perf_counter()
+        with self._stats_lock:
+            self._in_flight += 1
+        try:
+            executor = self._get_executor() if self.workers else None
+            return await asyncio.get_running_loop().run_in_executor(executor, fn, *args)
+        finally:
+            slots.release()
+            with self._stats_lock:
+                self._in_flight -= 1
+                self._counts[kind] += 1
+                self._latencies[kind].append(time.perf_counter() - started)
+
+    def start(self) -> None:
+        """
+        Start the pool processes in the background, so that the first login
+        does not wait for them.
+        """
+        if self.workers:
+            executor = self._get_executor()
+            for _ in range(self.workers):
+                executor.submit(_hash, "")
+
+    async def hash(self, password: str) -> str:
+        return await self._run("hash", _hash, password)
+
+    async def verify_and_update(
+        self, password: str, hashed_password: str
+    ) -> Tuple[bool, Optional[str]]:
+        """
+        Check a password. The second value is a new hash when the stored one
+        was made with other cost parameters (e.g. a changed BCRYPT_ROUNDS).
+        """
+        verified, new_hash = await self._run(
+            "verify", _verify_and_update, password, hashed_password
+        )
+        if new_hash is not None:
+            with self._stats_lock:
+                self._counts["rehash"] += 1
+        return verified, new_hash
+
+    def stats(self) -> Dict[str, Any]:
+        with self._stats_lock:
+            latencies = {kind: sorted(values) for kind, values in self._latencies.items()}
+            stats: Dict[str, Any] = {**self._counts, "in_flight": self._in_flight}
+        for kind, values in latencies.items():
+            stats[f"{kind}_seconds"] = {
+                "p50": statistics.median(values) if values else None,
+                "p95": values[round(0.95 * (len(values) - 1))] if values else None,
+                "max": values[-1] if values else None,
+            }
+        return stats
+
+    def shutdown(self) -> None:
+        with self._executor_lock:
+            if self._executor is not None:
+                self._executor.shutdown(wait=False, cancel_futures=True)
+                self._executor = None
+
+password_hasher = PasswordHasher(
+    workers=settings.PASSWORD_HASH_WORKERS,
+    concurrency=settings.PASSWORD_HASH_CONCURRENCY,
+    queue_timeout=settings.PASSWORD_HASH_QUEUE_TIMEOUT,
+)
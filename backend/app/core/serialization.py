@@ -0,0 +1,20 @@
+"""
+JSON serialization straight from ORM objects to bytes with pydantic, for hot
+endpoints that skip FastAPI's response_model round trip through Python dicts.
+"""
+from functools import lru_cache
+from typing import Any
+
+from pydantic import TypeAdapter
+
+@lru_cache(maxsize=512)
+def type_adapter(tp: Any) -> TypeAdapter:
+    return TypeAdapter(tp)
+
+def dump_json(tp: Any, content: Any) -> bytes:
+    """
+    Validate `content` (ORM objects are read by attribute) as `tp` and
+    serialize it to JSON.
+    """
+    adapter = type_adapter(tp)
+    return adapter.dump_json(adapter.validate_python(content, from_attributes=True))
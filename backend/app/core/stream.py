@@ -0,0 +1,156 @@
+"""
+Fan-out of change events to the clients of /stream.
+
+Stock, sale, return, product and low stock events published on the
+in-process bus after commit are forwarded to every connected client of this
+worker. With STREAM_BACKEND=redis they go through a Redis pub/sub channel
+instead, so that a client connected to any worker sees the changes committed
+by all of them.
+"""
+from typing import Any, Dict, Iterable, Optional, Set
+import asyncio
+import logging
+import threading
+
+import orjson
+
+from app.core.cache import get_redis
+from app.core.config import settings
+from app.core.events import bus
+
+logger = logging.getLogger(__name__)
+
+TOPICS = ("stock", "sale", "return", "product", "low_stock")
+
+class Subscription:
+    """
+    One connected client: the topics it wants and a bounded queue of
+    messages, filled from any thread and read on the client's event loop.
+    A client that falls STREAM_QUEUE_SIZE messages behind is marked
+    `overflowed` and should reconnect and re-fetch.
+    """
+
+    def __init__(self, topics: Iterable[str], *, max_size: int):
+        self.topics = frozenset(topics)
+        self.loop = asyncio.get_running_loop()
+        self.queue: "asyncio.Queue[Dict[str, Any]]" = asyncio.Queue(max_size)
+        self.overflowed = False
+
+    def _put(self, message: Dict[str, Any]) -> None:
+        if self.overflowed:
+            return
+        try:
+            self.queue.put_nowait(message)
+        except asyncio.QueueFull:
+            # The queue is not empty, so the reader is awake and sees the flag
+            self.overflowed = True
+
+    def put(self, message: Dict[str, Any]) -> None:
+        self.loop.call_soon_threadsafe(self._put, message)
+
+    async def get(self, timeout: float) -> Optional[Dict[str, Any]]:
+        """
+        Next message, or None when nothing arrived within `timeout` seconds.
+        """
+        try:
+            return await asyncio.wait_for(self.queue.get(), timeout)
+        except asyncio.TimeoutError:
+            return None
+
+class StreamBroker:
+    def __init__(self, *, backend: str, channel: str, queue_size: int):
+        self.backend = backend
+        self.channel = channel
+        self.queue_size = queue_size
+        self._subscriptions: Set[Subscription] = set()
+        self._lock = threading.Lock()
+        self._stopped = threading.Event()
+        self._listener: Optional[threading.Thread] = None
+        self._started = False
+
+    def __len__(self) -> int:
+        return len(self._subscriptions)
+
+    def subscribe(self, topics: Iterable[str]) -> Subscription:
+        """
+        Register a client. Must be called from the event loop that reads it.
+        """
+        subscription = Subscription(topics, max_size=self.queue_size)
+        with self._lock:
+            self._subscriptions.add(subscription)
+        return subscription
+
+    def unsubscribe(self, subscription: Subscription) -> None:
+        with self._lock:
+            self._subscriptions.discard(subscription)
+
+    def dispatch(self, message: Dict[str, Any]) -> None:
+        """
+        Hand a message to the local clients subscribed to its topic. Safe to
+        call from any thread.
+        """
+        with self._lock:
+            subscriptions = [
+                subscription for subscription in self._subscriptions
+                if message["topic"] in subscription.topics
+            ]
+        for subscription in subscriptions:
+            try:
+                subscription.put(message)
+            except RuntimeError:
+                # The client's event loop is closed
+                self.unsubscribe(subscription)
+
+    def _on_event(self, topic: str, payload: Dict[str, Any]) -> None:
+        message = {"topic": topic, "data": payload}
+        if self.backend == "redis":
+            get_redis().publish(self.channel, orjson.dumps(message))
+        else:
+            self.dispatch(message)
+
+    def _listen(self) -> None:
+        while not self._stopped.is_set():
+            pubsub = None
+            try:
+                pubsub = get_redis().pubsub(ignore_subscribe_messages=True)
+                pubsub.subscribe(self.channel)
+                while not self._stopped.is_set():
+                    item = pubsub.get_message(timeout=1.0)
+                    if item is not None:
+                        self.dispatch(orjson.loads(item["data"]))
+            except Exception:
+                logger.exception("Stream listener lost its Redis subscription, retrying")
+                self._stopped.wait(1.0)
+            finally:
+                if pubsub is not None:
+                    pubsub.close()
+
+    def start(self) -> None:
+        if self._started:
+            return
+        self._started = True
+        self._stopped.clear()
+        for topic in TOPICS:
+            bus.subscribe(topic, self._on_event)
+        if self.backend == "redis":
+            self._listener = threading.Thread(
+                target=self._listen, name="stream-redis-listener", daemon=True
+            )
+            self._listener.start()
+
+    def stop(self) -> None:
+        if not self._started:
+            return
+        for topic in TOPICS:
+            bus.unsubscribe(topic, self._on_event)
+        self._stopped.set()
+        if self._listener is not None:
+            self._listener.join()
+            self._listener = None
+        self._started = False
+
+stream_broker = StreamBroker(
+    backend=settings.STREAM_BACKEND,
+    channel=settings.STREAM_REDIS_CHANNEL,
+    queue_size=settings.STREAM_QUEUE_SIZE,
+)
@@ -3,5 +3,11 @@ from .crud_product import product
 from .crud_category import category
 from .crud_supplier import supplier
 from .crud_inventory import inventory
-from .crud_sale import sale
-from .crud_customer import customer 
\ No newline at end of file
+from .crud_sale import sale, return_
+from .crud_customer import customer 
+from .crud_analytics import analytics
+
+from .crud_export import export
+
+from .crud_location import location, stock_level
+from .crud_low_stock import low_stock
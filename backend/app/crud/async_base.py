@@ -0,0 +1,79 @@
+from typing import Any, Generic, List, Optional, Tuple, Type
+from datetime import datetime
+
+from sqlalchemy import select
+from sqlalchemy.ext.asyncio import AsyncSession
+from sqlalchemy.sql import Select
+
+from app.crud.base import ModelType, page_fingerprint, page_version_statement
+
+async def paginate_async(
+    db: AsyncSession,
+    stmt: Select,
+    model: Any,
+    *,
+    skip: int = 0,
+    limit: int = 100,
+    after: Optional[int] = None,
+) -> Tuple[List[Any], Optional[int]]:
+    """
+    Async counterpart of `app.crud.base.paginate` for `select()` statements.
+    """
+    if after is not None:
+        stmt = stmt.where(model.id > after)
+    if skip:
+        stmt = stmt.offset(skip)
+    result = await db.execute(stmt.order_by(model.id).limit(limit + 1))
+    rows = result.scalars().all()
+    if len(rows) > limit > 0:
+        return rows[:limit], rows[limit - 1].id
+    return rows[:limit], None
+
+async def page_version_async(
+    db: AsyncSession,
+    stmt: Select,
+    model: Any,
+    *,
+    skip: int = 0,
+    limit: int = 100,
+    after: Optional[int] = None,
+    changed: Tuple[Any, ...] = (),
+) -> Tuple[str, Optional[datetime]]:
+    """
+    Async counterpart of `app.crud.base.page_version` for `select()` statements.
+    """
+    result = await db.execute(page_version_statement(
+        stmt, model, skip=skip, limit=limit, after=after, changed=changed
+    ))
+    return page_fingerprint(result.one(), model, skip=skip, limit=limit, after=after)
+
+class AsyncCRUDReadBase(Generic[ModelType]):
+    def __init__(self, model: Type[ModelType]):
+        """
+        CRUD object with the default read methods over an AsyncSession.
+        Only reads have an async path: every write goes through the sync
+        CRUD objects, whose ledger and locking they rely on.
+        Relationships are never lazy loaded with asyncio, so subclasses that
+        return nested schemas override `select` to add eager loading options.
+        **Parameters**
+        * `model`: A SQLAlchemy model class
+        """
+        self.model = model
+
+    def select(self) -> Select:
+        return select(self.model)
+
+    async def get(self, db: AsyncSession, id: Any) -> Optional[ModelType]:
+        result = await db.execute(self.select().where(self.model.id == id))
+        return result.scalars().first()
+
+    async def get_multi(
+        self, db: AsyncSession, *, skip: int = 0, limit: int = 100
+    ) -> List[ModelType]:
+        result = await db.execute(self.select().offset(skip).limit(limit))
+        return result.scalars().all()
+
+    async def get_multi_page(
+        self, db: AsyncSession, *, skip: int = 0, limit: int = 100, after: Optional[int] = None
+    ) -> Tuple[List[ModelType], Optional[int]]:
+        return await paginate_async(db, self.select(), self.model, skip=skip, limit=limit, after=after)
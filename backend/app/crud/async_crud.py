@@ -0,0 +1,115 @@
+from typing import Any, Iterable, List, Optional, Tuple
+from datetime import datetime
+
+from sqlalchemy import func, select
+from sqlalchemy.ext.asyncio import AsyncSession
+from sqlalchemy.orm import joinedload
+from sqlalchemy.sql import Select
+
+from app.crud.async_base import AsyncCRUDReadBase
+from app.crud.crud_product import product as crud_product
+from app.crud.crud_user import principal_cache
+from app.models.inventory import InventoryTransaction
+from app.models.product import Product
+from app.models.sale import Sale
+from app.models.user import User
+from app.schemas.user import UserPrincipal
+
+class AsyncCRUDProduct(AsyncCRUDReadBase[Product]):
+    async def with_references(
+        self,
+        db: AsyncSession,
+        products: List[Product],
+        references: Iterable[str] = ("category", "supplier"),
+    ) -> List[Product]:
+        """
+        Same as `crud.product.with_references`: the category and supplier come
+        from the reference data cache, primed into the session so that reading
+        them is not a lazy load.
+        """
+        return await db.run_sync(crud_product.with_references, products, references)
+
+    async def _first(self, db: AsyncSession, stmt: Select) -> Optional[Product]:
+        result = await db.execute(stmt)
+        product = result.scalars().first()
+        if product is not None:
+            await self.with_references(db, [product])
+        return product
+
+    async def get(self, db: AsyncSession, id: Any) -> Optional[Product]:
+        return await self._first(db, self.select().where(Product.id == id))
+
+    async def get_multi(
+        self, db: AsyncSession, *, skip: int = 0, limit: int = 100
+    ) -> List[Product]:
+        return await self.with_references(db, await super().get_multi(db, skip=skip, limit=limit))
+
+    async def get_multi_page(
+        self, db: AsyncSession, *, skip: int = 0, limit: int = 100, after: Optional[int] = None
+    ) -> Tuple[List[Product], Optional[int]]:
+        products, last_id = await super().get_multi_page(db, skip=skip, limit=limit, after=after)
+        return await self.with_references(db, products), last_id
+
+    async def get_by_sku(self, db: AsyncSession, *, sku: str) -> Optional[Product]:
+        return await self._first(db, self.select().where(Product.sku == sku))
+
+    async def get_by_barcode(self, db: AsyncSession, *, barcode: str) -> Optional[Product]:
+        return await self._first(db, self.select().where(Product.barcode == barcode))
+
+class AsyncCRUDSale(AsyncCRUDReadBase[Sale]):
+    def select(self) -> Select:
+        # schemas.Sale nests the full Product; its category and supplier are
+        # primed with `product.with_references`
+        return select(Sale).options(joinedload(Sale.product), joinedload(Sale.customer))
+
+    async def get_sales_summary(
+        self, db: AsyncSession, *, start_date: datetime, end_date: datetime
+    ) -> dict:
+        result = await db.execute(
+            select(
+                func.count(Sale.id).label("total_sales"),
+                func.sum(Sale.total_amount).label("total_revenue"),
+            )
+            .where(Sale.created_at >= start_date)
+            .where(Sale.created_at <= end_date)
+        )
+        row = result.first()
+        return {
+            "total_sales": row.total_sales or 0,
+            "total_revenue": float(row.total_revenue or 0),
+        }
+
+class AsyncCRUDInventory(AsyncCRUDReadBase[InventoryTransaction]):
+    async def get_by_product(
+        self, db: AsyncSession, *, product_id: int, created_by: int
+    ) -> List[InventoryTransaction]:
+        result = await db.execute(
+            self.select().where(
+                InventoryTransaction.product_id == product_id,
+                InventoryTransaction.created_by == created_by,
+            )
+        )
+        return result.scalars().all()
+
+class AsyncCRUDUser(AsyncCRUDReadBase[User]):
+    async def get_principal(self, db: AsyncSession, *, id: int) -> Optional[UserPrincipal]:
+        """
+        Same as `crud.user.get_principal`, sharing its cache.
+        """
+        cached = principal_cache.get(str(id))
+        if cached is not None:
+            return UserPrincipal(**cached)
+        result = await db.execute(
+            select(User.id, User.is_active, User.is_superuser).where(User.id == id)
+        )
+        row = result.first()
+        if not row:
+            return None
+        principal = UserPrincipal.model_validate(row)
+        principal_cache.set(str(id), principal.model_dump())
+        return principal
+
+product = AsyncCRUDProduct(Product)
+sale = AsyncCRUDSale(Sale)
+inventory = AsyncCRUDInventory(InventoryTransaction)
+user = AsyncCRUDUser(User)
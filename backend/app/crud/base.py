@@ -1,8 +1,17 @@
-from typing import Any, Dict, Generic, List, Optional, Type, TypeVar, Union
+from typing import Any, Dict, Generic, Iterable, List, Optional, Tuple, Type, TypeVar, Union
+from datetime import datetime
+from functools import lru_cache
+import uuid
 
-from fastapi.encoders import jsonable_encoder
-from pydantic import BaseModel
-from sqlalchemy.orm import Session
+from pydantic import BaseModel, ConfigDict, create_model
+from sqlalchemy import DateTime, func, inspect as sa_inspect, select
+from sqlalchemy.orm import Query, Session, joinedload, load_only, make_transient_to_detached
+from sqlalchemy.orm.util import identity_key
+from sqlalchemy.sql import Select
+
+from app.core.cache import get_cache
+from app.core.config import settings
+from app.core.etag import http_date, make_etag
 
 from app.db.base_class import Base
 
@@ -10,13 +19,168 @@ ModelType = TypeVar("ModelType", bound=Base)
 CreateSchemaType = TypeVar("CreateSchemaType", bound=BaseModel)
 UpdateSchemaType = TypeVar("UpdateSchemaType", bound=BaseModel)
 
-class CRUDBase(Generic[ModelType, CreateSchemaType, UpdateSchemaType]):
+def paginate(
+    query: Query, model: Any, *, skip: int = 0, limit: int = 100, after: Optional[int] = None
+) -> Tuple[List[Any], Optional[int]]:
+    """
+    Return one page of `query` ordered by `model.id` and the id to continue after.
+
+    When `after` is given the page starts right after that id, which lets the
+    database seek through the primary key index instead of scanning `skip` rows.
+    The returned id is None on the last page.
+    """
+    if after is not None:
+        query = query.filter(model.id > after)
+    query = query.order_by(model.id)
+    if skip:
+        query = query.offset(skip)
+    rows = query.limit(limit + 1).all()
+    if len(rows) > limit > 0:
+        return rows[:limit], rows[limit - 1].id
+    return rows[:limit], None
+
+def changed_at(model: Any) -> Any:
+    return func.coalesce(model.updated_at, model.created_at)
+
+def page_version_statement(
+    stmt: Select,
+    model: Any,
+    *,
+    skip: int = 0,
+    limit: int = 100,
+    after: Optional[int] = None,
+    changed: Tuple[Any, ...] = (),
+) -> Select:
+    """
+    The aggregate query behind `page_version`, over the ids and timestamps of
+    the page of `stmt` that `paginate` would return.
+    """
+    if after is not None:
+        stmt = stmt.where(model.id > after)
+    page = stmt.with_only_columns(
+        model.id.label("id"),
+        changed_at(model).label("changed_at"),
+        *(column.label(f"changed_{n}") for n, column in enumerate(changed)),
+    ).order_by(None).order_by(model.id)
+    if skip:
+        page = page.offset(skip)
+    page = page.limit(limit).subquery()
+    return select(
+        func.count(page.c.id),
+        func.sum(page.c.id),
+        func.max(page.c.changed_at),
+        *(func.max(page.c[f"changed_{n}"]) for n in range(len(changed))),
+    )
+
+def page_fingerprint(
+    row: Any, model: Any, *, skip: int = 0, limit: int = 100, after: Optional[int] = None
+) -> Tuple[str, Optional[datetime]]:
+    """
+    The version and last change of a page from the row of `page_version_statement`.
+    """
+    count, id_sum, *timestamps = row
+    # SQLite returns the coalesced timestamp as text
+    timestamps = [
+        datetime.fromisoformat(timestamp) if isinstance(timestamp, str) else timestamp
+        for timestamp in timestamps
+        if timestamp is not None
+    ]
+    last_changed = max(timestamps, default=None)
+    version = f"{model.__tablename__}:{skip}:{limit}:{after}:{count}:{id_sum}:{last_changed}"
+    return version, last_changed
+
+def page_version(
+    query: Query,
+    model: Any,
+    *,
+    skip: int = 0,
+    limit: int = 100,
+    after: Optional[int] = None,
+    changed: Tuple[Any, ...] = (),
+) -> Tuple[str, Optional[datetime]]:
+    """
+    Fingerprint of the page `paginate` would return for `query`, and the
+    latest created_at/updated_at in it, read with one aggregate query over the
+    page's ids and timestamps instead of loading the rows. `changed` adds
+    per-row timestamps of related rows the page embeds.
+    """
+    stmt = page_version_statement(
+        query.statement, model, skip=skip, limit=limit, after=after, changed=changed
+    )
+    row = query.session.execute(stmt).one()
+    return page_fingerprint(row, model, skip=skip, limit=limit, after=after)
+
+@lru_cache(maxsize=256)
+def projected_items(
+    schema: Type[BaseModel], fields: Tuple[str, ...], expand: Tuple[Tuple[str, Type[BaseModel]], ...]
+) -> Any:
+    """
+    Type of a list of `schema` items narrowed to `fields`, with each expanded
+    relationship embedded as its own schema.
+    """
+    definitions: Dict[str, Any] = {
+        name: (schema.model_fields[name].annotation, schema.model_fields[name]) for name in fields
+    }
+    definitions.update({name: (Optional[nested], None) for name, nested in expand})
+    item = create_model(
+        f"{schema.__name__}Projection", __config__=ConfigDict(from_attributes=True), **definitions
+    )
+    return List[item]
+
+class Projection:
+    """
+    The columns (`?fields=`) and relationships (`?expand=`) a list endpoint
+    was asked for. `apply` loads only those columns, plus the foreign keys of
+    the expanded relationships, and `type` is what the rows are serialized
+    as instead of the endpoint's full response_model.
+    """
+
+    def __init__(
+        self,
+        model: Any,
+        schema: Type[BaseModel],
+        *,
+        fields: Iterable[str],
+        expand: Dict[str, Type[BaseModel]],
+    ):
+        self.model = model
+        self.schema = schema
+        # The id is always returned, it is the pagination cursor
+        self.fields = tuple(dict.fromkeys(("id", *fields)))
+        self.expand = expand
+
+    @property
+    def key(self) -> str:
+        return f"fields={','.join(self.fields)}&expand={','.join(self.expand)}"
+
+    def apply(self, query: Query, *, join: bool = True) -> Query:
+        """
+        Narrow `query` (a Query or a select()) to the projected columns. With `join`, the expanded
+        relationships are joined in; otherwise the caller loads them.
+        """
+        mapper = sa_inspect(self.model)
+        columns = set(self.fields)
+        for name in self.expand:
+            columns.update(
+                mapper.get_property_by_column(column).key
+                for column in mapper.relationships[name].local_columns
+            )
+        options = [load_only(*(getattr(self.model, name) for name in sorted(columns)))]
+        if join:
+            options += [joinedload(getattr(self.model, name)) for name in self.expand]
+        return query.options(*options)
+
+    @property
+    def type(self) -> Any:
+        return projected_items(self.schema, self.fields, tuple(self.expand.items()))
+
+class CRUDReadBase(Generic[ModelType]):
     def __init__(self, model: Type[ModelType]):
         """
-        CRUD object with default methods to Create, Read, Update, Delete (CRUD).
+        CRUD object with the default read methods only, for tables such as the
+        inventory ledger that are written through domain methods.
         **Parameters**
         * `model`: A SQLAlchemy model class
-        * `schema`: A Pydantic model (schema) class
         """
         self.model = model
 
@@ -28,8 +192,18 @@ class CRUDBase(Generic[ModelType, CreateSchemaType, UpdateSchemaType]):
     ) -> List[ModelType]:
         return db.query(self.model).offset(skip).limit(limit).all()
 
+    def get_multi_page(
+        self, db: Session, *, skip: int = 0, limit: int = 100, after: Optional[int] = None
+    ) -> Tuple[List[ModelType], Optional[int]]:
+        return paginate(db.query(self.model), self.model, skip=skip, limit=limit, after=after)
+
+class CRUDBase(CRUDReadBase[ModelType], Generic[ModelType, CreateSchemaType, UpdateSchemaType]):
+    """
+    CRUD object with default methods to Create, Read, Update, Delete (CRUD).
+    """
+
     def create(self, db: Session, *, obj_in: CreateSchemaType) -> ModelType:
-        obj_in_data = jsonable_encoder(obj_in)
+        obj_in_data = obj_in.model_dump()
         db_obj = self.model(**obj_in_data)  # type: ignore
         db.add(db_obj)
         db.commit()
@@ -43,14 +217,13 @@ class CRUDBase(Generic[ModelType, CreateSchemaType, UpdateSchemaType]):
         db_obj: ModelType,
         obj_in: Union[UpdateSchemaType, Dict[str, Any]]
     ) -> ModelType:
-        obj_data = jsonable_encoder(db_obj)
         if isinstance(obj_in, dict):
             update_data = obj_in
         else:
-            update_data = obj_in.dict(exclude_unset=True)
-        for field in obj_data:
-            if field in update_data:
-                setattr(db_obj, field, update_data[field])
+            update_data = obj_in.model_dump(exclude_unset=True)
+        for field, value in update_data.items():
+            if hasattr(db_obj, field):
+                setattr(db_obj, field, value)
         db.add(db_obj)
         db.commit()
         db.refresh(db_obj)
@@ -60,4 +233,134 @@ class CRUDBase(Generic[ModelType, CreateSchemaType, UpdateSchemaType]):
         obj = db.query(self.model).get(id)
         db.delete(obj)
         db.commit()
-        return obj 
\ No newline at end of file
+        return obj
+
+class CachedCRUDBase(CRUDBase[ModelType, CreateSchemaType, UpdateSchemaType]):
+    """
+    CRUD object for read-mostly reference data. Objects (all their columns)
+    and list pages (dumped with `schema`) are cached as JSON, in memory or in
+    Redis depending on CACHE_BACKEND, and every write through this object
+    invalidates them. List pages are keyed by a version that each write
+    replaces, so stale pages are never read again.
+    """
+
+    def __init__(self, model: Type[ModelType], *, schema: Type[BaseModel], namespace: str):
+        super().__init__(model)
+        self.schema = schema
+        self.cache = get_cache(
+            namespace,
+            ttl=settings.REFERENCE_CACHE_TTL_SECONDS,
+            max_size=settings.REFERENCE_CACHE_MAX_SIZE,
+        )
+
+    def _dump(self, db_obj: ModelType) -> Dict[str, Any]:
+        data = {}
+        for column in self.model.__table__.columns:
+            value = getattr(db_obj, column.key)
+            data[column.key] = value.isoformat() if isinstance(value, datetime) else value
+        return data
+
+    def _load(self, data: Dict[str, Any]) -> ModelType:
+        values = {}
+        for column in self.model.__table__.columns:
+            value = data.get(column.key)
+            if value is not None and isinstance(column.type, DateTime):
+                value = datetime.fromisoformat(value)
+            values[column.key] = value
+        return self.model(**values)
+
+    def version(self) -> str:
+        version = self.cache.get("version")
+        if version is None:
+            version = uuid.uuid4().hex
+            self.cache.set("version", version)
+        return version
+
+    def invalidate(self, id: Optional[int] = None) -> None:
+        if id is not None:
+            self.cache.delete(f"id:{id}")
+        self.cache.set("version", uuid.uuid4().hex)
+
+    def get_cached(self, db: Session, id: int) -> Optional[Dict[str, Any]]:
+        """
+        The object as a JSON-ready dict of `schema`, or None if it does not exist.
+        """
+        data = self.get_many_cached(db, [id]).get(id)
+        return None if data is None else self.schema.model_validate(data).model_dump(mode="json")
+
+    def last_modified_cached(self, db: Session, id: int) -> Optional[str]:
+        data = self.get_many_cached(db, [id]).get(id) or {}
+        changed = data.get("updated_at") or data.get("created_at")
+        return http_date(datetime.fromisoformat(changed)) if changed else None
+
+    def get_many_cached(self, db: Session, ids: Iterable[int]) -> Dict[int, Dict[str, Any]]:
+        ids = {id for id in ids if id is not None}
+        cached = self.cache.get_many(f"id:{id}" for id in ids)
+        found = {int(key[3:]): value for key, value in cached.items()}
+        missing = ids - found.keys()
+        if missing:
+            for db_obj in db.query(self.model).filter(self.model.id.in_(missing)).all():
+                found[db_obj.id] = self._dump(db_obj)
+                self.cache.set(f"id:{db_obj.id}", found[db_obj.id])
+        return found
+
+    def get_multi_page_cached(
+        self, db: Session, *, skip: int = 0, limit: int = 100, after: Optional[int] = None
+    ) -> Dict[str, Any]:
+        """
+        A cached page as {"items", "last_id", "etag", "last_modified"}, with
+        items as JSON-ready dicts.
+        """
+        key = f"page:{self.version()}:{skip}:{limit}:{after}"
+        page = self.cache.get(key)
+        if page is None:
+            db_objs, last_id = self.get_multi_page(db, skip=skip, limit=limit, after=after)
+            items = [self.schema.model_validate(db_obj).model_dump(mode="json") for db_obj in db_objs]
+            changed = [db_obj.updated_at or db_obj.created_at for db_obj in db_objs]
+            page = {
+                "items": items,
+                "last_id": last_id,
+                "etag": make_etag(items),
+                "last_modified": http_date(max(changed)) if all(changed) and changed else None,
+            }
+            self.cache.set(key, page)
+        return page
+
+    def prime(self, db: Session, ids: Iterable[int]) -> None:
+        """
+        Put cached objects into the session's identity map without querying,
+        so lazy loads of relationships to them (e.g. `Product.category`) do
+        not hit the database.
+        """
+        ids = {
+            id for id in ids
+            if id is not None and identity_key(self.model, id) not in db.identity_map
+        }
+        # The identity map only holds weak references, so keep the merged
+        # objects alive for as long as the session
+        primed = db.info.setdefault("primed", [])
+        for data in self.get_many_cached(db, ids).values():
+            db_obj = self._load(data)
+            make_transient_to_detached(db_obj)
+            primed.append(db.merge(db_obj, load=False))
+
+    def create(self, db: Session, *, obj_in: CreateSchemaType) -> ModelType:
+        db_obj = super().create(db, obj_in=obj_in)
+        self.invalidate()
+        return db_obj
+
+    def update(
+        self,
+        db: Session,
+        *,
+        db_obj: ModelType,
+        obj_in: Union[UpdateSchemaType, Dict[str, Any]]
+    ) -> ModelType:
+        db_obj = super().update(db, db_obj=db_obj, obj_in=obj_in)
+        self.invalidate(db_obj.id)
+        return db_obj
+
+    def remove(self, db: Session, *, id: int) -> ModelType:
+        db_obj = super().remove(db, id=id)
+        self.invalidate(id)
+        return db_obj
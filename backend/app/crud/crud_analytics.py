@@ -0,0 +1,277 @@
+from typing import Any, Dict, Iterable, List, Optional, Tuple
+from datetime import datetime, timezone
+
+from sqlalchemy import func, insert, select, union_all
+from sqlalchemy.dialects import postgresql, sqlite
+from sqlalchemy.orm import Session
+
+from app.models.analytics import SalesRollup, SalesRollupDelta
+
+GRANULARITIES = ("hour", "day")
+DIMENSIONS = ("product", "category", "customer")
+METRICS = ("revenue", "units", "margin", "sales_count")
+
+COUNTERS = (
+    "sales_count", "units", "revenue", "cost",
+    "returns_count", "returned_units", "returned_revenue", "returned_cost",
+)
+BUCKET = ("granularity", "dimension", "dimension_id", "bucket_start")
+
+# Lock key that keeps concurrent fold() calls on PostgreSQL from overlapping
+FOLD_LOCK_ID = 0x726F6C6C
+
+def as_utc(at: datetime) -> datetime:
+    """
+    Naive datetimes are taken to be UTC already.
+    """
+    return at.astimezone(timezone.utc) if at.tzinfo else at.replace(tzinfo=timezone.utc)
+
+def bucket_start(at: datetime, granularity: str) -> datetime:
+    at = as_utc(at)
+    if granularity == "day":
+        return at.replace(hour=0, minute=0, second=0, microsecond=0)
+    return at.replace(minute=0, second=0, microsecond=0)
+
+def _totals(row: Any) -> Dict[str, Any]:
+    revenue = float(row.revenue or 0)
+    cost = float(row.cost or 0)
+    returned_revenue = float(row.returned_revenue or 0)
+    returned_cost = float(row.returned_cost or 0)
+    return {
+        "sales_count": int(row.sales_count or 0),
+        "units": float(row.units or 0),
+        "revenue": revenue,
+        "cost": cost,
+        "returns_count": int(row.returns_count or 0),
+        "returned_units": float(row.returned_units or 0),
+        "returned_revenue": returned_revenue,
+        "net_revenue": revenue - returned_revenue,
+        "margin": (revenue - returned_revenue) - (cost - returned_cost),
+    }
+
+class CRUDAnalytics:
+    """
+    Maintains and reads the sales rollups. Sales and returns only append
+    rows to `sales_rollup_deltas`, in their own transaction, so they never
+    contend on a shared bucket; `fold` later adds the deltas up into
+    `sales_rollups`. Reads cover both tables and are always exact.
+    """
+
+    def record_sales(self, db: Session, *, lines: Iterable[Dict[str, Any]]) -> None:
+        """
+        Add sale lines to the rollups. Each line has product_id, category_id,
+        customer_id, quantity, revenue, unit_cost and `at`, the sale row's
+        created_at, which picks its buckets.
+        """
+        self._record(db, lines, count="sales_count", prefix="")
+
+    def record_returns(self, db: Session, *, lines: Iterable[Dict[str, Any]]) -> None:
+        """
+        Add returned lines to the rollups, with the same keys as `record_sales`
+        where revenue is the refunded amount.
+        """
+        self._record(db, lines, count="returns_count", prefix="returned_")
+
+    def _record(
+        self, db: Session, lines: Iterable[Dict[str, Any]], *, count: str, prefix: str
+    ) -> None:
+        updated = (count, f"{prefix}units", f"{prefix}revenue", f"{prefix}cost")
+        deltas: Dict[Tuple[str, datetime, str, int], Dict[str, float]] = {}
+        for line in lines:
+            at = line["at"]
+            keys = {
+                "product": line["product_id"],
+                "category": line.get("category_id"),
+                "customer": line.get("customer_id"),
+            }
+            for granularity in GRANULARITIES:
+                start = bucket_start(at, granularity)
+                for dimension, dimension_id in keys.items():
+                    if dimension_id is None:
+                        continue
+                    delta = deltas.setdefault(
+                        (granularity, start, dimension, dimension_id),
+                        dict.fromkeys(updated, 0),
+                    )
+                    delta[count] += 1
+                    delta[f"{prefix}units"] += line["quantity"]
+                    delta[f"{prefix}revenue"] += line["revenue"]
+                    delta[f"{prefix}cost"] += line["quantity"] * (line.get("unit_cost") or 0)
+        if not deltas:
+            return
+
+        rows = []
+        for (granularity, start, dimension, dimension_id), delta in deltas.items():
+            row = dict.fromkeys(COUNTERS, 0)
+            row.update(delta)
+            row.update(
+                granularity=granularity,
+                bucket_start=start,
+                dimension=dimension,
+                dimension_id=dimension_id,
+            )
+            rows.append(row)
+        # executemany: compiled once and cached, whatever the number of rows
+        db.execute(insert(SalesRollupDelta.__table__), rows)
+
+    def fold(self, db: Session, *, batch_size: int = 10000) -> int:
+        """
+        Move the pending deltas into `sales_rollups`, `batch_size` at a time,
+        committing after each batch. Buckets are upserted in key order, so
+        concurrent folds cannot deadlock. Returns the number of deltas folded.
+        """
+        deltas = SalesRollupDelta.__table__
+        table = SalesRollup.__table__
+        postgres = db.get_bind().dialect.name == "postgresql"
+        folded = 0
+        while True:
+            if postgres and not db.execute(
+                select(func.pg_try_advisory_xact_lock(FOLD_LOCK_ID))
+            ).scalar():
+                # Another worker is folding
+                db.rollback()
+                return folded
+            last_id = db.execute(
+                select(deltas.c.id).order_by(deltas.c.id).offset(batch_size - 1).limit(1)
+            ).scalar()
+            if last_id is None:
+                last_id = db.execute(select(func.max(deltas.c.id))).scalar()
+            if last_id is None:
+                db.commit()
+                return folded
+            # Only delete the deltas that were read: one with a lower id can
+            # commit after last_id was picked
+            columns = [deltas.c[name] for name in BUCKET + COUNTERS]
+            if postgres:
+                rows = db.execute(
+                    deltas.delete().where(deltas.c.id <= last_id).returning(*columns)
+                ).all()
+            else:
+                rows = db.execute(select(deltas.c.id, *columns).where(deltas.c.id <= last_id)).all()
+                db.execute(deltas.delete().where(deltas.c.id.in_([row.id for row in rows])))
+
+            buckets: Dict[Tuple[Any, ...], Dict[str, Any]] = {}
+            for row in rows:
+                key = tuple(getattr(row, name) for name in BUCKET)
+                bucket = buckets.get(key)
+                if bucket is None:
+                    buckets[key] = {name: getattr(row, name) for name in BUCKET + COUNTERS}
+                else:
+                    for name in COUNTERS:
+                        bucket[name] += getattr(row, name)
+            insert_bucket = (postgresql.insert if postgres else sqlite.insert)(table)
+            stmt = insert_bucket.on_conflict_do_update(
+                index_elements=list(BUCKET),
+                set_={name: table.c[name] + insert_bucket.excluded[name] for name in COUNTERS},
+            )
+            db.execute(stmt, [buckets[key] for key in sorted(buckets)])
+            db.commit()
+            folded += len(rows)
+
+    def _buckets(
+        self,
+        *,
+        start: datetime,
+        end: datetime,
+        granularity: str,
+        dimension: str,
+        dimension_id: Optional[int] = None,
+    ) -> Any:
+        """
+        Folded rollups and pending deltas within [start, end), filtered on
+        each table so that both use their range index.
+        """
+        selects = []
+        for model in (SalesRollup, SalesRollupDelta):
+            table = model.__table__
+            stmt = select(*[table.c[name] for name in BUCKET + COUNTERS]).where(
+                table.c.granularity == granularity,
+                table.c.dimension == dimension,
+                table.c.bucket_start >= bucket_start(start, granularity),
+                table.c.bucket_start < as_utc(end),
+            )
+            if dimension_id is not None:
+                stmt = stmt.where(table.c.dimension_id == dimension_id)
+            selects.append(stmt)
+        return union_all(*selects).subquery("buckets")
+
+    def _sums(self, buckets: Any) -> List[Any]:
+        return [func.sum(buckets.c[name]).label(name) for name in COUNTERS]
+
+    def get_totals(
+        self,
+        db: Session,
+        *,
+        start: datetime,
+        end: datetime,
+        dimension: str = "product",
+        dimension_id: Optional[int] = None,
+    ) -> Dict[str, Any]:
+        """
+        Totals over [start, end). Whole-day ranges are read from day buckets,
+        anything else from hour buckets.
+        """
+        buckets = self._buckets(
+            start=start, end=end, granularity=self.granularity_for(start, end),
+            dimension=dimension, dimension_id=dimension_id,
+        )
+        return _totals(db.query(*self._sums(buckets)).one())
+
+    def get_timeseries(
+        self,
+        db: Session,
+        *,
+        start: datetime,
+        end: datetime,
+        granularity: str,
+        dimension: str = "product",
+        dimension_id: Optional[int] = None,
+    ) -> List[Dict[str, Any]]:
+        buckets = self._buckets(
+            start=start, end=end, granularity=granularity,
+            dimension=dimension, dimension_id=dimension_id,
+        )
+        rows = (
+            db.query(buckets.c.bucket_start, *self._sums(buckets))
+            .group_by(buckets.c.bucket_start)
+            .order_by(buckets.c.bucket_start)
+            .all()
+        )
+        return [dict(bucket_start=row.bucket_start, **_totals(row)) for row in rows]
+
+    def get_top(
+        self,
+        db: Session,
+        *,
+        start: datetime,
+        end: datetime,
+        dimension: str,
+        metric: str = "revenue",
+        limit: int = 10,
+    ) -> List[Dict[str, Any]]:
+        buckets = self._buckets(
+            start=start, end=end, granularity=self.granularity_for(start, end),
+            dimension=dimension,
+        )
+        sums = {name: func.sum(buckets.c[name]) for name in COUNTERS}
+        order_by = {
+            "revenue": sums["revenue"] - sums["returned_revenue"],
+            "units": sums["units"] - sums["returned_units"],
+            "margin": (sums["revenue"] - sums["returned_revenue"]) - (sums["cost"] - sums["returned_cost"]),
+            "sales_count": sums["sales_count"],
+        }[metric]
+        rows = (
+            db.query(buckets.c.dimension_id, *self._sums(buckets))
+            .group_by(buckets.c.dimension_id)
+            .order_by(order_by.desc(), buckets.c.dimension_id)
+            .limit(limit)
+            .all()
+        )
+        return [dict(dimension_id=row.dimension_id, **_totals(row)) for row in rows]
+
+    def granularity_for(self, start: datetime, end: datetime) -> str:
+        if bucket_start(start, "day") == as_utc(start) and bucket_start(end, "day") == as_utc(end):
+            return "day"
+        return "hour"
+
+analytics = CRUDAnalytics()
@@ -1,22 +1,13 @@
 from typing import List, Optional
 
-from fastapi.encoders import jsonable_encoder
 from sqlalchemy.orm import Session
 
-from app.crud.base import CRUDBase
+from app.crud.base import CachedCRUDBase
 from app.models.category import Category
-from app.schemas.category import CategoryCreate, CategoryUpdate
-
-class CRUDCategory(CRUDBase[Category, CategoryCreate, CategoryUpdate]):
-    def create(self, db: Session, *, obj_in: CategoryCreate) -> Category:
-        obj_in_data = jsonable_encoder(obj_in)
-        db_obj = self.model(**obj_in_data)
-        db.add(db_obj)
-        db.commit()
-        db.refresh(db_obj)
-        return db_obj
+from app.schemas.category import Category as CategorySchema, CategoryCreate, CategoryUpdate
 
+class CRUDCategory(CachedCRUDBase[Category, CategoryCreate, CategoryUpdate]):
     def get_by_name(self, db: Session, *, name: str) -> Optional[Category]:
         return db.query(self.model).filter(Category.name == name).first()
 
-category = CRUDCategory(Category) 
\ No newline at end of file
+category = CRUDCategory(Category, schema=CategorySchema, namespace="ref:category") 
\ No newline at end of file
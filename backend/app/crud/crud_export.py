@@ -0,0 +1,134 @@
+from typing import Any, Dict, Iterator, List, NamedTuple, Optional, Sequence, Tuple
+from datetime import datetime
+
+from sqlalchemy import select
+from sqlalchemy.orm import Session
+from sqlalchemy.sql import Select
+
+from app.models.category import Category
+from app.models.customer import Customer
+from app.models.inventory import InventoryTransaction
+from app.models.product import Product
+from app.models.sale import Sale
+from app.models.supplier import Supplier
+
+class ExportSpec(NamedTuple):
+    model: Any
+    # Plain columns of the exported table
+    columns: Dict[str, Any]
+    # Columns of related tables: name -> (column, related model, join condition)
+    related: Dict[str, Tuple[Any, Any, Any]]
+    default_fields: Tuple[str, ...]
+
+def _columns(model: Any, names: Sequence[str]) -> Dict[str, Any]:
+    return {name: getattr(model, name) for name in names}
+
+EXPORTS: Dict[str, ExportSpec] = {
+    "sales": ExportSpec(
+        model=Sale,
+        columns=_columns(Sale, (
+            "id", "product_id", "customer_id", "location_id", "quantity", "unit_price",
+            "total_amount", "notes", "created_at", "created_by",
+        )),
+        related={
+            "product_name": (Product.name, Product, Product.id == Sale.product_id),
+            "product_sku": (Product.sku, Product, Product.id == Sale.product_id),
+            "customer_name": (Customer.full_name, Customer, Customer.id == Sale.customer_id),
+        },
+        default_fields=(
+            "id", "product_id", "customer_id", "quantity", "unit_price",
+            "total_amount", "created_at",
+        ),
+    ),
+    "products": ExportSpec(
+        model=Product,
+        columns=_columns(Product, (
+            "id", "name", "description", "sku", "barcode", "price", "cost", "stock",
+            "min_quantity", "category_id", "supplier_id", "created_at", "updated_at",
+        )),
+        related={
+            "category_name": (Category.name, Category, Category.id == Product.category_id),
+            "supplier_name": (Supplier.name, Supplier, Supplier.id == Product.supplier_id),
+        },
+        default_fields=(
+            "id", "name", "sku", "barcode", "price", "cost", "stock",
+            "min_quantity", "category_id", "supplier_id",
+        ),
+    ),
+    "inventory": ExportSpec(
+        model=InventoryTransaction,
+        columns=_columns(InventoryTransaction, (
+            "id", "product_id", "location_id", "quantity", "transaction_type",
+            "balance_after", "reference", "notes", "created_at", "created_by",
+        )),
+        related={
+            "product_name": (Product.name, Product, Product.id == InventoryTransaction.product_id),
+            "product_sku": (Product.sku, Product, Product.id == InventoryTransaction.product_id),
+        },
+        default_fields=(
+            "id", "product_id", "quantity", "transaction_type", "reference", "created_at",
+        ),
+    ),
+}
+
+class CRUDExport:
+    """
+    Builds column-only SELECTs for the export endpoints and streams their rows
+    in batches from a server-side cursor, so no ORM objects are created and
+    memory use does not depend on the size of the table.
+    """
+
+    def fields(self, entity: str) -> List[str]:
+        spec = EXPORTS[entity]
+        return [*spec.columns, *spec.related]
+
+    def build(
+        self,
+        entity: str,
+        *,
+        fields: Optional[Sequence[str]] = None,
+        created_by: int,
+        start_date: Optional[datetime] = None,
+        end_date: Optional[datetime] = None,
+    ) -> Select:
+        """
+        SELECT the requested fields of `entity` for one user, ordered by id.
+        Related tables are only joined when one of their fields is requested.
+        Raises ValueError on unknown fields.
+        """
+        spec = EXPORTS[entity]
+        fields = list(fields or spec.default_fields)
+        unknown = [name for name in fields if name not in spec.columns and name not in spec.related]
+        if unknown:
+            raise ValueError(f"Unknown fields: {', '.join(unknown)}")
+
+        columns = []
+        joins: Dict[Any, Any] = {}
+        for name in fields:
+            if name in spec.columns:
+                columns.append(spec.columns[name].label(name))
+            else:
+                column, target, onclause = spec.related[name]
+                columns.append(column.label(name))
+                joins.setdefault(target, onclause)
+
+        stmt = select(*columns).select_from(spec.model)
+        for target, onclause in joins.items():
+            stmt = stmt.outerjoin(target, onclause)
+        stmt = stmt.where(spec.model.created_by == created_by)
+        if start_date is not None:
+            stmt = stmt.where(spec.model.created_at >= start_date)
+        if end_date is not None:
+            stmt = stmt.where(spec.model.created_at <= end_date)
+        return stmt.order_by(spec.model.id)
+
+    def stream(self, db: Session, stmt: Select, *, batch_size: int) -> Iterator[List[Any]]:
+        """
+        Yield lists of up to `batch_size` rows. On PostgreSQL the rows come
+        from a named cursor instead of being buffered by the driver.
+        """
+        result = db.execute(stmt.execution_options(stream_results=True, max_row_buffer=batch_size))
+        for rows in result.partitions(batch_size):
+            yield rows
+
+export = CRUDExport()
@@ -1,17 +1,251 @@
-from typing import List
+from typing import Any, Dict, List, Optional, Tuple
+from datetime import datetime
 
-from fastapi.encoders import jsonable_encoder
+from sqlalchemy import insert, text
+from sqlalchemy.engine import Row
 from sqlalchemy.orm import Session
 
-from app.crud.base import CRUDBase
-from app.models.inventory import InventoryTransaction
+from app.core.events import publish_after_commit
+from app.crud.base import CRUDReadBase
+from app.crud.crud_location import stock_level as crud_stock_level
+from app.crud.crud_low_stock import low_stock as crud_low_stock
+from app.crud.crud_product import product as crud_product
+from app.models.inventory import InventoryTransaction, StockSnapshot, TransactionType
+from app.models.product import Product
 from app.schemas.inventory import InventoryTransactionCreate
 
-class CRUDInventory(CRUDBase[InventoryTransaction, InventoryTransactionCreate, InventoryTransactionCreate]):
-    def create(self, db: Session, *, obj_in: InventoryTransactionCreate) -> InventoryTransaction:
-        obj_in_data = jsonable_encoder(obj_in)
-        db_obj = self.model(**obj_in_data)
+class CRUDInventory(CRUDReadBase[InventoryTransaction]):
+    """
+    Append-only stock ledger. Every stock change goes through `apply` (or
+    `record` for stock already moved in bulk), which updates the materialized
+    balance, `StockLevel.stock` for a location or `Product.stock` for stock not
+    assigned to one, and appends a ledger row with the balance after the
+    change. Ledger rows are never updated or deleted, so there is no generic
+    create, update or remove. Each change is also published as a `stock`
+    event once the transaction commits.
+    """
+
+    def apply(
+        self,
+        db: Session,
+        *,
+        product_id: int,
+        transaction_type: TransactionType,
+        quantity: float,
+        created_by: int,
+        location_id: Optional[int] = None,
+        fallback: bool = False,
+        reference: Optional[str] = None,
+        notes: Optional[str] = None,
+    ) -> Optional[Tuple[InventoryTransaction, Row]]:
+        """
+        Move stock and append the ledger row without committing.
+
+        IN adds `quantity`, OUT removes it and ADJUSTMENT sets the stock to it,
+        at `location_id` or in the unassigned stock. With `fallback`, an OUT
+        that the location (or the unassigned stock) cannot cover is taken from
+        another location. Returns the ledger row and the product's cost and
+        category_id, or None if the product does not exist or an OUT exceeds
+        the stock.
+        """
+        applied = self._move(
+            db,
+            product_id=product_id,
+            transaction_type=transaction_type,
+            quantity=quantity,
+            created_by=created_by,
+            location_id=location_id,
+            fallback=fallback,
+            reference=reference,
+            notes=notes,
+        )
+        if applied is not None:
+            # Low stock is judged on the total, which moves with any location's stock
+            crud_low_stock.sync(db, product_ids=[product_id])
+        return applied
+
+    def _move(
+        self,
+        db: Session,
+        *,
+        product_id: int,
+        transaction_type: TransactionType,
+        quantity: float,
+        created_by: int,
+        location_id: Optional[int],
+        fallback: bool,
+        reference: Optional[str],
+        notes: Optional[str],
+    ) -> Optional[Tuple[InventoryTransaction, Row]]:
+        if location_id is None:
+            product = self._apply_unassigned(
+                db, product_id=product_id, transaction_type=transaction_type, quantity=quantity
+            )
+            balance = product.stock if product is not None else None
+            if balance is None and fallback and transaction_type == TransactionType.OUT:
+                product, location_id, balance = self._apply_at_location(
+                    db, product_id=product_id, transaction_type=transaction_type,
+                    quantity=quantity, location_id=None, fallback=True,
+                )
+        else:
+            product, location_id, balance = self._apply_at_location(
+                db, product_id=product_id, transaction_type=transaction_type,
+                quantity=quantity, location_id=location_id, fallback=fallback,
+            )
+        if balance is None:
+            return None
+        db_obj = InventoryTransaction(
+            product_id=product_id,
+            location_id=location_id,
+            transaction_type=transaction_type,
+            quantity=quantity,
+            balance_after=balance,
+            reference=reference,
+            notes=notes,
+            created_by=created_by,
+        )
         db.add(db_obj)
+        self._publish(db, [{
+            "product_id": product_id,
+            "location_id": location_id,
+            "transaction_type": transaction_type,
+            "quantity": quantity,
+            "balance_after": balance,
+        }])
+        return db_obj, product
+
+    def _publish(self, db: Session, entries: List[Dict[str, Any]]) -> None:
+        for entry in entries:
+            publish_after_commit(db, "stock", {
+                "product_id": entry["product_id"],
+                "location_id": entry.get("location_id"),
+                "transaction_type": TransactionType(entry["transaction_type"]).value,
+                "quantity": entry["quantity"],
+                "stock": entry["balance_after"],
+            })
+
+    def _apply_unassigned(
+        self, db: Session, *, product_id: int, transaction_type: TransactionType, quantity: float
+    ) -> Optional[Row]:
+        if transaction_type == TransactionType.IN:
+            return crud_product.increment_stock(db, product_id=product_id, quantity=quantity)
+        if transaction_type == TransactionType.OUT:
+            return crud_product.decrement_stock(db, product_id=product_id, quantity=quantity)
+        return crud_product.set_stock(db, product_id=product_id, stock=quantity)
+
+    def _apply_at_location(
+        self,
+        db: Session,
+        *,
+        product_id: int,
+        transaction_type: TransactionType,
+        quantity: float,
+        location_id: Optional[int],
+        fallback: bool,
+    ) -> Tuple[Optional[Row], Optional[int], Optional[int]]:
+        # Returns the product's cost and category_id, the location the stock
+        # moved at and the balance there, or a None balance when nothing moved
+        product = (
+            db.query(Product.cost, Product.category_id).filter(Product.id == product_id).first()
+        )
+        if product is None:
+            return None, location_id, None
+        if transaction_type == TransactionType.IN:
+            balance = crud_stock_level.increment(
+                db, product_id=product_id, location_id=location_id, quantity=quantity
+            )
+        elif transaction_type == TransactionType.ADJUSTMENT:
+            balance = crud_stock_level.set(
+                db, product_id=product_id, location_id=location_id, stock=quantity
+            )
+        elif fallback:
+            allocated = crud_stock_level.allocate(
+                db, product_id=product_id, quantity=quantity, preferred_location_id=location_id
+            )
+            location_id, balance = allocated if allocated else (location_id, None)
+        else:
+            balance = crud_stock_level.decrement(
+                db, product_id=product_id, location_id=location_id, quantity=quantity
+            )
+        return product, location_id, balance
+
+    def transfer(
+        self,
+        db: Session,
+        *,
+        product_id: int,
+        quantity: float,
+        from_location_id: Optional[int],
+        to_location_id: Optional[int],
+        created_by: int,
+        notes: Optional[str] = None,
+    ) -> Optional[Tuple[InventoryTransaction, InventoryTransaction]]:
+        """
+        Move stock between locations (None is the unassigned stock) as an OUT
+        and an IN that reference each other, and commit. Returns None, with
+        nothing written, if the source does not have enough stock.
+        """
+        moved = []
+        for transaction_type, location_id in (
+            (TransactionType.OUT, from_location_id),
+            (TransactionType.IN, to_location_id),
+        ):
+            # The total stock does not change, so neither does the low stock set
+            applied = self._move(
+                db,
+                product_id=product_id,
+                transaction_type=transaction_type,
+                quantity=quantity,
+                created_by=created_by,
+                location_id=location_id,
+                fallback=False,
+                reference=None,
+                notes=notes,
+            )
+            if applied is None:
+                db.rollback()
+                return None
+            moved.append(applied[0])
+        out, into = moved
+        db.flush()
+        out.reference = f"transfer:{into.id}"
+        into.reference = f"transfer:{out.id}"
+        db.commit()
+        db.refresh(out)
+        db.refresh(into)
+        return out, into
+
+    def record(self, db: Session, *, entries: List[Dict[str, Any]]) -> None:
+        """
+        Append ledger rows for stock that was already moved, e.g. by a bulk
+        UPDATE. Each entry has the InventoryTransaction columns, including
+        balance_after. Does not commit.
+        """
+        if entries:
+            db.execute(insert(InventoryTransaction.__table__), entries)
+            self._publish(db, entries)
+
+    def create_with_stock(
+        self, db: Session, *, obj_in: InventoryTransactionCreate, created_by: int
+    ) -> Optional[InventoryTransaction]:
+        """
+        Apply a manual IN/OUT/ADJUSTMENT and commit. Returns None, with nothing
+        written, if the product does not exist or there is not enough stock.
+        """
+        applied = self.apply(
+            db,
+            product_id=obj_in.product_id,
+            transaction_type=obj_in.transaction_type,
+            quantity=obj_in.quantity,
+            location_id=obj_in.location_id,
+            created_by=created_by,
+            reference=obj_in.reference,
+            notes=obj_in.notes,
+        )
+        if applied is None:
+            db.rollback()
+            return None
+        db_obj, _ = applied
         db.commit()
         db.refresh(db_obj)
         return db_obj
@@ -19,4 +253,85 @@ class CRUDInventory(CRUDBase[InventoryTransaction, InventoryTransactionCreate, I
     def get_by_product(self, db: Session, *, product_id: int) -> List[InventoryTransaction]:
         return db.query(self.model).filter(InventoryTransaction.product_id == product_id).all()
 
-inventory = CRUDInventory(InventoryTransaction) 
\ No newline at end of file
+    def get_stock(
+        self, db: Session, *, product_id: int, location_id: Optional[int] = None
+    ) -> Optional[int]:
+        """
+        Current stock at a location, or unassigned stock, read from the
+        materialized balance.
+        """
+        if location_id is not None:
+            return crud_stock_level.get_stock(db, product_id=product_id, location_id=location_id)
+        return db.query(Product.stock).filter(Product.id == product_id).scalar()
+
+    def get_stock_at(
+        self, db: Session, *, product_id: int, at: datetime, location_id: Optional[int] = None
+    ) -> Optional[int]:
+        """
+        Stock of a product as of `at`, at a location or unassigned: the later
+        of the last ledger row and the last snapshot at or before `at`, both
+        found through an index. Falls back to the current stock when nothing
+        changed since `at`, and returns None when the stock at that time is
+        unknown.
+        """
+        entry = (
+            db.query(InventoryTransaction.created_at, InventoryTransaction.balance_after)
+            .filter(
+                InventoryTransaction.product_id == product_id,
+                InventoryTransaction.location_id == location_id,
+                InventoryTransaction.created_at <= at,
+                InventoryTransaction.balance_after.isnot(None),
+            )
+            .order_by(InventoryTransaction.created_at.desc(), InventoryTransaction.id.desc())
+            .first()
+        )
+        snapshot = (
+            db.query(StockSnapshot.taken_at, StockSnapshot.stock)
+            .filter(
+                StockSnapshot.product_id == product_id,
+                StockSnapshot.location_id == location_id,
+                StockSnapshot.taken_at <= at,
+            )
+            .order_by(StockSnapshot.taken_at.desc())
+            .first()
+        )
+        if entry and (not snapshot or entry.created_at >= snapshot.taken_at):
+            return entry.balance_after
+        if snapshot:
+            return snapshot.stock
+
+        changed_since = (
+            db.query(InventoryTransaction.id)
+            .filter(
+                InventoryTransaction.product_id == product_id,
+                InventoryTransaction.location_id == location_id,
+                InventoryTransaction.created_at > at,
+            )
+            .first()
+        )
+        if changed_since:
+            return None
+        return self.get_stock(db, product_id=product_id, location_id=location_id)
+
+    def take_snapshot(self, db: Session) -> int:
+        """
+        Record the current unassigned and per-location stock of every product
+        and commit. Meant to run periodically, e.g. daily from cron via
+        `python -m app.stock_snapshot`.
+        """
+        count = db.execute(
+            text(
+                "INSERT INTO stock_snapshots (product_id, location_id, stock, taken_at) "
+                "SELECT id, NULL, stock, CURRENT_TIMESTAMP FROM products"
+            )
+        ).rowcount
+        count += db.execute(
+            text(
+                "INSERT INTO stock_snapshots (product_id, location_id, stock, taken_at) "
+                "SELECT product_id, location_id, stock, CURRENT_TIMESTAMP FROM stock_levels"
+            )
+        ).rowcount
+        db.commit()
+        return count
+
+inventory = CRUDInventory(InventoryTransaction)
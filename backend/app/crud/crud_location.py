@@ -0,0 +1,137 @@
+from typing import List, Optional, Tuple
+
+from sqlalchemy import func, update
+from sqlalchemy.dialects import postgresql, sqlite
+from sqlalchemy.orm import Session
+
+from app.crud.base import CRUDBase, paginate
+from app.models.location import Location, StockLevel
+from app.schemas.location import LocationCreate, LocationUpdate
+
+class CRUDLocation(CRUDBase[Location, LocationCreate, LocationUpdate]):
+    def get_by_name(self, db: Session, *, name: str) -> Optional[Location]:
+        return db.query(self.model).filter(Location.name == name).first()
+
+class CRUDStockLevel:
+    """
+    Per-location stock counters. Like `CRUDProduct.decrement_stock`, every
+    change is a single conditional statement and nothing is committed here.
+    """
+
+    def _returning_stock(self, db: Session, stmt, *, product_id: int, location_id: int) -> Optional[int]:
+        if db.get_bind().dialect.full_returning:
+            return db.execute(stmt.returning(StockLevel.__table__.c.stock)).scalar()
+        if db.execute(stmt).rowcount != 1:
+            return None
+        return self.get_stock(db, product_id=product_id, location_id=location_id)
+
+    def _upsert(self, db: Session, *, product_id: int, location_id: int, stock, set_stock) -> int:
+        dialect = db.get_bind().dialect.name
+        insert = postgresql.insert if dialect == "postgresql" else sqlite.insert
+        table = StockLevel.__table__
+        stmt = insert(table).values(product_id=product_id, location_id=location_id, stock=stock)
+        stmt = stmt.on_conflict_do_update(
+            index_elements=["product_id", "location_id"],
+            set_={"stock": set_stock(table, stmt), "updated_at": func.now()},
+        )
+        return self._returning_stock(db, stmt, product_id=product_id, location_id=location_id)
+
+    def get_stock(self, db: Session, *, product_id: int, location_id: int) -> Optional[int]:
+        return (
+            db.query(StockLevel.stock)
+            .filter(StockLevel.product_id == product_id, StockLevel.location_id == location_id)
+            .scalar()
+        )
+
+    def increment(self, db: Session, *, product_id: int, location_id: int, quantity: float) -> int:
+        """
+        Add stock at a location, creating its counter if needed. Returns the new stock.
+        """
+        return self._upsert(
+            db, product_id=product_id, location_id=location_id, stock=quantity,
+            set_stock=lambda table, stmt: table.c.stock + stmt.excluded.stock,
+        )
+
+    def set(self, db: Session, *, product_id: int, location_id: int, stock: float) -> int:
+        """
+        Set the stock at a location to a counted level. Returns the new stock.
+        """
+        return self._upsert(
+            db, product_id=product_id, location_id=location_id, stock=stock,
+            set_stock=lambda table, stmt: stmt.excluded.stock,
+        )
+
+    def decrement(
+        self, db: Session, *, product_id: int, location_id: int, quantity: float
+    ) -> Optional[int]:
+        """
+        Take stock from a location. Returns the remaining stock, or None if the
+        location does not have enough.
+        """
+        stmt = (
+            update(StockLevel)
+            .where(
+                StockLevel.product_id == product_id,
+                StockLevel.location_id == location_id,
+                StockLevel.stock >= quantity,
+            )
+            .values(stock=StockLevel.stock - quantity)
+            .execution_options(synchronize_session=False)
+        )
+        return self._returning_stock(db, stmt, product_id=product_id, location_id=location_id)
+
+    def allocate(
+        self,
+        db: Session,
+        *,
+        product_id: int,
+        quantity: float,
+        preferred_location_id: Optional[int] = None,
+    ) -> Optional[Tuple[int, int]]:
+        """
+        Take stock from the preferred location, if any, or else from the
+        location with the most stock that has enough. Returns (location_id,
+        remaining stock), or None if no single location can cover the quantity.
+        """
+        query = db.query(StockLevel.location_id).filter(
+            StockLevel.product_id == product_id, StockLevel.stock >= quantity
+        )
+        if preferred_location_id is not None:
+            remaining = self.decrement(
+                db, product_id=product_id, location_id=preferred_location_id, quantity=quantity
+            )
+            if remaining is not None:
+                return preferred_location_id, remaining
+            query = query.filter(StockLevel.location_id != preferred_location_id)
+        candidates = query.order_by(StockLevel.stock.desc()).all()
+        # Another sale may take the stock between the read and the update
+        for (location_id,) in candidates:
+            remaining = self.decrement(
+                db, product_id=product_id, location_id=location_id, quantity=quantity
+            )
+            if remaining is not None:
+                return location_id, remaining
+        return None
+
+    def get_by_product(self, db: Session, *, product_id: int) -> List[StockLevel]:
+        return (
+            db.query(StockLevel)
+            .filter(StockLevel.product_id == product_id)
+            .order_by(StockLevel.location_id)
+            .all()
+        )
+
+    def get_by_location_page(
+        self,
+        db: Session,
+        *,
+        location_id: int,
+        skip: int = 0,
+        limit: int = 100,
+        after: Optional[int] = None,
+    ) -> Tuple[List[StockLevel], Optional[int]]:
+        query = db.query(StockLevel).filter(StockLevel.location_id == location_id)
+        return paginate(query, StockLevel, skip=skip, limit=limit, after=after)
+
+location = CRUDLocation(Location)
+stock_level = CRUDStockLevel()
@@ -0,0 +1,83 @@
+from typing import Iterable, Optional
+
+from sqlalchemy import delete, insert
+from sqlalchemy.dialects import postgresql, sqlite
+from sqlalchemy.orm import Session
+
+from app.core.events import publish_after_commit
+from app.models.low_stock import LowStockProduct
+from app.models.product import Product
+
+class CRUDLowStock:
+    """
+    The set of products whose total stock (unassigned plus every location)
+    is at or below their min_quantity, maintained incrementally: every write
+    that changes a product's stock anywhere or its min_quantity calls `sync`
+    for that product before committing. Entering or
+    leaving the set publishes a `low_stock` event once the transaction commits.
+    """
+
+    def _insert(self, db: Session):
+        dialect = db.get_bind().dialect.name
+        if dialect == "postgresql":
+            return postgresql.insert(LowStockProduct).on_conflict_do_nothing()
+        if dialect == "sqlite":
+            return sqlite.insert(LowStockProduct).on_conflict_do_nothing()
+        return insert(LowStockProduct)
+
+    def sync(
+        self,
+        db: Session,
+        *,
+        product_ids: Optional[Iterable[int]] = None,
+        skus: Optional[Iterable[str]] = None,
+    ) -> int:
+        """
+        Bring the set in line with the current stock of the given products
+        (all products when neither `product_ids` nor `skus` is given), without
+        committing. Returns the number of products that entered or left it.
+        """
+        is_low = Product.total_stock <= Product.min_quantity
+        query = db.query(
+            Product.id, Product.name, Product.sku, Product.total_stock, Product.min_quantity,
+            is_low.label("is_low"), LowStockProduct.product_id.isnot(None).label("listed"),
+        ).outerjoin(LowStockProduct, LowStockProduct.product_id == Product.id)
+        if product_ids is not None:
+            query = query.filter(Product.id.in_(set(product_ids)))
+        if skus is not None:
+            query = query.filter(Product.sku.in_(set(skus)))
+        if product_ids is None and skus is None:
+            # A full pass only needs the products whose state may be wrong
+            query = query.filter(
+                (is_low & LowStockProduct.product_id.is_(None))
+                | (~is_low & LowStockProduct.product_id.isnot(None))
+            )
+
+        changed = [row for row in query.all() if bool(row.is_low) != bool(row.listed)]
+        entered = [row.id for row in changed if row.is_low]
+        left = [row.id for row in changed if not row.is_low]
+        if entered:
+            db.execute(self._insert(db), [{"product_id": id} for id in entered])
+        if left:
+            db.execute(
+                delete(LowStockProduct)
+                .where(LowStockProduct.product_id.in_(left))
+                .execution_options(synchronize_session=False)
+            )
+        for row in changed:
+            publish_after_commit(db, "low_stock", {
+                "product_id": row.id,
+                "name": row.name,
+                "sku": row.sku,
+                "stock": row.total_stock,
+                "min_quantity": row.min_quantity,
+                "low": bool(row.is_low),
+            })
+        return len(changed)
+
+    def remove(self, db: Session, *, product_id: int) -> None:
+        db.query(LowStockProduct).filter(
+            LowStockProduct.product_id == product_id
+        ).delete(synchronize_session=False)
+
+low_stock = CRUDLowStock()
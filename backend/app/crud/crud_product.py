@@ -1,78 +1,252 @@
-from typing import List, Optional, Any
+from typing import Any, Dict, Iterable, List, Optional, Tuple, Union
+import re
 
-from fastapi.encoders import jsonable_encoder
-from sqlalchemy.orm import Session, joinedload
+from sqlalchemy import case, func, literal_column, or_, update
+from sqlalchemy.engine import Row
+from sqlalchemy.orm import Session
 
-from app.crud.base import CRUDBase
-from app.models.product import Product
+from app.core.events import publish_after_commit
+from app.crud.base import CRUDBase, paginate
+from app.crud.crud_category import category as crud_category
+from app.crud.crud_low_stock import low_stock as crud_low_stock
+from app.crud.crud_supplier import supplier as crud_supplier
+from app.models.inventory import InventoryTransaction, StockSnapshot
+from app.models.location import StockLevel
+from app.models.sale import Sale
+from app.models.low_stock import LowStockProduct
+from app.models.product import Product, SEARCH_DOCUMENT
+from app.product_index import product_index
 from app.schemas.product import ProductCreate, ProductUpdate
 
 class CRUDProduct(CRUDBase[Product, ProductCreate, ProductUpdate]):
+    def with_references(
+        self,
+        db: Session,
+        products: List[Product],
+        references: Iterable[str] = ("category", "supplier"),
+    ) -> List[Product]:
+        """
+        Make the category and/or supplier of `products` available from the
+        reference data cache, instead of joining them into every query.
+        """
+        if "category" in references:
+            crud_category.prime(db, {product.category_id for product in products})
+        if "supplier" in references:
+            crud_supplier.prime(db, {product.supplier_id for product in products})
+        return products
+
+    def _publish(self, db: Session, action: str, db_obj: Product) -> None:
+        # Stock changes are published by the inventory ledger as `stock` events
+        publish_after_commit(db, "product", {
+            "action": action,
+            "id": db_obj.id,
+            "name": db_obj.name,
+            "sku": db_obj.sku,
+            "barcode": db_obj.barcode,
+            "price": db_obj.price,
+            "min_quantity": db_obj.min_quantity,
+            "category_id": db_obj.category_id,
+            "supplier_id": db_obj.supplier_id,
+        })
+
+    def _first(self, db: Session, query: Any) -> Optional[Product]:
+        product = query.first()
+        if product is not None:
+            self.with_references(db, [product])
+        return product
+
     def get_multi(
         self, db: Session, *, skip: int = 0, limit: int = 100
     ) -> List[Product]:
-        return (
-            db.query(self.model)
-            .options(joinedload(Product.category), joinedload(Product.supplier))
-            .offset(skip)
-            .limit(limit)
-            .all()
+        return self.with_references(db, db.query(self.model).offset(skip).limit(limit).all())
+
+    def get_multi_page(
+        self, db: Session, *, skip: int = 0, limit: int = 100, after: Optional[int] = None
+    ) -> Tuple[List[Product], Optional[int]]:
+        products, last_id = paginate(
+            db.query(self.model), self.model, skip=skip, limit=limit, after=after
         )
+        return self.with_references(db, products), last_id
 
     def get(self, db: Session, id: Any) -> Optional[Product]:
-        return (
-            db.query(self.model)
-            .options(joinedload(Product.category), joinedload(Product.supplier))
-            .filter(self.model.id == id)
-            .first()
-        )
+        return self._first(db, db.query(self.model).filter(self.model.id == id))
 
-    def create(self, db: Session, *, obj_in: ProductCreate) -> Product:
-        obj_in_data = jsonable_encoder(obj_in)
+    def create(self, db: Session, *, obj_in: Union[ProductCreate, Dict[str, Any]]) -> Product:
+        obj_in_data = obj_in if isinstance(obj_in, dict) else obj_in.model_dump()
         db_obj = self.model(**obj_in_data)
         db.add(db_obj)
+        db.flush()
+        crud_low_stock.sync(db, product_ids=[db_obj.id])
+        self._publish(db, "created", db_obj)
         db.commit()
         db.refresh(db_obj)
+        product_index.put(db_obj)
         return db_obj
 
-    def get_by_sku(self, db: Session, *, sku: str) -> Optional[Product]:
-        return (
-            db.query(self.model)
-            .options(joinedload(Product.category), joinedload(Product.supplier))
-            .filter(Product.sku == sku)
-            .first()
+    def update(
+        self, db: Session, *, db_obj: Product, obj_in: Union[ProductUpdate, Dict[str, Any]]
+    ) -> Product:
+        # Like CRUDBase.update, but the low stock set changes in the same commit
+        update_data = obj_in if isinstance(obj_in, dict) else obj_in.model_dump(exclude_unset=True)
+        for field, value in update_data.items():
+            if hasattr(db_obj, field):
+                setattr(db_obj, field, value)
+        db.add(db_obj)
+        db.flush()
+        if {"stock", "min_quantity"} & update_data.keys():
+            crud_low_stock.sync(db, product_ids=[db_obj.id])
+        self._publish(db, "updated", db_obj)
+        db.commit()
+        db.refresh(db_obj)
+        product_index.put(db_obj)
+        return db_obj
+
+    def has_history(self, db: Session, *, id: int) -> bool:
+        """
+        Whether the product has ledger rows, stock snapshots or sales, which
+        are kept for good and so keep the product from being deleted.
+        """
+        return any(
+            db.query(model.id).filter(model.product_id == id).first() is not None
+            for model in (InventoryTransaction, StockSnapshot, Sale)
         )
 
+    def remove(self, db: Session, *, id: int) -> Product:
+        # Only for products without history (see has_history); the ledger is
+        # append-only, so its rows are never deleted along with the product
+        for model in (StockLevel, LowStockProduct):
+            db.query(model).filter(model.product_id == id).delete(synchronize_session=False)
+        db_obj = db.query(self.model).get(id)
+        if db_obj is not None:
+            self._publish(db, "deleted", db_obj)
+        db_obj = super().remove(db, id=id)
+        product_index.invalidate(id)
+        return db_obj
+
+    def get_by_sku(self, db: Session, *, sku: str) -> Optional[Product]:
+        return self._first(db, db.query(self.model).filter(Product.sku == sku))
+
     def get_by_barcode(self, db: Session, *, barcode: str) -> Optional[Product]:
-        return (
-            db.query(self.model)
-            .options(joinedload(Product.category), joinedload(Product.supplier))
-            .filter(Product.barcode == barcode)
-            .first()
-        )
+        return self._first(db, db.query(self.model).filter(Product.barcode == barcode))
 
     def get_by_category(self, db: Session, *, category_id: int) -> List[Product]:
-        return (
-            db.query(self.model)
-            .options(joinedload(Product.category), joinedload(Product.supplier))
-            .filter(Product.category_id == category_id)
-            .all()
+        return self.with_references(
+            db, db.query(self.model).filter(Product.category_id == category_id).all()
         )
 
     def get_by_supplier(self, db: Session, *, supplier_id: int) -> List[Product]:
-        return (
-            db.query(self.model)
-            .options(joinedload(Product.category), joinedload(Product.supplier))
-            .filter(Product.supplier_id == supplier_id)
-            .all()
+        return self.with_references(
+            db, db.query(self.model).filter(Product.supplier_id == supplier_id).all()
+        )
+
+    def _update_stock(self, db: Session, *, product_id: int, stmt: Any) -> Optional[Row]:
+        columns = (Product.stock, Product.cost, Product.category_id)
+        stmt = stmt.execution_options(synchronize_session=False)
+        if db.get_bind().dialect.full_returning:
+            return db.execute(stmt.returning(*columns)).first()
+        if db.execute(stmt).rowcount != 1:
+            return None
+        return db.query(*columns).filter(Product.id == product_id).first()
+
+    def decrement_stock(self, db: Session, *, product_id: int, quantity: float) -> Optional[Row]:
+        """
+        Atomically take `quantity` units out of stock without committing.
+
+        The stock check happens inside the UPDATE, so concurrent sales cannot
+        oversell. Returns the remaining stock with the product's cost and
+        category_id, or None if the product does not exist or does not have
+        enough stock.
+        """
+        stmt = (
+            update(Product)
+            .where(Product.id == product_id, Product.stock >= quantity)
+            .values(stock=Product.stock - quantity)
+        )
+        return self._update_stock(db, product_id=product_id, stmt=stmt)
+
+    def increment_stock(self, db: Session, *, product_id: int, quantity: float) -> Optional[Row]:
+        """
+        Atomically put `quantity` units back into stock without committing.
+        Returns the same row as `decrement_stock`, or None if the product does not exist.
+        """
+        stmt = (
+            update(Product)
+            .where(Product.id == product_id)
+            .values(stock=Product.stock + quantity)
         )
+        return self._update_stock(db, product_id=product_id, stmt=stmt)
+
+    def set_stock(self, db: Session, *, product_id: int, stock: float) -> Optional[Row]:
+        """
+        Set the stock to a counted level without committing.
+        Returns the same row as `decrement_stock`, or None if the product does not exist.
+        """
+        stmt = update(Product).where(Product.id == product_id).values(stock=stock)
+        return self._update_stock(db, product_id=product_id, stmt=stmt)
 
-    def get_low_stock(self, db: Session) -> List[Product]:
-        return (
-            db.query(self.model)
-            .options(joinedload(Product.category), joinedload(Product.supplier))
-            .filter(Product.stock <= Product.min_quantity)
-            .all()
+    def get_low_stock(
+        self, db: Session, *, skip: int = 0, limit: int = 100, after: Optional[int] = None
+    ) -> Tuple[List[Product], Optional[int]]:
+        """
+        Products at or below their min_quantity, read from the low stock set
+        instead of comparing stock and min_quantity across the whole table.
+        """
+        query = db.query(self.model).join(
+            LowStockProduct, LowStockProduct.product_id == Product.id
         )
+        products, last_id = paginate(query, self.model, skip=skip, limit=limit, after=after)
+        return self.with_references(db, products), last_id
+
+    def search(
+        self,
+        db: Session,
+        *,
+        q: str,
+        created_by: Optional[int] = None,
+        skip: int = 0,
+        limit: int = 20,
+    ) -> List[Row]:
+        """
+        Ranked type-ahead search over name, SKU, barcode and description.
+
+        Exact SKU/barcode matches rank first, then name/SKU prefixes, then
+        substring, word-prefix and (on PostgreSQL) fuzzy name matches. Only the
+        columns of ProductSearchResult are loaded.
+        """
+        q = q.strip()
+        escaped = q.replace("\\", "\\\\").replace("%", "\\%").replace("_", "\\_")
+        contains, prefix = f"%{escaped}%", f"{escaped}%"
+        exact = or_(Product.sku == q, Product.barcode == q)
+        starts = or_(
+            Product.name.ilike(prefix, escape="\\"), Product.sku.ilike(prefix, escape="\\")
+        )
+        matches = [
+            exact,
+            Product.name.ilike(contains, escape="\\"),
+            Product.sku.ilike(contains, escape="\\"),
+            Product.barcode.ilike(contains, escape="\\"),
+        ]
+        rank = case((exact, 3.0), else_=0.0) + case((starts, 2.0), else_=0.0)
+
+        if db.get_bind().dialect.name == "postgresql":
+            # Served by the pg_trgm and full-text GIN indexes on products
+            matches.append(Product.name.op("%")(q))
+            rank = rank + func.similarity(Product.name, q)
+            words = re.findall(r"[^\W_]+", q)
+            if words:
+                document = literal_column(SEARCH_DOCUMENT)
+                query = func.to_tsquery("simple", " & ".join(f"{word}:*" for word in words))
+                matches.append(document.op("@@")(query))
+                rank = rank + func.ts_rank(document, query)
+        else:
+            matches.append(Product.description.ilike(contains, escape="\\"))
+
+        query = db.query(
+            Product.id, Product.name, Product.sku, Product.barcode,
+            Product.price, Product.stock, Product.total_stock, Product.category_id,
+        ).filter(or_(*matches))
+        if created_by is not None:
+            query = query.filter(Product.created_by == created_by)
+        return query.order_by(rank.desc(), Product.id).offset(skip).limit(limit).all()
 
 product = CRUDProduct(Product) 
\ No newline at end of file
@@ -1,16 +1,32 @@
-from typing import List, Optional
+from typing import Any, Dict, List, Optional, Tuple
 from datetime import datetime, timedelta
 from sqlalchemy.orm import Session, joinedload
-from sqlalchemy import func
-from fastapi.encoders import jsonable_encoder
+from sqlalchemy import bindparam, func, insert, or_, tuple_
 
-from app.crud.base import CRUDBase
+from app.core.events import publish_after_commit
+from app.crud.base import CRUDBase, paginate
+from app.crud.crud_analytics import analytics
+from app.crud.crud_inventory import inventory as crud_inventory
+from app.crud.crud_low_stock import low_stock as crud_low_stock
+from app.models.inventory import TransactionType
+from app.models.location import StockLevel
 from app.models.sale import Sale, Return
 from app.models.customer import Customer
+from app.models.product import Product
 from app.schemas.sale import SaleCreate, SaleUpdate, ReturnCreate, ReturnUpdate
 from app.schemas.customer import CustomerCreate, CustomerUpdate
 
 class CRUDSale(CRUDBase[Sale, SaleCreate, SaleUpdate]):
+    def _publish(self, db: Session, sales: List[Dict[str, Any]]) -> None:
+        for sale in sales:
+            publish_after_commit(db, "sale", {
+                field: sale.get(field)
+                for field in (
+                    "id", "product_id", "customer_id", "location_id",
+                    "quantity", "unit_price", "total_amount",
+                )
+            })
+
     def get_multi(
         self, db: Session, *, skip: int = 0, limit: int = 100
     ) -> List[Sale]:
@@ -22,16 +38,266 @@ class CRUDSale(CRUDBase[Sale, SaleCreate, SaleUpdate]):
             .all()
         )
 
+    def get_multi_page(
+        self, db: Session, *, skip: int = 0, limit: int = 100, after: Optional[int] = None
+    ) -> Tuple[List[Sale], Optional[int]]:
+        query = db.query(Sale).options(joinedload(Sale.product), joinedload(Sale.customer))
+        return paginate(query, Sale, skip=skip, limit=limit, after=after)
+
     def create_with_total(self, db: Session, *, obj_in: SaleCreate, created_by: int) -> Sale:
-        obj_in_data = jsonable_encoder(obj_in)
+        obj_in_data = obj_in.model_dump()
         total_amount = obj_in.quantity * obj_in.unit_price
         db_obj = Sale(**obj_in_data, total_amount=total_amount, created_by=created_by)
         db.add(db_obj)
+        db.flush()
+        self._publish(db, [{"id": db_obj.id, **obj_in_data, "total_amount": total_amount}])
         db.commit()
         db.refresh(db_obj)
         # Reload the object with relationships
         return db.query(Sale).options(joinedload(Sale.product), joinedload(Sale.customer)).filter(Sale.id == db_obj.id).first()
 
+    def create_with_stock(
+        self, db: Session, *, obj_in: SaleCreate, created_by: int
+    ) -> Optional[Sale]:
+        """
+        Take the sold quantity out of stock through the inventory ledger and
+        insert the sale in one transaction. With a location_id, the stock is
+        taken from that location, or from another one with enough stock.
+
+        Returns None, with nothing written, when the product is missing or does
+        not have enough stock.
+        """
+        applied = crud_inventory.apply(
+            db,
+            product_id=obj_in.product_id,
+            transaction_type=TransactionType.OUT,
+            quantity=obj_in.quantity,
+            location_id=obj_in.location_id,
+            fallback=True,
+            created_by=created_by,
+        )
+        if applied is None:
+            db.rollback()
+            return None
+        entry, product = applied
+        obj_in_data = obj_in.model_dump()
+        # The ledger may have allocated the sale to another location
+        obj_in_data["location_id"] = entry.location_id
+        total_amount = obj_in.quantity * obj_in.unit_price
+        db_obj = Sale(**obj_in_data, total_amount=total_amount, created_by=created_by)
+        db.add(db_obj)
+        db.flush()
+        sale_id = db_obj.id
+        entry.reference = f"sale:{sale_id}"
+        self._publish(db, [{"id": sale_id, **obj_in_data, "total_amount": total_amount}])
+        analytics.record_sales(db, lines=[{
+            "product_id": obj_in.product_id,
+            "category_id": product.category_id,
+            "customer_id": obj_in.customer_id,
+            "quantity": obj_in.quantity,
+            "revenue": total_amount,
+            "unit_cost": product.cost,
+            "at": db_obj.created_at,
+        }])
+        db.commit()
+        return db.query(Sale).options(joinedload(Sale.product), joinedload(Sale.customer)).filter(Sale.id == sale_id).first()
+
+    def _requested(self, lines: List[SaleCreate]) -> Dict[Tuple[int, Optional[int]], float]:
+        # Quantity per (product_id, location_id) over all lines
+        requested: Dict[Tuple[int, Optional[int]], float] = {}
+        for line in lines:
+            key = (line.product_id, line.location_id)
+            requested[key] = requested.get(key, 0) + line.quantity
+        return requested
+
+    def create_batch(
+        self, db: Session, *, obj_in: List[SaleCreate], created_by: int
+    ) -> Tuple[List[Sale], List[Dict[str, Any]]]:
+        """
+        Record several sale lines in one transaction, all or nothing.
+
+        Products and the stock counters the lines draw from (per location, or
+        the unassigned stock) are resolved and locked with one query each,
+        stock and customers are validated for every line, then stock updates, sale inserts
+        and ledger rows are each sent as one bulk statement. Lines with a
+        location are taken from it only. A product's lines without one are
+        taken from a single location with enough stock when the unassigned
+        stock cannot cover them all. Returns the created sales, or an empty list and one error per
+        offending line when nothing was written.
+        """
+        product_ids = sorted({line.product_id for line in obj_in})
+        unassigned_ids = sorted({line.product_id for line in obj_in if line.location_id is None})
+        query = db.query(Product.id, Product.stock, Product.cost, Product.category_id).order_by(Product.id)
+        products = {
+            row.id: row
+            for row in query.filter(Product.id.in_(unassigned_ids)).with_for_update().all()
+        }
+        # Products sold only from locations are read without locking their row
+        other_ids = [product_id for product_id in product_ids if product_id not in products]
+        if other_ids:
+            products.update((row.id, row) for row in query.filter(Product.id.in_(other_ids)).all())
+
+        requested = self._requested(obj_in)
+        # Products whose unassigned stock cannot cover their lines without a location
+        short_ids = [
+            product_id for product_id in unassigned_ids
+            if product_id in products and products[product_id].stock < requested[(product_id, None)]
+        ]
+
+        # Stock per (product_id, location_id), None being the unassigned stock
+        balances: Dict[Tuple[int, Optional[int]], float] = {
+            (product_id, None): products[product_id].stock
+            for product_id in unassigned_ids
+            if product_id in products
+        }
+        pairs = sorted({
+            (line.product_id, line.location_id) for line in obj_in if line.location_id is not None
+        })
+        conditions = []
+        if pairs:
+            conditions.append(tuple_(StockLevel.product_id, StockLevel.location_id).in_(pairs))
+        if short_ids:
+            conditions.append(StockLevel.product_id.in_(short_ids))
+        if conditions:
+            balances.update(
+                ((row.product_id, row.location_id), row.stock)
+                for row in db.query(StockLevel.product_id, StockLevel.location_id, StockLevel.stock)
+                .filter(or_(*conditions))
+                .order_by(StockLevel.product_id, StockLevel.location_id)
+                .with_for_update()
+                .all()
+            )
+
+        # Like single sales, fall back to the location with the most stock left
+        allocated: Dict[int, int] = {}
+        for product_id in short_ids:
+            spare = [
+                (stock - requested.get((key_product_id, location_id), 0), location_id)
+                for (key_product_id, location_id), stock in balances.items()
+                if key_product_id == product_id and location_id is not None
+            ]
+            best = max(spare, default=None)
+            if best is not None and best[0] >= requested[(product_id, None)]:
+                allocated[product_id] = best[1]
+        if allocated:
+            obj_in = [
+                line.model_copy(update={"location_id": allocated[line.product_id]})
+                if line.location_id is None and line.product_id in allocated
+                else line
+                for line in obj_in
+            ]
+            requested = self._requested(obj_in)
+
+        customer_ids = {
+            row.id
+            for row in db.query(Customer.id).filter(
+                Customer.id.in_({line.customer_id for line in obj_in})
+            )
+        }
+        errors = []
+        for index, line in enumerate(obj_in):
+            key = (line.product_id, line.location_id)
+            if line.customer_id not in customer_ids:
+                detail = "Customer not found"
+            elif line.product_id not in products:
+                detail = "Product not found"
+            elif balances.get(key, 0) < requested[key]:
+                detail = "Not enough stock"
+            else:
+                continue
+            errors.append({"index": index, "product_id": line.product_id, "detail": detail})
+        if errors:
+            db.rollback()
+            return [], errors
+
+        unassigned = [
+            {"product_id": product_id, "quantity": quantity}
+            for (product_id, location_id), quantity in requested.items()
+            if location_id is None
+        ]
+        if unassigned:
+            table = Product.__table__
+            db.execute(
+                table.update()
+                .where(table.c.id == bindparam("product_id"))
+                .values(stock=table.c.stock - bindparam("quantity")),
+                unassigned,
+            )
+        at_locations = [
+            {"level_product_id": product_id, "level_location_id": location_id, "quantity": quantity}
+            for (product_id, location_id), quantity in requested.items()
+            if location_id is not None
+        ]
+        if at_locations:
+            table = StockLevel.__table__
+            db.execute(
+                table.update()
+                .where(
+                    table.c.product_id == bindparam("level_product_id"),
+                    table.c.location_id == bindparam("level_location_id"),
+                )
+                .values(stock=table.c.stock - bindparam("quantity")),
+                at_locations,
+            )
+        crud_low_stock.sync(db, product_ids=product_ids)
+
+        rows = [
+            dict(
+                line.model_dump(),
+                total_amount=line.quantity * line.unit_price,
+                created_by=created_by,
+            )
+            for line in obj_in
+        ]
+        if db.get_bind().dialect.full_returning:
+            inserted = db.execute(
+                insert(Sale.__table__).values(rows)
+                .returning(Sale.__table__.c.id, Sale.__table__.c.created_at)
+            ).all()
+        else:
+            db_objs = [Sale(**row) for row in rows]
+            db.add_all(db_objs)
+            db.flush()
+            inserted = [(db_obj.id, db_obj.created_at) for db_obj in db_objs]
+        sale_ids = [sale_id for sale_id, _ in inserted]
+
+        # One ledger row per line, with the running balance it was taken from
+        entries = []
+        for line, sale_id in zip(obj_in, sale_ids):
+            key = (line.product_id, line.location_id)
+            balances[key] -= line.quantity
+            entries.append({
+                "product_id": line.product_id,
+                "location_id": line.location_id,
+                "transaction_type": TransactionType.OUT,
+                "quantity": line.quantity,
+                "balance_after": balances[key],
+                "reference": f"sale:{sale_id}",
+                "created_by": created_by,
+            })
+        crud_inventory.record(db, entries=entries)
+        self._publish(db, [{"id": sale_id, **row} for row, sale_id in zip(rows, sale_ids)])
+        analytics.record_sales(db, lines=[
+            {
+                "product_id": line.product_id,
+                "category_id": products[line.product_id].category_id,
+                "customer_id": line.customer_id,
+                "quantity": line.quantity,
+                "revenue": line.quantity * line.unit_price,
+                "unit_cost": products[line.product_id].cost,
+                "at": created_at,
+            }
+            for line, (_, created_at) in zip(obj_in, inserted)
+        ])
+        db.commit()
+        return (
+            db.query(Sale)
+            .options(joinedload(Sale.product), joinedload(Sale.customer))
+            .filter(Sale.id.in_(sale_ids))
+            .order_by(Sale.id)
+            .all()
+        ), []
+
     def get_by_customer(self, db: Session, *, customer_id: int) -> List[Sale]:
         return (
             db.query(Sale)
@@ -86,12 +352,63 @@ class CRUDCustomer(CRUDBase[Customer, CustomerCreate, CustomerUpdate]):
         return db.query(Customer).filter(Customer.phone == phone).first()
 
 class CRUDReturn(CRUDBase[Return, ReturnCreate, ReturnUpdate]):
+    def _publish(self, db: Session, db_obj: Return) -> None:
+        publish_after_commit(db, "return", {
+            "id": db_obj.id,
+            "sale_id": db_obj.sale_id,
+            "product_id": db_obj.product_id,
+            "quantity": db_obj.quantity,
+        })
+
     def create_with_user(
         self, db: Session, *, obj_in: ReturnCreate, created_by: int
     ) -> Return:
-        obj_in_data = jsonable_encoder(obj_in)
+        obj_in_data = obj_in.model_dump()
+        db_obj = Return(**obj_in_data, created_by=created_by)
+        db.add(db_obj)
+        db.flush()
+        self._publish(db, db_obj)
+        db.commit()
+        db.refresh(db_obj)
+        return db_obj
+
+    def create_with_stock(
+        self, db: Session, *, obj_in: ReturnCreate, sale: Sale, created_by: int
+    ) -> Optional[Return]:
+        """
+        Insert the return, put the quantity back into the stock it was sold
+        from through the inventory ledger and record the refund in the analytics rollups in one
+        transaction.
+
+        Returns None, with nothing written, when the product does not exist.
+        """
+        applied = crud_inventory.apply(
+            db,
+            product_id=obj_in.product_id,
+            transaction_type=TransactionType.IN,
+            quantity=obj_in.quantity,
+            location_id=sale.location_id,
+            created_by=created_by,
+        )
+        if applied is None:
+            db.rollback()
+            return None
+        entry, product = applied
+        obj_in_data = obj_in.model_dump()
         db_obj = Return(**obj_in_data, created_by=created_by)
         db.add(db_obj)
+        db.flush()
+        entry.reference = f"return:{db_obj.id}"
+        self._publish(db, db_obj)
+        analytics.record_returns(db, lines=[{
+            "product_id": obj_in.product_id,
+            "category_id": product.category_id,
+            "customer_id": sale.customer_id,
+            "quantity": obj_in.quantity,
+            "revenue": obj_in.quantity * sale.unit_price,
+            "unit_cost": product.cost,
+            "at": db_obj.created_at,
+        }])
         db.commit()
         db.refresh(db_obj)
         return db_obj
@@ -1,22 +1,22 @@
 from typing import List, Optional
 
-from fastapi.encoders import jsonable_encoder
 from sqlalchemy.orm import Session
 
-from app.crud.base import CRUDBase
+from app.crud.base import CachedCRUDBase
 from app.models.supplier import Supplier
-from app.schemas.supplier import SupplierCreate, SupplierUpdate
+from app.schemas.supplier import Supplier as SupplierSchema, SupplierCreate, SupplierUpdate
 
-class CRUDSupplier(CRUDBase[Supplier, SupplierCreate, SupplierUpdate]):
+class CRUDSupplier(CachedCRUDBase[Supplier, SupplierCreate, SupplierUpdate]):
     def create(self, db: Session, *, obj_in: SupplierCreate) -> Supplier:
-        obj_in_data = jsonable_encoder(obj_in)
+        obj_in_data = obj_in.model_dump()
         db_obj = self.model(**obj_in_data)
         db.add(db_obj)
         db.commit()
         db.refresh(db_obj)
+        self.invalidate()
         return db_obj
 
     def get_by_name(self, db: Session, *, name: str) -> Optional[Supplier]:
         return db.query(self.model).filter(Supplier.name == name).first()
 
-supplier = CRUDSupplier(Supplier) 
\ No newline at end of file
+supplier = CRUDSupplier(Supplier, schema=SupplierSchema, namespace="ref:supplier") 
\ No newline at end of file
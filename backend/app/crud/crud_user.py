@@ -1,28 +1,56 @@
 from typing import Any, Dict, Optional, Union
 import logging
 from sqlalchemy.orm import Session
+from starlette.concurrency import run_in_threadpool
 
-from app.core.security import get_password_hash, verify_password
+from app.core.cache import get_cache
+from app.core.config import settings
+from app.core.passwords import password_hasher
+from app.core.security import get_password_hash
 from app.crud.base import CRUDBase
 from app.models.user import User
-from app.schemas.user import UserCreate, UserUpdate
+from app.schemas.user import UserCreate, UserPrincipal, UserUpdate
 
 logger = logging.getLogger(__name__)
 
+principal_cache = get_cache(
+    "auth:user",
+    ttl=settings.AUTH_CACHE_TTL_SECONDS,
+    max_size=settings.AUTH_CACHE_MAX_SIZE,
+)
+
 class CRUDUser(CRUDBase[User, UserCreate, UserUpdate]):
     def get_by_email(self, db: Session, *, email: str) -> Optional[User]:
         return db.query(User).filter(User.email == email).first()
 
     def get(self, db: Session, id: Any) -> Optional[User]:
-        logger.debug(f"Attempting to get user with id: {id}")
-        user = db.query(User).filter(User.id == id).first()
-        if user:
-            logger.debug(f"Found user: {user.email}")
-        else:
-            logger.debug(f"No user found with id: {id}")
-        return user
+        return db.query(User).filter(User.id == id).first()
+
+    def get_principal(self, db: Session, *, id: int) -> Optional[UserPrincipal]:
+        """
+        Return the cached id/is_active/is_superuser view of a user, querying
+        the users table only on a cache miss.
+        """
+        cached = principal_cache.get(str(id))
+        if cached is not None:
+            return UserPrincipal(**cached)
+        row = (
+            db.query(User.id, User.is_active, User.is_superuser)
+            .filter(User.id == id)
+            .first()
+        )
+        if not row:
+            return None
+        principal = UserPrincipal.model_validate(row)
+        principal_cache.set(str(id), principal.model_dump())
+        return principal
+
+    def invalidate_principal(self, *, id: int) -> None:
+        principal_cache.delete(str(id))
 
     def create(self, db: Session, *, obj_in: UserCreate) -> User:
+        # Hashes in the calling thread: for scripts such as the bootstrap,
+        # request handlers go through the password hasher
         db_obj = User(
             email=obj_in.email,
             hashed_password=get_password_hash(obj_in.password),
@@ -45,14 +73,33 @@ class CRUDUser(CRUDBase[User, UserCreate, UserUpdate]):
             hashed_password = get_password_hash(update_data["password"])
             del update_data["password"]
             update_data["hashed_password"] = hashed_password
-        return super().update(db, db_obj=db_obj, obj_in=update_data)
+        db_obj = super().update(db, db_obj=db_obj, obj_in=update_data)
+        self.invalidate_principal(id=db_obj.id)
+        return db_obj
 
-    def authenticate(self, db: Session, *, email: str, password: str) -> Optional[User]:
-        user = self.get_by_email(db, email=email)
+    def remove(self, db: Session, *, id: int) -> User:
+        obj = super().remove(db, id=id)
+        self.invalidate_principal(id=id)
+        return obj
+
+    async def authenticate(self, db: Session, *, email: str, password: str) -> Optional[User]:
+        """
+        Return the user if the password matches, upgrading the stored hash
+        when it was made with outdated cost parameters. Queries run on the
+        threadpool; the password check is awaited without holding a thread.
+        """
+        user = await run_in_threadpool(self.get_by_email, db, email=email)
         if not user:
             return None
-        if not verify_password(password, user.hashed_password):
+        verified, new_hash = await password_hasher.verify_and_update(
+            password, user.hashed_password
+        )
+        if not verified:
             return None
+        if new_hash is not None:
+            user.hashed_password = new_hash
+            await run_in_threadpool(db.commit)
+            await run_in_threadpool(db.refresh, user)
         return user
 
     def is_active(self, user: User) -> bool:
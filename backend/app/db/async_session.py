@@ -0,0 +1,53 @@
+from typing import Any, Dict, Optional
+
+from sqlalchemy.engine import make_url
+from sqlalchemy.ext.asyncio import AsyncEngine, AsyncSession, create_async_engine
+from sqlalchemy.orm import sessionmaker
+
+from app.core.config import settings
+
+ASYNC_DRIVERS = {
+    "postgresql": "postgresql+asyncpg",
+    "sqlite": "sqlite+aiosqlite",
+}
+
+def async_database_uri(database_uri: str) -> str:
+    """
+    Swap the sync driver of a database URI for its asyncio counterpart.
+    """
+    url = make_url(database_uri)
+    return str(url.set(drivername=ASYNC_DRIVERS[url.get_backend_name()]))
+
+def async_engine_options(database_uri: str) -> Dict[str, Any]:
+    url = make_url(database_uri)
+    if url.get_backend_name() == "sqlite":
+        return {}
+    options: Dict[str, Any] = {
+        "pool_size": settings.DB_POOL_SIZE,
+        "max_overflow": settings.DB_MAX_OVERFLOW,
+        "pool_timeout": settings.DB_POOL_TIMEOUT,
+        "pool_recycle": settings.DB_POOL_RECYCLE,
+        "pool_pre_ping": settings.DB_POOL_PRE_PING,
+    }
+    if settings.DB_STATEMENT_TIMEOUT_MS:
+        options["connect_args"] = {
+            "server_settings": {"statement_timeout": str(settings.DB_STATEMENT_TIMEOUT_MS)}
+        }
+    return options
+
+async_engine: Optional[AsyncEngine] = None
+AsyncSessionLocal = sessionmaker(class_=AsyncSession, autoflush=False, expire_on_commit=False)
+
+def get_async_engine() -> AsyncEngine:
+    """
+    Create the async engine on first use, so the asyncpg driver is only
+    required when USE_ASYNC_DB is enabled.
+    """
+    global async_engine
+    if async_engine is None:
+        async_engine = create_async_engine(
+            async_database_uri(settings.SQLALCHEMY_DATABASE_URI),
+            **async_engine_options(settings.SQLALCHEMY_DATABASE_URI),
+        )
+        AsyncSessionLocal.configure(bind=async_engine)
+    return async_engine
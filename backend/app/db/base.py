@@ -4,6 +4,9 @@ from app.models.user import User
 from app.models.product import Product
 from app.models.category import Category
 from app.models.supplier import Supplier
-from app.models.inventory import InventoryTransaction
+from app.models.inventory import InventoryTransaction, StockSnapshot
 from app.models.customer import Customer
-from app.models.sale import Sale, Return 
\ No newline at end of file
+from app.models.sale import Sale, Return
+from app.models.analytics import SalesRollup, SalesRollupDelta
+from app.models.location import Location, StockLevel
+from app.models.low_stock import LowStockProduct
\ No newline at end of file
@@ -0,0 +1,51 @@
+import threading
+import time
+from typing import Any, Dict
+
+from sqlalchemy import exc
+from sqlalchemy.pool import QueuePool
+
+from app.core.metrics import DB_POOL_TIMEOUTS, DB_POOL_WAIT
+
+class InstrumentedQueuePool(QueuePool):
+    """
+    QueuePool that counts checkouts which had to wait for a free connection.
+    """
+
+    def __init__(self, *args: Any, **kw: Any):
+        super().__init__(*args, **kw)
+        self._stats_lock = threading.Lock()
+        self.waits = 0
+        self.wait_time = 0.0
+        self.timeouts = 0
+
+    def _do_get(self) -> Any:
+        # Only time checkouts that can block: no idle connection and no overflow left
+        if self.checkedin() > 0 or self._max_overflow < 0 or self.overflow() < self._max_overflow:
+            return super()._do_get()
+        start = time.perf_counter()
+        try:
+            return super()._do_get()
+        except exc.TimeoutError:
+            with self._stats_lock:
+                self.timeouts += 1
+            DB_POOL_TIMEOUTS.inc()
+            raise
+        finally:
+            waited = time.perf_counter() - start
+            with self._stats_lock:
+                self.waits += 1
+                self.wait_time += waited
+            DB_POOL_WAIT.observe(waited)
+
+    def stats(self) -> Dict[str, Any]:
+        return {
+            "size": self.size(),
+            "max_overflow": self._max_overflow,
+            "checked_in": self.checkedin(),
+            "checked_out": self.checkedout(),
+            "overflow": max(0, self.overflow()),
+            "waits": self.waits,
+            "wait_time_seconds": round(self.wait_time, 6),
+            "timeouts": self.timeouts,
+        }
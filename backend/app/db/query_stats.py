@@ -0,0 +1,199 @@
+"""
+Per-request SQL statement counts and timings.
+
+Listeners on every Engine (sync, and the sync core of the async engine) time
+each statement executed while a request is tracked by QueryStatsMiddleware.
+The request's QueryStats lives in a context variable, which the threadpool
+and the async driver's greenlets inherit, so statements run from sync
+endpoints, dependencies and async endpoints all count towards the request
+that caused them. Per-route totals are kept in `query_metrics`.
+"""
+from collections import Counter
+from contextlib import contextmanager
+from contextvars import ContextVar
+from typing import Any, Dict, Iterator, List, Optional, Tuple
+import logging
+import threading
+import time
+
+from sqlalchemy import event
+from sqlalchemy.engine import Engine
+
+from app.core.config import settings
+
+logger = logging.getLogger(__name__)
+
+# Longest statement text kept for reports and log lines
+MAX_STATEMENT_LENGTH = 500
+
+class QueryStats:
+    """
+    Statements executed within one request (or one assert_max_queries block).
+    """
+
+    def __init__(self, *, keep_statements: bool = False):
+        self.count = 0
+        self.total_seconds = 0.0
+        self.slowest_seconds = 0.0
+        self.slowest_statement: Optional[str] = None
+        # Executions of each distinct statement; parameters are bound
+        # separately, so a query run once per row shows up as one key
+        self.executions: "Counter[str]" = Counter()
+        self.statements: Optional[List[str]] = [] if keep_statements else None
+        # The DB-API parameters of each kept statement
+        self.parameters: Optional[List[Any]] = [] if keep_statements else None
+
+    def record(self, statement: str, seconds: float, parameters: Any = None) -> None:
+        self.count += 1
+        self.total_seconds += seconds
+        self.executions[statement] += 1
+        if seconds >= self.slowest_seconds:
+            self.slowest_seconds = seconds
+            self.slowest_statement = statement
+        if self.statements is not None:
+            self.statements.append(statement)
+        if self.parameters is not None:
+            self.parameters.append(parameters)
+
+    def repeated(self, threshold: int) -> List[Tuple[str, int]]:
+        """
+        Statements executed at least `threshold` times, most repeated first.
+        """
+        return [
+            (statement, n) for statement, n in self.executions.most_common() if n >= threshold
+        ]
+
+_current: ContextVar[Optional[QueryStats]] = ContextVar("query_stats", default=None)
+# assert_max_queries blocks, which see statements from every thread
+_collectors: List[QueryStats] = []
+_collectors_lock = threading.Lock()
+
+def _tracking() -> bool:
+    return _current.get() is not None or bool(_collectors)
+
+@event.listens_for(Engine, "before_cursor_execute")
+def _before_cursor_execute(conn, cursor, statement, parameters, context, executemany) -> None:
+    if _tracking():
+        conn.info.setdefault("query_started", []).append(time.perf_counter())
+
+@event.listens_for(Engine, "after_cursor_execute")
+def _after_cursor_execute(conn, cursor, statement, parameters, context, executemany) -> None:
+    started = conn.info.get("query_started")
+    if not started:
+        return
+    seconds = time.perf_counter() - started.pop()
+    stats = _current.get()
+    if stats is not None:
+        stats.record(statement, seconds)
+    if _collectors:
+        with _collectors_lock:
+            for collector in _collectors:
+                collector.record(statement, seconds, parameters)
+
+@contextmanager
+def track_queries() -> Iterator[QueryStats]:
+    """
+    Count the statements executed in this context until the block exits.
+    """
+    stats = QueryStats()
+    token = _current.set(stats)
+    try:
+        yield stats
+    finally:
+        _current.reset(token)
+
+@contextmanager
+def capture_queries() -> Iterator[QueryStats]:
+    """
+    Keep every statement the block runs, from any thread, with its
+    parameters; for tests.
+    """
+    stats = QueryStats(keep_statements=True)
+    with _collectors_lock:
+        _collectors.append(stats)
+    try:
+        yield stats
+    finally:
+        with _collectors_lock:
+            _collectors.remove(stats)
+
+@contextmanager
+def assert_max_queries(max_queries: int) -> Iterator[QueryStats]:
+    """
+    Fail with the list of statements when the block runs more than
+    `max_queries` of them, from any thread. For tests, e.g.
+
+        with assert_max_queries(4):
+            client.post("/api/v1/sales", json=sale, headers=headers)
+    """
+    with capture_queries() as stats:
+        yield stats
+    if stats.count > max_queries:
+        listing = "\n".join(
+            f"{n}. {statement[:MAX_STATEMENT_LENGTH]}"
+            for n, statement in enumerate(stats.statements or (), 1)
+        )
+        raise AssertionError(
+            f"Expected at most {max_queries} queries, {stats.count} were executed:\n{listing}"
+        )
+
+class QueryMetrics:
+    """
+    Per-route totals of the tracked requests of this worker process.
+    """
+
+    def __init__(self, *, repeat_threshold: int, slow_seconds: float):
+        self.repeat_threshold = repeat_threshold
+        self.slow_seconds = slow_seconds
+        self._lock = threading.Lock()
+        self._routes: Dict[str, Dict[str, Any]] = {}
+
+    def observe(self, route: str, stats: QueryStats) -> None:
+        """
+        Add a finished request to its route's totals, and log a warning for
+        repeated statements (likely N+1 queries) and slow statements.
+        """
+        repeated = stats.repeated(self.repeat_threshold)
+        for statement, n in repeated:
+            logger.warning(
+                "%s ran the same statement %d times, likely an N+1 query: %s",
+                route, n, statement[:MAX_STATEMENT_LENGTH],
+            )
+        if stats.slowest_statement is not None and stats.slowest_seconds >= self.slow_seconds:
+            logger.warning(
+                "%s ran a statement for %.0f ms: %s",
+                route, stats.slowest_seconds * 1000, stats.slowest_statement[:MAX_STATEMENT_LENGTH],
+            )
+        with self._lock:
+            totals = self._routes.setdefault(route, {
+                "requests": 0, "queries": 0, "max_queries": 0, "db_seconds": 0.0,
+                "slowest_seconds": 0.0, "slowest_statement": None, "repeated_statements": 0,
+            })
+            totals["requests"] += 1
+            totals["queries"] += stats.count
+            totals["max_queries"] = max(totals["max_queries"], stats.count)
+            totals["db_seconds"] += stats.total_seconds
+            totals["repeated_statements"] += len(repeated)
+            if stats.slowest_statement is not None and stats.slowest_seconds >= totals["slowest_seconds"]:
+                totals["slowest_seconds"] = stats.slowest_seconds
+                totals["slowest_statement"] = stats.slowest_statement[:MAX_STATEMENT_LENGTH]
+
+    def snapshot(self) -> List[Dict[str, Any]]:
+        """
+        Routes by total database time, most expensive first.
+        """
+        with self._lock:
+            routes = [dict(totals, route=route) for route, totals in self._routes.items()]
+        for totals in routes:
+            totals["mean_queries"] = round(totals["queries"] / totals["requests"], 2)
+            totals["mean_db_ms"] = round(totals["db_seconds"] * 1000 / totals["requests"], 3)
+        return sorted(routes, key=lambda totals: totals["db_seconds"], reverse=True)
+
+    def reset(self) -> None:
+        with self._lock:
+            self._routes.clear()
+
+query_metrics = QueryMetrics(
+    repeat_threshold=settings.QUERY_STATS_REPEAT_THRESHOLD,
+    slow_seconds=settings.QUERY_STATS_SLOW_MS / 1000,
+)
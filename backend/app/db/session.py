@@ -1,18 +1,57 @@
+from typing import Any, Dict
+
 from sqlalchemy import create_engine
+from sqlalchemy.engine import make_url
 from sqlalchemy.orm import sessionmaker
 from sqlalchemy.ext.declarative import declarative_base
 
 from app.core.config import settings
+from app.db.pool import InstrumentedQueuePool
+
+def engine_options(database_uri: str) -> Dict[str, Any]:
+    """
+    Build create_engine() keyword arguments from the DB_* settings.
+    """
+    url = make_url(database_uri)
+    if url.get_backend_name() == "sqlite":
+        # Local/test databases: SQLAlchemy picks the pool, sessions hop threads
+        return {"connect_args": {"check_same_thread": False}}
 
-engine = create_engine(settings.SQLALCHEMY_DATABASE_URI, pool_pre_ping=True)
+    options: Dict[str, Any] = {
+        "poolclass": InstrumentedQueuePool,
+        "pool_size": settings.DB_POOL_SIZE,
+        "max_overflow": settings.DB_MAX_OVERFLOW,
+        "pool_timeout": settings.DB_POOL_TIMEOUT,
+        "pool_recycle": settings.DB_POOL_RECYCLE,
+        "pool_pre_ping": settings.DB_POOL_PRE_PING,
+    }
+    if url.get_backend_name() == "postgresql":
+        if url.get_driver_name() == "psycopg2":
+            options["executemany_mode"] = settings.DB_EXECUTEMANY_MODE
+        if settings.DB_STATEMENT_TIMEOUT_MS:
+            options["connect_args"] = {
+                "options": f"-c statement_timeout={settings.DB_STATEMENT_TIMEOUT_MS}"
+            }
+    return options
+
+engine = create_engine(settings.SQLALCHEMY_DATABASE_URI, **engine_options(settings.SQLALCHEMY_DATABASE_URI))
 SessionLocal = sessionmaker(autocommit=False, autoflush=False, bind=engine)
 
 Base = declarative_base()
 
+def get_pool_stats() -> Dict[str, Any]:
+    """
+    Connection pool usage of this worker process.
+    """
+    pool = engine.pool
+    if isinstance(pool, InstrumentedQueuePool):
+        return pool.stats()
+    return {"status": pool.status()}
+
 # Dependency
 def get_db():
     db = SessionLocal()
     try:
         yield db
     finally:
-        db.close() 
\ No newline at end of file
+        db.close()
@@ -1,7 +1,11 @@
+from typing import Any, Dict, List
 import logging
+from sqlalchemy import insert
 from sqlalchemy.orm import Session
 
-from app import crud, schemas
+from app import crud
+from app.models.category import Category
+from app.models.supplier import Supplier
 from app.db import base  # noqa: F401
 from app.db.session import SessionLocal
 
@@ -51,22 +55,31 @@ SUPPLIERS = [
     }
 ]
 
-def init_db(db: Session) -> None:
-    # Create categories
-    for category_data in CATEGORIES:
-        category = crud.category.get_by_name(db, name=category_data["name"])
-        if not category:
-            category_in = schemas.CategoryCreate(**category_data)
-            crud.category.create(db, obj_in=category_in)
-            logger.info(f"Created category: {category_data['name']}")
+def seed(db: Session, model: Any, rows: List[Dict[str, Any]]) -> List[str]:
+    """
+    Insert the rows whose name is not in the table yet, with one query for
+    the existing names and one bulk insert. Does not commit. Returns the
+    names inserted.
+    """
+    names = [row["name"] for row in rows]
+    existing = {name for (name,) in db.query(model.name).filter(model.name.in_(names))}
+    missing = [row for row in rows if row["name"] not in existing]
+    if missing:
+        db.execute(insert(model.__table__), missing)
+    return [row["name"] for row in missing]
 
-    # Create suppliers
-    for supplier_data in SUPPLIERS:
-        supplier = crud.supplier.get_by_name(db, name=supplier_data["name"])
-        if not supplier:
-            supplier_in = schemas.SupplierCreate(**supplier_data)
-            crud.supplier.create(db, obj_in=supplier_in)
-            logger.info(f"Created supplier: {supplier_data['name']}")
+def init_db(db: Session) -> None:
+    created = {
+        "categories": seed(db, Category, CATEGORIES),
+        "suppliers": seed(db, Supplier, SUPPLIERS),
+    }
+    db.commit()
+    # The rows were inserted behind the reference data cache
+    crud.category.invalidate()
+    crud.supplier.invalidate()
+    for table, names in created.items():
+        if names:
+            logger.info("Created %s: %s", table, ", ".join(names))
 
 def main() -> None:
     logger.info("Creating initial data")
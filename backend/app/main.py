@@ -1,14 +1,24 @@
 from fastapi import FastAPI, Request
 from fastapi.middleware.cors import CORSMiddleware
+from fastapi.responses import ORJSONResponse
 from starlette.middleware.base import BaseHTTPMiddleware
-from starlette.responses import RedirectResponse
+from starlette.responses import RedirectResponse, Response
+from app.core import metrics
 from app.core.config import settings
+from app.core.etag import body_etag, is_fresh
 from app.api.api_v1.api import api_router
-from app.db.session import SessionLocal
-from app.db.init_db import init_db
-from app.initial_data import init_db as init_initial_data
+from app.db.query_stats import query_metrics, track_queries
+from app.db.session import SessionLocal, engine
+from app.bootstrap import bootstrap
+from app.core.passwords import password_hasher
+from app.core.stream import stream_broker
+from app.notifications import low_stock_digest
+from app.product_index import product_index
+from app.rollups import rollup_folder
 import uvicorn
 import logging
+import threading
+import time
 
 logging.basicConfig(level=logging.INFO)
 logger = logging.getLogger(__name__)
@@ -25,16 +35,115 @@ class TrailingSlashMiddleware(BaseHTTPMiddleware):
                 )
         return response
 
+class ConditionalGetMiddleware(BaseHTTPMiddleware):
+    """
+    Answer GET requests with 304 Not Modified when the response's ETag or
+    Last-Modified matches the request. Endpoints that set validators derived
+    from the data raise NotModified before serializing; other small JSON
+    responses get an ETag hashed from their body, which saves the transfer.
+    """
+
+    async def dispatch(self, request: Request, call_next):
+        response = await call_next(request)
+        if request.method != "GET" or response.status_code != 200:
+            return response
+        etag = response.headers.get("etag")
+        body = None
+        if (
+            etag is None
+            and response.headers.get("content-type", "").startswith("application/json")
+            and 0 <= int(response.headers.get("content-length", -1)) <= settings.ETAG_MAX_BODY_BYTES
+        ):
+            body = b"".join([chunk async for chunk in response.body_iterator])
+            etag = body_etag(body)
+        if is_fresh(request.headers, etag=etag, last_modified=response.headers.get("last-modified")):
+            headers = {
+                name: value for name, value in response.headers.items()
+                if name not in ("content-length", "content-type")
+            }
+            headers["etag"] = etag
+            return Response(status_code=304, headers=headers)
+        if body is not None:
+            headers = dict(response.headers, etag=etag)
+            return Response(content=body, status_code=response.status_code, headers=headers)
+        return response
+
+class QueryStatsMiddleware(BaseHTTPMiddleware):
+    """
+    Count and time the SQL statements of each request, per route. With
+    QUERY_STATS_HEADERS the totals are also sent back as X-DB-* headers;
+    statements run while a streaming body is sent are not included there.
+    """
+
+    async def dispatch(self, request: Request, call_next):
+        with track_queries() as stats:
+            response = await call_next(request)
+        route = request.scope.get("route")
+        query_metrics.observe(
+            f"{request.method} {route.path if route is not None else '<unmatched>'}", stats
+        )
+        if settings.QUERY_STATS_HEADERS:
+            response.headers["X-DB-Query-Count"] = str(stats.count)
+            response.headers["X-DB-Time-Ms"] = f"{stats.total_seconds * 1000:.3f}"
+            response.headers["X-DB-Slowest-Ms"] = f"{stats.slowest_seconds * 1000:.3f}"
+        return response
+
+class MetricsMiddleware:
+    """
+    Record each request's route, status, duration and response size for
+    /metrics. Plain ASGI rather than BaseHTTPMiddleware, so that streamed
+    responses are timed and measured up to their last chunk.
+    """
+
+    def __init__(self, app):
+        self.app = app
+
+    async def __call__(self, scope, receive, send):
+        if scope["type"] != "http":
+            await self.app(scope, receive, send)
+            return
+        status = 500
+        size = 0
+
+        async def send_and_measure(message):
+            nonlocal status, size
+            if message["type"] == "http.response.start":
+                status = message["status"]
+            elif message["type"] == "http.response.body":
+                size += len(message.get("body", b""))
+            await send(message)
+
+        metrics.REQUESTS_IN_PROGRESS.inc()
+        started = time.perf_counter()
+        try:
+            await self.app(scope, receive, send_and_measure)
+        finally:
+            metrics.REQUESTS_IN_PROGRESS.dec()
+            metrics.observe_request(scope, status, time.perf_counter() - started, size)
+
 app = FastAPI(
     title=settings.PROJECT_NAME,
     openapi_url=f"{settings.API_V1_STR}/openapi.json",
     # Disable automatic redirect
-    redirect_slashes=False
+    redirect_slashes=False,
+    # Render responses with orjson instead of json.dumps
+    default_response_class=ORJSONResponse,
 )
 
 # Add trailing slash middleware
 app.add_middleware(TrailingSlashMiddleware)
 
+# Add conditional GET (ETag / Last-Modified) middleware
+app.add_middleware(ConditionalGetMiddleware)
+
+# Add per-request SQL statement counting
+if settings.QUERY_STATS_ENABLED:
+    app.add_middleware(QueryStatsMiddleware)
+
+# Add Prometheus request metrics
+if settings.METRICS_ENABLED:
+    app.add_middleware(MetricsMiddleware)
+
 # Set up CORS middleware
 app.add_middleware(
     CORSMiddleware,
@@ -42,6 +151,11 @@ app.add_middleware(
     allow_credentials=False,  # Must be False for wildcard origins
     allow_methods=["*"],  # Allow all methods
     allow_headers=["*"],  # Allow all headers
+    # Keyset pagination cursor, conditional GETs, query stats
+    expose_headers=[
+        "X-Next-Cursor", "ETag", "Last-Modified",
+        "X-DB-Query-Count", "X-DB-Time-Ms", "X-DB-Slowest-Ms",
+    ],
 )
 
 # Include API router with explicit prefix
@@ -55,13 +169,52 @@ async def root():
         "docs_url": "/docs"
     }
 
+if settings.METRICS_ENABLED:
+    @app.get("/metrics", include_in_schema=False)
+    def read_metrics() -> Response:
+        content, content_type = metrics.render()
+        return Response(content=content, media_type=content_type)
+
+def warm_product_index() -> None:
+    db = SessionLocal()
+    try:
+        product_index.warm_up(db)
+    finally:
+        db.close()
+
 @app.on_event("startup")
 async def startup_event():
-    logger.info("Creating initial data")
-    db = SessionLocal()
-    init_db(db)  # Initialize database tables
-    init_initial_data(db)  # Initialize initial data
-    db.close()
+    started = time.monotonic()
+    if settings.METRICS_ENABLED:
+        metrics.start(engine)
+    password_hasher.start()
+    low_stock_digest.start()
+    stream_broker.start()
+    rollup_folder.start()
+    if settings.FAST_BOOT:
+        # Tables and seed data come from `python -m app.bootstrap`, run once per deploy;
+        # lookups fall back to the database until the index is warm
+        if settings.PRODUCT_INDEX_ENABLED:
+            threading.Thread(
+                target=warm_product_index, name="product-index-warm-up", daemon=True
+            ).start()
+    else:
+        logger.info("Creating initial data")
+        bootstrap(migrate_schema=False)
+        if settings.PRODUCT_INDEX_ENABLED:
+            warm_product_index()
+    logger.info(
+        "Startup finished in %.2fs (FAST_BOOT=%s)", time.monotonic() - started, settings.FAST_BOOT
+    )
+
+@app.on_event("shutdown")
+async def shutdown_event():
+    password_hasher.shutdown()
+    low_stock_digest.stop()
+    stream_broker.stop()
+    rollup_folder.stop()
+    if settings.METRICS_ENABLED:
+        metrics.stop()
 
 if __name__ == "__main__":
     uvicorn.run(app, host="0.0.0.0", port=8000) 
\ No newline at end of file
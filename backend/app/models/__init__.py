@@ -2,6 +2,9 @@ from .user import User
 from .product import Product
 from .category import Category
 from .supplier import Supplier
-from .inventory import InventoryTransaction
+from .inventory import InventoryTransaction, StockSnapshot, TransactionType
 from .customer import Customer
-from .sale import Sale, Return 
\ No newline at end of file
+from .sale import Sale, Return
+from .analytics import SalesRollup, SalesRollupDelta
+from .location import Location, StockLevel
+from .low_stock import LowStockProduct
@@ -0,0 +1,47 @@
+from sqlalchemy import Column, Integer, Float, String, DateTime, Index, UniqueConstraint
+
+from app.db.base_class import Base
+
+class RollupColumns:
+    granularity = Column(String(8), nullable=False)  # "hour" or "day"
+    bucket_start = Column(DateTime(timezone=True), nullable=False)
+    dimension = Column(String(16), nullable=False)  # "product", "category" or "customer"
+    dimension_id = Column(Integer, nullable=False)
+    sales_count = Column(Integer, nullable=False, default=0)
+    units = Column(Float, nullable=False, default=0)
+    revenue = Column(Float, nullable=False, default=0)
+    cost = Column(Float, nullable=False, default=0)
+    returns_count = Column(Integer, nullable=False, default=0)
+    returned_units = Column(Float, nullable=False, default=0)
+    returned_revenue = Column(Float, nullable=False, default=0)
+    returned_cost = Column(Float, nullable=False, default=0)
+
+class SalesRollup(RollupColumns, Base):
+    """
+    Pre-aggregated sales and returns per hour/day bucket for one product,
+    category or customer, folded in from `sales_rollup_deltas`.
+    """
+    __tablename__ = "sales_rollups"
+
+    id = Column(Integer, primary_key=True, index=True)
+
+    __table_args__ = (
+        UniqueConstraint(
+            "granularity", "dimension", "dimension_id", "bucket_start",
+            name="uq_sales_rollups_bucket",
+        ),
+        Index("ix_sales_rollups_range", "granularity", "dimension", "bucket_start"),
+    )
+
+class SalesRollupDelta(RollupColumns, Base):
+    """
+    Rollup increments appended in the transaction of each sale or return.
+    Insert-only, so concurrent sales never wait on a shared rollup row.
+    """
+    __tablename__ = "sales_rollup_deltas"
+
+    id = Column(Integer, primary_key=True)
+
+    __table_args__ = (
+        Index("ix_sales_rollup_deltas_range", "granularity", "dimension", "bucket_start"),
+    )
@@ -1,4 +1,4 @@
-from sqlalchemy import Column, Integer, Float, String, ForeignKey, DateTime, Enum
+from sqlalchemy import Column, Integer, Float, String, ForeignKey, DateTime, Enum, Index
 from sqlalchemy.orm import relationship
 from sqlalchemy.sql import func
 import enum
@@ -15,8 +15,13 @@ class InventoryTransaction(Base):
 
     id = Column(Integer, primary_key=True, index=True)
     product_id = Column(Integer, ForeignKey("products.id"), nullable=False)
+    # NULL for stock that is not assigned to a location
+    location_id = Column(Integer, ForeignKey("locations.id"), nullable=True)
     quantity = Column(Integer, nullable=False)
     transaction_type = Column(Enum(TransactionType), nullable=False)
+    # Stock at the location (or of the unassigned stock) right after this
+    # transaction; NULL for rows written before the ledger
+    balance_after = Column(Integer, nullable=True)
     reference = Column(String, nullable=True)
     notes = Column(String, nullable=True)
     created_at = Column(DateTime(timezone=True), server_default=func.now())
@@ -24,4 +29,31 @@ class InventoryTransaction(Base):
 
     # Relationships
     product = relationship("Product", back_populates="inventory_transactions")
-    user = relationship("User", back_populates="inventory_transactions") 
\ No newline at end of file
+    user = relationship("User", back_populates="inventory_transactions")
+
+    __table_args__ = (
+        Index("ix_inventory_transactions_created_by_id", "created_by", "id"),
+        Index("ix_inventory_transactions_product_id_created_by", "product_id", "created_by"),
+        # Latest ledger row of a product at a point in time
+        Index(
+            "ix_inventory_transactions_product_location_created_at",
+            "product_id", "location_id", "created_at", "id",
+        ),
+    )
+
+class StockSnapshot(Base):
+    """
+    Stock of every product at a point in time, taken periodically so that
+    historical stock is known even for changes made outside the ledger.
+    """
+    __tablename__ = "stock_snapshots"
+
+    id = Column(Integer, primary_key=True, index=True)
+    product_id = Column(Integer, ForeignKey("products.id"), nullable=False)
+    location_id = Column(Integer, ForeignKey("locations.id"), nullable=True)
+    stock = Column(Integer, nullable=False)
+    taken_at = Column(DateTime(timezone=True), nullable=False, server_default=func.now())
+
+    __table_args__ = (
+        Index("ix_stock_snapshots_product_location_taken_at", "product_id", "location_id", "taken_at"),
+    ) 
\ No newline at end of file
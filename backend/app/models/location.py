@@ -0,0 +1,37 @@
+from sqlalchemy import Column, Integer, String, Text, DateTime, ForeignKey, Index, UniqueConstraint
+from sqlalchemy.sql import func
+from sqlalchemy.orm import relationship
+
+from app.db.base_class import Base
+
+class Location(Base):
+    __tablename__ = "locations"
+
+    id = Column(Integer, primary_key=True, index=True)
+    name = Column(String, unique=True, index=True, nullable=False)
+    address = Column(Text)
+    created_at = Column(DateTime(timezone=True), server_default=func.now())
+    updated_at = Column(DateTime(timezone=True), onupdate=func.now())
+
+    stock_levels = relationship("StockLevel", back_populates="location")
+
+class StockLevel(Base):
+    """
+    Stock of one product at one location. Stock that is not assigned to any
+    location stays in `Product.stock`, so each site has its own row to update.
+    """
+    __tablename__ = "stock_levels"
+
+    id = Column(Integer, primary_key=True, index=True)
+    product_id = Column(Integer, ForeignKey("products.id"), nullable=False)
+    location_id = Column(Integer, ForeignKey("locations.id"), nullable=False)
+    stock = Column(Integer, nullable=False, default=0)
+    updated_at = Column(DateTime(timezone=True), server_default=func.now(), onupdate=func.now())
+
+    product = relationship("Product")
+    location = relationship("Location", back_populates="stock_levels")
+
+    __table_args__ = (
+        UniqueConstraint("product_id", "location_id", name="uq_stock_levels_product_location"),
+        Index("ix_stock_levels_location_id_product_id", "location_id", "product_id"),
+    )
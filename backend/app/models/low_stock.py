@@ -0,0 +1,15 @@
+from sqlalchemy import Column, Integer, DateTime, ForeignKey
+from sqlalchemy.sql import func
+
+from app.db.base_class import Base
+
+class LowStockProduct(Base):
+    """
+    Products whose total stock is at or below their min_quantity. Kept
+    in step with every stock change by `crud.low_stock.sync`, in the same
+    transaction, so listing low stock never scans the products table.
+    """
+    __tablename__ = "low_stock_products"
+
+    product_id = Column(Integer, ForeignKey("products.id"), primary_key=True)
+    since = Column(DateTime(timezone=True), server_default=func.now(), nullable=False)
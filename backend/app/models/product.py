@@ -1,7 +1,11 @@
-from sqlalchemy import Column, Integer, String, Float, DateTime, ForeignKey, Text
+from sqlalchemy import Column, Integer, String, Float, DateTime, ForeignKey, Text, Index, DDL, event, select, text
 from sqlalchemy.sql import func
-from sqlalchemy.orm import relationship
+from sqlalchemy.orm import column_property, relationship
 from app.db.base_class import Base
+from app.models.location import StockLevel
+
+# Text searched by GET /products/search, matched by the ix_products_search index
+SEARCH_DOCUMENT = "to_tsvector('simple', coalesce(name, '') || ' ' || coalesce(description, ''))"
 
 class Product(Base):
     __tablename__ = "products"
@@ -15,8 +19,8 @@ class Product(Base):
     cost = Column(Float, nullable=False)
     stock = Column(Integer, nullable=False)
     min_quantity = Column(Integer, nullable=False, default=0)
-    category_id = Column(Integer, ForeignKey("categories.id"))
-    supplier_id = Column(Integer, ForeignKey("suppliers.id"))
+    category_id = Column(Integer, ForeignKey("categories.id"), index=True)
+    supplier_id = Column(Integer, ForeignKey("suppliers.id"), index=True)
     created_by = Column(Integer, ForeignKey("users.id"), nullable=False)
     created_at = Column(DateTime(timezone=True), server_default=func.now())
     updated_at = Column(DateTime(timezone=True), onupdate=func.now())
@@ -25,4 +29,46 @@ class Product(Base):
     supplier = relationship("Supplier", back_populates="products")
     inventory_transactions = relationship("InventoryTransaction", back_populates="product")
     sales = relationship("Sale", back_populates="product")
-    created_by_user = relationship("User", back_populates="products")
\ No newline at end of file
+    created_by_user = relationship("User", back_populates="products")
+
+    # `stock` is the stock not assigned to any location; the total adds up
+    # every location's stock_levels row
+    total_stock = column_property(
+        stock + func.coalesce(
+            select(func.sum(StockLevel.stock))
+            .where(StockLevel.product_id == id)
+            .correlate_except(StockLevel)
+            .scalar_subquery(),
+            0,
+        )
+    )
+    # Last change to the stock at any location, which `stock` and
+    # `updated_at` do not reflect
+    stock_levels_changed_at = column_property(
+        select(func.max(StockLevel.updated_at))
+        .where(StockLevel.product_id == id)
+        .correlate_except(StockLevel)
+        .scalar_subquery(),
+        deferred=True,
+    )
+
+    __table_args__ = (
+        Index("ix_products_created_by_id", "created_by", "id"),
+        # Unique among products that have a barcode
+        Index(
+            "ix_products_barcode", "barcode", unique=True,
+            postgresql_where=text("barcode IS NOT NULL AND barcode != ''"),
+            sqlite_where=text("barcode IS NOT NULL AND barcode != ''"),
+        ),
+    )
+
+# Search indexes are PostgreSQL only (pg_trgm and full-text); other databases
+# fall back to LIKE scans in CRUDProduct.search.
+for statement in (
+    "CREATE EXTENSION IF NOT EXISTS pg_trgm",
+    "CREATE INDEX IF NOT EXISTS ix_products_name_trgm ON products USING gin (name gin_trgm_ops)",
+    "CREATE INDEX IF NOT EXISTS ix_products_sku_trgm ON products USING gin (sku gin_trgm_ops)",
+    "CREATE INDEX IF NOT EXISTS ix_products_barcode_trgm ON products USING gin (barcode gin_trgm_ops)",
+    f"CREATE INDEX IF NOT EXISTS ix_products_search ON products USING gin (({SEARCH_DOCUMENT}))",
+):
+    event.listen(Product.__table__, "after_create", DDL(statement).execute_if(dialect="postgresql"))
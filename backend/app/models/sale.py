@@ -1,4 +1,4 @@
-from sqlalchemy import Column, Integer, String, Float, ForeignKey, DateTime, Text
+from sqlalchemy import Column, Integer, String, Float, ForeignKey, DateTime, Text, Index
 from sqlalchemy.orm import relationship
 from sqlalchemy.sql import func
 
@@ -11,25 +11,35 @@ class Sale(Base):
     __tablename__ = "sales"
 
     id = Column(Integer, primary_key=True, index=True)
-    product_id = Column(Integer, ForeignKey("products.id"), nullable=False)
-    customer_id = Column(Integer, ForeignKey("customers.id"), nullable=False)
+    product_id = Column(Integer, ForeignKey("products.id"), nullable=False, index=True)
+    customer_id = Column(Integer, ForeignKey("customers.id"), nullable=False, index=True)
+    location_id = Column(Integer, ForeignKey("locations.id"), nullable=True)
     quantity = Column(Integer, nullable=False)
     unit_price = Column(Float, nullable=False)
     total_amount = Column(Float, nullable=False)
     notes = Column(String, nullable=True)
-    created_at = Column(DateTime(timezone=True), server_default=func.now())
+    created_at = Column(DateTime(timezone=True), server_default=func.now(), index=True)
     created_by = Column(Integer, ForeignKey("users.id"), nullable=False)
 
     product = relationship("Product", back_populates="sales")
     customer = relationship("Customer", back_populates="sales")
     created_by_user = relationship("User", back_populates="sales")
 
+    __table_args__ = (
+        # Per-user listing in id (cursor) order, optionally within a date range
+        Index("ix_sales_created_by_id", "created_by", "id"),
+        Index("ix_sales_created_by_created_at_id", "created_by", "created_at", "id"),
+    )
+    # created_at is read back with the insert (RETURNING where supported), so
+    # the analytics rollups bucket the sale by it
+    __mapper_args__ = {"eager_defaults": True}
+
 class Return(Base):
     __tablename__ = "returns"
 
     id = Column(Integer, primary_key=True, index=True)
-    sale_id = Column(Integer, ForeignKey("sales.id"), nullable=False)
-    product_id = Column(Integer, ForeignKey("products.id"), nullable=False)
+    sale_id = Column(Integer, ForeignKey("sales.id"), nullable=False, index=True)
+    product_id = Column(Integer, ForeignKey("products.id"), nullable=False, index=True)
     quantity = Column(Float, nullable=False)
     reason = Column(Text, nullable=True)
     created_by = Column(Integer, ForeignKey("users.id"), nullable=False)
@@ -38,4 +48,6 @@ class Return(Base):
 
     sale = relationship("Sale")
     product = relationship("Product")
-    created_by_user = relationship("User") 
\ No newline at end of file
+    created_by_user = relationship("User")
+
+    __mapper_args__ = {"eager_defaults": True} 
\ No newline at end of file
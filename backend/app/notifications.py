@@ -0,0 +1,125 @@
+"""
+Low stock digests.
+
+LowStockDigest listens to the `low_stock` events published when a product
+enters or leaves the low stock set and, every LOW_STOCK_DIGEST_SECONDS, sends
+one message listing what changed since the previous digest through the sink
+chosen by LOW_STOCK_NOTIFY_SINK: "log", "smtp" or "none". A product that
+changes several times within one interval is reported once, in its latest
+state. Each app worker sends digests for the changes it committed.
+"""
+from email.message import EmailMessage
+from typing import Any, Dict, List, Optional, Protocol
+import logging
+import smtplib
+import threading
+
+from app.core.config import settings
+from app.core.events import bus
+
+logger = logging.getLogger(__name__)
+
+class NotificationSink(Protocol):
+    def send(self, subject: str, body: str) -> None:
+        ...
+
+class LogSink:
+    def send(self, subject: str, body: str) -> None:
+        logger.warning("%s\n%s", subject, body)
+
+class SMTPSink:
+    def __init__(self, *, host: str, port: int, sender: str, recipients: List[str]):
+        self.host = host
+        self.port = port
+        self.sender = sender
+        self.recipients = recipients
+
+    def send(self, subject: str, body: str) -> None:
+        message = EmailMessage()
+        message["Subject"] = subject
+        message["From"] = self.sender
+        message["To"] = ", ".join(self.recipients)
+        message.set_content(body)
+        with smtplib.SMTP(self.host, self.port, timeout=10) as smtp:
+            smtp.send_message(message)
+
+def get_sink() -> Optional[NotificationSink]:
+    if settings.LOW_STOCK_NOTIFY_SINK == "log":
+        return LogSink()
+    if settings.LOW_STOCK_NOTIFY_SINK == "smtp":
+        return SMTPSink(
+            host=settings.SMTP_HOST,
+            port=settings.SMTP_PORT,
+            sender=settings.LOW_STOCK_NOTIFY_FROM,
+            recipients=[address.strip() for address in settings.LOW_STOCK_NOTIFY_TO.split(",")],
+        )
+    return None
+
+class LowStockDigest:
+    def __init__(self, *, interval: float):
+        self.interval = interval
+        self.sink: Optional[NotificationSink] = None
+        self._changes: Dict[int, Dict[str, Any]] = {}
+        self._lock = threading.Lock()
+        self._stopped = threading.Event()
+        self._thread: Optional[threading.Thread] = None
+
+    def handle(self, topic: str, payload: Dict[str, Any]) -> None:
+        with self._lock:
+            self._changes[payload["product_id"]] = payload
+
+    def flush(self) -> int:
+        """
+        Send the changes collected since the last digest, if any. Returns the
+        number of products in the digest.
+        """
+        with self._lock:
+            changes, self._changes = self._changes, {}
+        if not changes or self.sink is None:
+            return 0
+        low = [change for change in changes.values() if change["low"]]
+        restocked = [change for change in changes.values() if not change["low"]]
+        lines = [f"Low on stock ({len(low)}):"]
+        lines += [
+            f"  {change['name']} ({change['sku']}): {change['stock']} left, minimum {change['min_quantity']}"
+            for change in low
+        ]
+        lines += ["", f"Back in stock ({len(restocked)}):"]
+        lines += [
+            f"  {change['name']} ({change['sku']}): {change['stock']}" for change in restocked
+        ]
+        try:
+            self.sink.send(
+                f"Low stock: {len(low)} product(s) low, {len(restocked)} back in stock",
+                "\n".join(lines),
+            )
+        except Exception:
+            logger.exception("Could not send the low stock digest")
+        return len(changes)
+
+    def _run(self) -> None:
+        while not self._stopped.wait(self.interval):
+            self.flush()
+
+    def start(self) -> None:
+        self.sink = get_sink()
+        if self.sink is None or self._thread is not None:
+            return
+        self._stopped.clear()
+        bus.subscribe("low_stock", self.handle)
+        self._thread = threading.Thread(target=self._run, name="low-stock-digest", daemon=True)
+        self._thread.start()
+
+    def stop(self) -> None:
+        """
+        Stop collecting and send what is left.
+        """
+        if self._thread is None:
+            return
+        bus.unsubscribe("low_stock", self.handle)
+        self._stopped.set()
+        self._thread.join()
+        self._thread = None
+        self.flush()
+
+low_stock_digest = LowStockDigest(interval=settings.LOW_STOCK_DIGEST_SECONDS)
@@ -0,0 +1,319 @@
+"""
+Bulk product import from CSV or NDJSON.
+
+Rows are validated against ProductCreate in batches, category and supplier
+names are resolved to ids once per import, and every batch is written with a
+single upsert on `sku`. On PostgreSQL (psycopg2) each batch is first loaded
+into a temporary staging table with COPY.
+
+    python -m app.product_import catalog.csv --user admin@example.com
+"""
+from typing import IO, Any, Dict, FrozenSet, Iterator, List, Optional, Set, Sequence, Tuple
+import argparse
+import csv
+import io
+import json
+import logging
+
+from pydantic import TypeAdapter, ValidationError
+from sqlalchemy import bindparam, func, text, update
+from sqlalchemy.dialects import postgresql, sqlite
+from sqlalchemy.orm import Session
+
+from app import crud
+from app.core.config import settings
+from app.core.events import publish_after_commit
+from app.product_index import product_index
+from app.models.category import Category
+from app.models.inventory import TransactionType
+from app.models.product import Product
+from app.models.supplier import Supplier
+from app.schemas.product import ProductCreate
+from app.schemas.product_import import ProductImportError, ProductImportReport
+
+logger = logging.getLogger(__name__)
+
+COLUMNS = (
+    "name", "description", "sku", "barcode", "price", "cost", "stock",
+    "min_quantity", "category_id", "supplier_id",
+)
+
+products_adapter = TypeAdapter(List[ProductCreate])
+
+def read_records(stream: IO[str], format: str) -> Iterator[Dict[str, Any]]:
+    """
+    Yield one dict per CSV row or NDJSON line. Empty CSV cells become None.
+    """
+    if format == "csv":
+        for record in csv.DictReader(stream):
+            yield {key.strip(): (value.strip() or None) if isinstance(value, str) else value
+                   for key, value in record.items() if key}
+    else:
+        for line in stream:
+            if line.strip():
+                yield json.loads(line)
+
+class ProductImporter:
+    def __init__(self, db: Session, *, created_by: int, batch_size: Optional[int] = None):
+        self.db = db
+        self.created_by = created_by
+        self.batch_size = batch_size or settings.IMPORT_BATCH_SIZE
+        self.report = ProductImportReport()
+        self.seen_skus: Set[str] = set()
+        self.seen_barcodes: Set[str] = set()
+        # Names are resolved once per import, not once per row
+        self.categories = dict(db.query(Category.name, Category.id).all())
+        self.suppliers = dict(db.query(Supplier.name, Supplier.id).all())
+
+    def run(self, records: Iterator[Dict[str, Any]]) -> ProductImportReport:
+        batch: List[Tuple[int, Dict[str, Any]]] = []
+        row = 0
+        try:
+            for row, record in enumerate(records, start=1):
+                batch.append((row, record))
+                if len(batch) >= self.batch_size:
+                    self._import_batch(batch)
+                    batch = []
+        except (csv.Error, json.JSONDecodeError, UnicodeDecodeError) as e:
+            # Everything after an unreadable record is skipped
+            self.report.total += 1
+            self._fail(row + 1, None, f"Unreadable input: {e}")
+        if batch:
+            self._import_batch(batch)
+        self.report.errors.sort(key=lambda error: error.row)
+        return self.report
+
+    def _fail(self, row: int, sku: Optional[str], *errors: str) -> None:
+        self.report.failed += 1
+        if len(self.report.errors) < settings.IMPORT_MAX_ERRORS:
+            self.report.errors.append(ProductImportError(row=row, sku=sku, errors=list(errors)))
+
+    def _resolve(self, record: Dict[str, Any]) -> List[str]:
+        errors = []
+        for field, names in (("category", self.categories), ("supplier", self.suppliers)):
+            name = record.pop(field, None) or record.pop(f"{field}_name", None)
+            if name is None:
+                continue
+            if name not in names:
+                errors.append(f"{field}: unknown {field} '{name}'")
+            elif record.get(f"{field}_id") is None:
+                record[f"{field}_id"] = names[name]
+        return errors
+
+    def _validate(
+        self, batch: List[Tuple[int, Dict[str, Any]]]
+    ) -> List[Tuple[int, ProductCreate]]:
+        pending = []
+        for row, record in batch:
+            if not isinstance(record, dict):
+                self._fail(row, None, "Expected an object")
+                continue
+            errors = self._resolve(record)
+            if errors:
+                self._fail(row, record.get("sku"), *errors)
+            else:
+                pending.append((row, record))
+
+        # Validate the whole batch in one call; on failure drop the rows the
+        # errors point at and validate the rest again.
+        products: List[ProductCreate] = []
+        while pending:
+            try:
+                products = products_adapter.validate_python([record for _, record in pending])
+                break
+            except ValidationError as e:
+                invalid: Dict[int, List[str]] = {}
+                for error in e.errors():
+                    index = error["loc"][0]
+                    field = ".".join(str(part) for part in error["loc"][1:])
+                    invalid.setdefault(index, []).append(f"{field}: {error['msg']}")
+                for index in sorted(invalid):
+                    row, record = pending[index]
+                    self._fail(row, record.get("sku"), *invalid[index])
+                pending = [item for index, item in enumerate(pending) if index not in invalid]
+        return [(row, product) for (row, _), product in zip(pending, products)]
+
+    def _import_batch(self, batch: List[Tuple[int, Dict[str, Any]]]) -> None:
+        self.report.total += len(batch)
+        validated = self._validate(batch)
+
+        skus = [product.sku for _, product in validated if product.sku]
+        barcodes = [product.barcode for _, product in validated if product.barcode]
+        existing = self.db.query(
+            Product.sku, Product.created_by, Product.stock
+        ).filter(Product.sku.in_(skus)).all() if skus else []
+        owners = {row.sku: row.created_by for row in existing}
+        previous_stock = {row.sku: row.stock for row in existing}
+        taken_barcodes = dict(
+            self.db.query(Product.barcode, Product.sku).filter(Product.barcode.in_(barcodes)).all()
+        ) if barcodes else {}
+
+        rows = []
+        # Columns given by each row; the others are left alone on existing products
+        present: List[FrozenSet[str]] = []
+        updated = 0
+        for row, product in validated:
+            if not product.sku:
+                self._fail(row, None, "sku: required for import")
+            elif product.sku in self.seen_skus:
+                self._fail(row, product.sku, "sku: duplicate in import")
+            elif owners.get(product.sku, self.created_by) != self.created_by:
+                self._fail(row, product.sku, "sku: belongs to another user")
+            elif product.barcode and (
+                product.barcode in self.seen_barcodes
+                or taken_barcodes.get(product.barcode, product.sku) != product.sku
+            ):
+                self._fail(row, product.sku, "barcode: already used by another product")
+            else:
+                self.seen_skus.add(product.sku)
+                if product.barcode:
+                    self.seen_barcodes.add(product.barcode)
+                updated += product.sku in owners
+                rows.append(product.model_dump(include=set(COLUMNS)))
+                present.append(frozenset(product.model_fields_set & set(COLUMNS)))
+
+        if not rows:
+            return
+        bind = self.db.get_bind()
+        copy = bind.dialect.name == "postgresql" and bind.dialect.driver == "psycopg2"
+        # One upsert per set of given columns, usually a single one per file
+        groups: Dict[FrozenSet[str], List[Dict[str, Any]]] = {}
+        for row, columns in zip(rows, present):
+            groups.setdefault(columns, []).append(row)
+        for columns, group in groups.items():
+            # Stock changes of existing products go through the ledger below
+            updated_columns = [
+                name for name in COLUMNS if name in columns and name not in ("sku", "stock")
+            ]
+            if copy:
+                self._copy_upsert(group, updated_columns)
+            else:
+                self._upsert(group, updated_columns)
+        self._record_stock(rows, previous_stock)
+        written = [row["sku"] for row in rows]
+        crud.low_stock.sync(self.db, skus=written)
+        publish_after_commit(self.db, "product", {"action": "imported", "skus": written})
+        self.db.commit()
+        self.report.inserted += len(rows) - updated
+        self.report.updated += updated
+
+    def _record_stock(self, rows: List[Dict[str, Any]], previous_stock: Dict[str, int]) -> None:
+        """
+        Set the unassigned stock of existing products whose stock changed,
+        and append an ADJUSTMENT ledger row for those and an opening one for
+        every new product.
+        """
+        changed = [row for row in rows if previous_stock.get(row["sku"]) != row["stock"]]
+        if not changed:
+            return
+        ids = dict(
+            self.db.query(Product.sku, Product.id)
+            .filter(Product.sku.in_([row["sku"] for row in changed]))
+            .all()
+        )
+        # In id order, like every other multi-product stock update
+        changed.sort(key=lambda row: ids[row["sku"]])
+        adjusted = [row for row in changed if row["sku"] in previous_stock]
+        if adjusted:
+            table = Product.__table__
+            self.db.execute(
+                update(table)
+                .where(table.c.id == bindparam("product_id"))
+                .values(stock=bindparam("new_stock"), updated_at=func.now()),
+                [{"product_id": ids[row["sku"]], "new_stock": row["stock"]} for row in adjusted],
+            )
+        crud.inventory.record(self.db, entries=[
+            {
+                "product_id": ids[row["sku"]],
+                "location_id": None,
+                "transaction_type": TransactionType.ADJUSTMENT,
+                "quantity": row["stock"],
+                "balance_after": row["stock"],
+                "reference": "import",
+                "created_by": self.created_by,
+            }
+            for row in changed
+        ])
+
+    def _upsert(self, rows: List[Dict[str, Any]], updated_columns: Sequence[str]) -> None:
+        dialect = self.db.get_bind().dialect.name
+        insert = postgresql.insert if dialect == "postgresql" else sqlite.insert
+        stmt = insert(Product.__table__)
+        stmt = stmt.on_conflict_do_update(
+            index_elements=["sku"],
+            set_=dict(
+                {name: stmt.excluded[name] for name in updated_columns},
+                updated_at=func.now(),
+            ),
+        )
+        self.db.execute(stmt, [dict(row, created_by=self.created_by) for row in rows])
+
+    def _copy_upsert(self, rows: List[Dict[str, Any]], updated_columns: Sequence[str]) -> None:
+        buffer = io.StringIO()
+        writer = csv.writer(buffer)
+        writer.writerows([row[name] for name in COLUMNS] for row in rows)
+        buffer.seek(0)
+
+        columns = ", ".join(COLUMNS)
+        # Shared by the upserts of one batch, dropped when it commits
+        self.db.execute(text(
+            "CREATE TEMP TABLE IF NOT EXISTS product_import_staging ("
+            "name varchar, description varchar, sku varchar, barcode varchar, "
+            "price float, cost float, stock integer, min_quantity integer, "
+            "category_id integer, supplier_id integer"
+            ") ON COMMIT DROP"
+        ))
+        self.db.execute(text("TRUNCATE product_import_staging"))
+        cursor = self.db.connection().connection.cursor()
+        cursor.copy_expert(
+            f"COPY product_import_staging ({columns}) FROM STDIN WITH (FORMAT csv)", buffer
+        )
+        self.db.execute(
+            text(
+                f"INSERT INTO products ({columns}, created_by, created_at) "
+                f"SELECT {columns}, :created_by, now() FROM product_import_staging "
+                "ON CONFLICT (sku) DO UPDATE SET "
+                + "".join(f"{name} = excluded.{name}, " for name in updated_columns)
+                + "updated_at = now() WHERE products.created_by = excluded.created_by"
+            ),
+            {"created_by": self.created_by},
+        )
+
+def import_products(
+    db: Session, stream: IO[str], *, format: str, created_by: int
+) -> ProductImportReport:
+    """
+    Import products from a text stream of CSV or NDJSON records. Columns are
+    the fields of ProductCreate; `category` and `supplier` may give names
+    instead of ids. Existing products of the same user are updated by sku;
+    columns missing from a record keep their current values.
+    """
+    report = ProductImporter(db, created_by=created_by).run(read_records(stream, format))
+    # The upserts bypass CRUDProduct, so pick the changes up explicitly
+    product_index.refresh(db, force=True)
+    return report
+
+def main() -> None:
+    from app.db.session import SessionLocal
+
+    parser = argparse.ArgumentParser(description="Import products from CSV or NDJSON.")
+    parser.add_argument("path")
+    parser.add_argument("--user", required=True, help="Email of the user owning the products")
+    parser.add_argument("--format", choices=["csv", "ndjson"])
+    args = parser.parse_args()
+    format = args.format or ("ndjson" if args.path.endswith((".ndjson", ".jsonl")) else "csv")
+
+    db = SessionLocal()
+    try:
+        user = crud.user.get_by_email(db, email=args.user)
+        if not user:
+            parser.error(f"Unknown user {args.user}")
+        with open(args.path, encoding="utf-8-sig", newline="") as stream:
+            report = import_products(db, stream, format=format, created_by=user.id)
+    finally:
+        db.close()
+    print(report.model_dump_json(indent=2))
+
+if __name__ == "__main__":
+    logging.basicConfig(level=logging.INFO)
+    main()
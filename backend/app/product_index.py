@@ -0,0 +1,161 @@
+"""
+In-process barcode/SKU index for the checkout scanner path.
+
+Every worker keeps a map of barcode and SKU to a small product summary, warmed
+at startup and updated by CRUDProduct on create/update/delete. Changes made by
+other workers (or by bulk imports) are picked up by an incremental refresh on
+`created_at`/`updated_at` every PRODUCT_INDEX_REFRESH_SECONDS; deletions made
+by another worker are only seen after a restart, so callers acting on a
+summary must still handle a missing product.
+"""
+from typing import Dict, Iterable, List, NamedTuple, Optional, Tuple
+from datetime import datetime, timedelta
+import logging
+import threading
+import time
+
+from sqlalchemy import func, or_
+from sqlalchemy.orm import Session
+
+from app.core.config import settings
+from app.models.product import Product
+
+logger = logging.getLogger(__name__)
+
+# Rows committed slightly out of timestamp order are re-read by the next refresh
+REFRESH_OVERLAP = timedelta(seconds=5)
+FETCH_SIZE = 10000
+
+class ProductSummary(NamedTuple):
+    id: int
+    name: str
+    sku: Optional[str]
+    barcode: Optional[str]
+    price: float
+    category_id: Optional[int]
+
+COLUMNS = (Product.id, Product.name, Product.sku, Product.barcode, Product.price, Product.category_id)
+
+class ProductIndex:
+    def __init__(self, *, refresh_seconds: float):
+        self.refresh_seconds = refresh_seconds
+        self.warm = False
+        self._by_barcode: Dict[str, ProductSummary] = {}
+        self._by_sku: Dict[str, ProductSummary] = {}
+        self._by_id: Dict[int, ProductSummary] = {}
+        self._watermark: Optional[datetime] = None
+        self._refreshed_at = 0.0
+        self._lock = threading.Lock()
+
+    def __len__(self) -> int:
+        return len(self._by_id)
+
+    def _put(self, summary: ProductSummary) -> None:
+        self._drop(summary.id)
+        self._by_id[summary.id] = summary
+        if summary.barcode:
+            self._by_barcode[summary.barcode] = summary
+        if summary.sku:
+            self._by_sku[summary.sku] = summary
+
+    def _drop(self, product_id: int) -> None:
+        old = self._by_id.pop(product_id, None)
+        if old is None:
+            return
+        if old.barcode and self._by_barcode.get(old.barcode) is old:
+            del self._by_barcode[old.barcode]
+        if old.sku and self._by_sku.get(old.sku) is old:
+            del self._by_sku[old.sku]
+
+    def _load(self, db: Session, query) -> None:
+        changed_at = func.coalesce(Product.updated_at, Product.created_at)
+        for row in query.add_columns(changed_at).yield_per(FETCH_SIZE):
+            *values, at = row
+            self._put(ProductSummary(*values))
+            if at is not None and (self._watermark is None or at > self._watermark):
+                self._watermark = at
+
+    def warm_up(self, db: Session) -> None:
+        """
+        Load every product. Meant to run once per worker at startup.
+        """
+        started = time.monotonic()
+        with self._lock:
+            self._by_barcode, self._by_sku, self._by_id = {}, {}, {}
+            self._watermark = None
+            self._load(db, db.query(*COLUMNS))
+            self._refreshed_at = time.monotonic()
+            self.warm = True
+        logger.info(
+            "Product index warmed with %d products in %.2fs", len(self), time.monotonic() - started
+        )
+
+    def refresh(self, db: Session, *, force: bool = False) -> None:
+        """
+        Reload the products created or updated since the last load, at most
+        once every `refresh_seconds` unless forced.
+        """
+        if not self.warm or (
+            not force and time.monotonic() - self._refreshed_at < self.refresh_seconds
+        ):
+            return
+        # Only one thread refreshes; the others keep serving the current data
+        if not self._lock.acquire(blocking=force):
+            return
+        try:
+            query = db.query(*COLUMNS)
+            if self._watermark is not None:
+                changed_at = func.coalesce(Product.updated_at, Product.created_at)
+                query = query.filter(changed_at >= self._watermark - REFRESH_OVERLAP)
+            self._load(db, query)
+            self._refreshed_at = time.monotonic()
+        finally:
+            self._lock.release()
+
+    def put(self, product: Product) -> None:
+        if self.warm:
+            with self._lock:
+                self._put(ProductSummary(*(getattr(product, column.key) for column in COLUMNS)))
+
+    def invalidate(self, product_id: int) -> None:
+        if self.warm:
+            with self._lock:
+                self._drop(product_id)
+
+    def lookup(self, db: Session, codes: Iterable[str]) -> Dict[str, ProductSummary]:
+        """
+        Resolve barcodes or SKUs to product summaries, preferring a barcode
+        match. Codes missing from the index are looked up in the database with
+        a single query, and the products found are added to the index. Codes
+        that match no product are left out of the result.
+        """
+        self.refresh(db)
+        found: Dict[str, ProductSummary] = {}
+        missing: List[str] = []
+        for code in dict.fromkeys(codes):
+            summary = self._by_barcode.get(code) or self._by_sku.get(code)
+            if summary is not None:
+                found[code] = summary
+            else:
+                missing.append(code)
+        if missing:
+            rows = db.query(*COLUMNS).filter(
+                or_(Product.barcode.in_(missing), Product.sku.in_(missing))
+            ).all()
+            by_code: Dict[Tuple[str, str], ProductSummary] = {}
+            for row in rows:
+                summary = ProductSummary(*row)
+                if self.warm:
+                    with self._lock:
+                        self._put(summary)
+                if summary.barcode:
+                    by_code[("barcode", summary.barcode)] = summary
+                if summary.sku:
+                    by_code[("sku", summary.sku)] = summary
+            for code in missing:
+                summary = by_code.get(("barcode", code)) or by_code.get(("sku", code))
+                if summary is not None:
+                    found[code] = summary
+        return found
+
+product_index = ProductIndex(refresh_seconds=settings.PRODUCT_INDEX_REFRESH_SECONDS)
@@ -0,0 +1,56 @@
+"""
+Background folding of `sales_rollup_deltas` into `sales_rollups`.
+
+Sales and returns append their rollup increments as deltas; every
+ANALYTICS_FOLD_SECONDS this thread adds them up into the rollup buckets, so
+the deltas table stays small. Analytics reads include pending deltas, so the
+interval only bounds that table's size, not how fresh the numbers are.
+"""
+from typing import Optional
+import logging
+import threading
+
+from app import crud
+from app.core.config import settings
+from app.db.session import SessionLocal
+
+logger = logging.getLogger(__name__)
+
+class RollupFolder:
+    def __init__(self, *, interval: float, batch_size: int):
+        self.interval = interval
+        self.batch_size = batch_size
+        self._stopped = threading.Event()
+        self._thread: Optional[threading.Thread] = None
+
+    def fold(self) -> int:
+        db = SessionLocal()
+        try:
+            return crud.analytics.fold(db, batch_size=self.batch_size)
+        except Exception:
+            logger.exception("Could not fold the sales rollup deltas")
+            return 0
+        finally:
+            db.close()
+
+    def _run(self) -> None:
+        while not self._stopped.wait(self.interval):
+            self.fold()
+
+    def start(self) -> None:
+        if self._thread is not None or self.interval <= 0:
+            return
+        self._stopped.clear()
+        self._thread = threading.Thread(target=self._run, name="rollup-folder", daemon=True)
+        self._thread.start()
+
+    def stop(self) -> None:
+        if self._thread is None:
+            return
+        self._stopped.set()
+        self._thread.join()
+        self._thread = None
+
+rollup_folder = RollupFolder(
+    interval=settings.ANALYTICS_FOLD_SECONDS, batch_size=settings.ANALYTICS_FOLD_BATCH_SIZE
+)
@@ -1,6 +1,11 @@
 from .token import Token, TokenPayload
-from .user import User, UserCreate, UserUpdate, UserInDB
+from .user import User, UserCreate, UserUpdate, UserInDB, UserPrincipal
 from .category import Category, CategoryCreate, CategoryUpdate
-from .product import Product, ProductCreate, ProductUpdate
+from .product import Product, ProductCreate, ProductUpdate, ProductSearchResult, ProductSummary, ProductLookup, ProductLookupResult
 from .supplier import Supplier, SupplierCreate, SupplierUpdate
-from .inventory import InventoryTransaction, InventoryTransactionCreate 
\ No newline at end of file
+from .inventory import InventoryTransaction, InventoryTransactionCreate, StockLevel
+from .analytics import AnalyticsTotals, AnalyticsSummary, AnalyticsBucket, AnalyticsTopItem
+
+from .product_import import ProductImportError, ProductImportReport
+
+from .location import Location, LocationCreate, LocationUpdate, LocationStock, ProductStock, StockTransfer, StockTransferResult
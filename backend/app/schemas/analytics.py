@@ -0,0 +1,26 @@
+from typing import Optional
+from datetime import datetime
+from pydantic import BaseModel
+
+class AnalyticsTotals(BaseModel):
+    sales_count: int
+    units: float
+    revenue: float
+    cost: float
+    returns_count: int
+    returned_units: float
+    returned_revenue: float
+    net_revenue: float
+    margin: float
+
+class AnalyticsSummary(AnalyticsTotals):
+    start: datetime
+    end: datetime
+    dimension: str
+    dimension_id: Optional[int] = None
+
+class AnalyticsBucket(AnalyticsTotals):
+    bucket_start: datetime
+
+class AnalyticsTopItem(AnalyticsTotals):
+    dimension_id: int
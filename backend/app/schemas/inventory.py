@@ -5,6 +5,7 @@ from app.models.inventory import TransactionType
 
 class InventoryTransactionBase(BaseModel):
     product_id: int
+    location_id: Optional[int] = None
     quantity: int
     transaction_type: TransactionType
     reference: Optional[str] = None
@@ -20,6 +21,7 @@ class InventoryTransactionInDBBase(InventoryTransactionBase):
     id: int
     created_at: datetime
     created_by: Optional[int] = None
+    balance_after: Optional[int] = None
 
     class Config:
         from_attributes = True
@@ -28,4 +30,9 @@ class InventoryTransaction(InventoryTransactionInDBBase):
     pass
 
 class InventoryTransactionInDB(InventoryTransactionInDBBase):
-    pass 
\ No newline at end of file
+    pass
+
+class StockLevel(BaseModel):
+    product_id: int
+    stock: int
+    at: Optional[datetime] = None
@@ -0,0 +1,56 @@
+from typing import List, Optional
+from datetime import datetime
+
+from pydantic import BaseModel, Field
+
+from .inventory import InventoryTransaction
+
+# Shared properties
+class LocationBase(BaseModel):
+    name: str
+    address: Optional[str] = None
+
+# Properties to receive on location creation
+class LocationCreate(LocationBase):
+    pass
+
+# Properties to receive on location update
+class LocationUpdate(LocationBase):
+    pass
+
+# Properties to return to client
+class Location(LocationBase):
+    id: int
+    created_at: datetime
+    updated_at: Optional[datetime] = None
+
+    class Config:
+        from_attributes = True
+
+class LocationStock(BaseModel):
+    product_id: int
+    location_id: int
+    stock: int
+    updated_at: Optional[datetime] = None
+
+    class Config:
+        from_attributes = True
+
+class ProductStock(BaseModel):
+    product_id: int
+    # Stock not assigned to any location
+    unassigned: int
+    total: int
+    locations: List[LocationStock]
+
+class StockTransfer(BaseModel):
+    product_id: int
+    # None moves from/to the unassigned stock
+    from_location_id: Optional[int] = None
+    to_location_id: Optional[int] = None
+    quantity: int = Field(gt=0)
+    notes: Optional[str] = None
+
+class StockTransferResult(BaseModel):
+    out: InventoryTransaction
+    into: InventoryTransaction
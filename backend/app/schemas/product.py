@@ -1,4 +1,4 @@
-from typing import Optional
+from typing import Dict, List, Optional
 from pydantic import BaseModel, Field
 from datetime import datetime
 
@@ -65,6 +65,8 @@ class ProductUpdate(ProductBase):
 # Properties shared by models stored in DB
 class ProductInDBBase(ProductBase):
     id: int
+    # Unassigned stock plus the stock at every location
+    total_stock: int
     created_by: int
     created_at: datetime
     updated_at: Optional[datetime] = None
@@ -86,6 +88,40 @@ class Product(ProductInDBBase):
 class ProductInDB(ProductInDBBase):
     pass
 
+# Summary served from the in-process barcode/SKU index
+class ProductSummary(BaseModel):
+    id: int
+    name: str
+    sku: Optional[str] = None
+    barcode: Optional[str] = None
+    price: float
+    category_id: Optional[int] = None
+
+    class Config:
+        from_attributes = True
+
+class ProductLookup(BaseModel):
+    codes: List[str] = Field(min_length=1, max_length=500)
+
+class ProductLookupResult(BaseModel):
+    # Keyed by the requested barcode or SKU
+    products: Dict[str, ProductSummary]
+    missing: List[str]
+
+# Slim projection returned by product search
+class ProductSearchResult(BaseModel):
+    id: int
+    name: str
+    sku: Optional[str] = None
+    barcode: Optional[str] = None
+    price: float
+    stock: int
+    total_stock: int
+    category_id: Optional[int] = None
+
+    class Config:
+        from_attributes = True
+
 class InventoryTransactionBase(BaseModel):
     product_id: int
     quantity: int
@@ -0,0 +1,15 @@
+from typing import List, Optional
+from pydantic import BaseModel
+
+class ProductImportError(BaseModel):
+    row: int
+    sku: Optional[str] = None
+    errors: List[str]
+
+class ProductImportReport(BaseModel):
+    total: int = 0
+    inserted: int = 0
+    updated: int = 0
+    failed: int = 0
+    # Capped at IMPORT_MAX_ERRORS; `failed` counts every rejected row
+    errors: List[ProductImportError] = []
@@ -8,23 +8,31 @@ from .customer import Customer
 class SaleBase(BaseModel):
     product_id: int
     customer_id: Optional[int] = None
+    # Preferred location to sell from; None sells unassigned stock
+    location_id: Optional[int] = None
     quantity: float = Field(gt=0)
     unit_price: float = Field(gt=0)
     notes: Optional[str] = None
 
 class SaleCreate(SaleBase):
-    pass
+    # sales.customer_id is NOT NULL
+    customer_id: int
 
 class SaleUpdate(SaleBase):
     product_id: Optional[int] = None
     quantity: Optional[float] = Field(None, gt=0)
     unit_price: Optional[float] = Field(None, gt=0)
 
-class Sale(SaleBase):
+class SaleInDBBase(SaleBase):
     id: int
     total_amount: float
     created_by: int
     created_at: datetime
+
+    class Config:
+        from_attributes = True
+
+class Sale(SaleInDBBase):
     product: Product
     customer: Customer
 
@@ -29,6 +29,15 @@ class User(UserInDBBase):
 class UserInDB(UserInDBBase):
     hashed_password: str
 
+# Minimal view of the authenticated user, cheap to cache
+class UserPrincipal(BaseModel):
+    id: int
+    is_active: Optional[bool] = True
+    is_superuser: Optional[bool] = False
+
+    class Config:
+        from_attributes = True
+
 class Token(BaseModel):
     access_token: str
     token_type: str
@@ -0,0 +1,27 @@
+"""
+Record the current stock of every product in `stock_snapshots`.
+
+Run periodically (e.g. daily from cron) so that stock-as-of lookups stay
+cheap and cover changes made outside the inventory ledger:
+
+    python -m app.stock_snapshot
+"""
+import logging
+
+from app import crud
+from app.db import base  # noqa: F401
+from app.db.session import SessionLocal
+
+logging.basicConfig(level=logging.INFO)
+logger = logging.getLogger(__name__)
+
+def main() -> None:
+    db = SessionLocal()
+    try:
+        count = crud.inventory.take_snapshot(db)
+    finally:
+        db.close()
+    logger.info("Recorded stock snapshot of %d products", count)
+
+if __name__ == "__main__":
+    main()
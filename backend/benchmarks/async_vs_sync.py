@@ -0,0 +1,83 @@
+"""
+Load test the product/sales/inventory read endpoints of a running server.
+
+Start the server once with USE_ASYNC_DB=false and once with USE_ASYNC_DB=true,
+run this script against each and compare the throughput and latency lines:
+
+    USE_ASYNC_DB=false uvicorn app.main:app --workers 1
+    python -m benchmarks.async_vs_sync --label sync --concurrency 200
+    USE_ASYNC_DB=true uvicorn app.main:app --workers 1
+    python -m benchmarks.async_vs_sync --label async --concurrency 200
+"""
+import argparse
+import asyncio
+import statistics
+import time
+from typing import List
+
+import httpx
+
+DEFAULT_PATHS = [
+    "/api/v1/products?limit=50",
+    "/api/v1/sales?limit=50",
+    "/api/v1/inventory/?limit=50",
+]
+
+def percentile(values: List[float], pct: float) -> float:
+    ordered = sorted(values)
+    index = min(len(ordered) - 1, int(round(pct / 100 * (len(ordered) - 1))))
+    return ordered[index]
+
+async def login(client: httpx.AsyncClient, email: str, password: str) -> str:
+    response = await client.post(
+        "/api/v1/login/access-token", data={"username": email, "password": password}
+    )
+    response.raise_for_status()
+    return response.json()["access_token"]
+
+async def run(args: argparse.Namespace) -> None:
+    limits = httpx.Limits(max_connections=args.concurrency)
+    async with httpx.AsyncClient(base_url=args.url, limits=limits, timeout=60) as client:
+        token = await login(client, args.email, args.password)
+        headers = {"Authorization": f"Bearer {token}"}
+        for path in args.paths:
+            latencies: List[float] = []
+            errors = 0
+            queue: "asyncio.Queue[int]" = asyncio.Queue()
+            for n in range(args.requests):
+                queue.put_nowait(n)
+
+            async def worker() -> None:
+                nonlocal errors
+                while not queue.empty():
+                    queue.get_nowait()
+                    start = time.perf_counter()
+                    response = await client.get(path, headers=headers)
+                    latencies.append(time.perf_counter() - start)
+                    if response.status_code != 200:
+                        errors += 1
+
+            start = time.perf_counter()
+            await asyncio.gather(*(worker() for _ in range(args.concurrency)))
+            elapsed = time.perf_counter() - start
+            print(
+                f"[{args.label}] {path}: {len(latencies) / elapsed:.0f} req/s, "
+                f"mean {statistics.mean(latencies) * 1000:.1f} ms, "
+                f"p50 {percentile(latencies, 50) * 1000:.1f} ms, "
+                f"p95 {percentile(latencies, 95) * 1000:.1f} ms, "
+                f"p99 {percentile(latencies, 99) * 1000:.1f} ms, errors {errors}"
+            )
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description=__doc__.strip().splitlines()[0])
+    parser.add_argument("--url", default="http://localhost:8000")
+    parser.add_argument("--email", default="admin@example.com")
+    parser.add_argument("--password", default="admin")
+    parser.add_argument("--label", default="run")
+    parser.add_argument("--concurrency", type=int, default=100)
+    parser.add_argument("--requests", type=int, default=2000)
+    parser.add_argument("--paths", nargs="+", default=DEFAULT_PATHS)
+    asyncio.run(run(parser.parse_args()))
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,247 @@
+"""
+Generate a large, reproducible synthetic dataset for the benchmark suite.
+
+The same --seed and sizes always produce the same rows. Rows are streamed in
+batches and bulk loaded, with COPY on PostgreSQL (psycopg2) and multi-row
+inserts elsewhere, and the sales rollups and the low stock set are filled in
+as the real write paths would. Everything is namespaced by --prefix, so a
+dataset can be loaded next to real data, and described in a manifest that
+`benchmarks.suite` reads:
+
+    python -m app.bootstrap
+    python -m benchmarks.datagen --products 1000000 --sales 50000000 --customers 10000
+    python -m benchmarks.suite --manifest bench-dataset.json --output results.json
+"""
+import argparse
+import csv
+import io
+import json
+import random
+import time
+from datetime import date, datetime, time as dt_time, timedelta, timezone
+from typing import Any, Dict, Iterator, List, Sequence
+
+from sqlalchemy import Table, func, insert, text
+from sqlalchemy.orm import Session
+
+from app import crud, models
+from app.db import base  # noqa: F401
+from app.db.session import SessionLocal
+
+def batches(rows: Iterator[Dict[str, Any]], size: int) -> Iterator[List[Dict[str, Any]]]:
+    batch: List[Dict[str, Any]] = []
+    for row in rows:
+        batch.append(row)
+        if len(batch) == size:
+            yield batch
+            batch = []
+    if batch:
+        yield batch
+
+def bulk_load(db: Session, table: Table, columns: Sequence[str], rows: List[Dict[str, Any]]) -> None:
+    bind = db.get_bind()
+    if bind.dialect.name == "postgresql" and bind.dialect.driver == "psycopg2":
+        buffer = io.StringIO()
+        writer = csv.writer(buffer)
+        writer.writerows([row[name] for name in columns] for row in rows)
+        buffer.seek(0)
+        cursor = db.connection().connection.cursor()
+        cursor.copy_expert(
+            f"COPY {table.name} ({', '.join(columns)}) FROM STDIN WITH (FORMAT csv)", buffer
+        )
+    else:
+        db.execute(insert(table), [{name: row[name] for name in columns} for row in rows])
+
+def load(
+    db: Session,
+    model: Any,
+    columns: Sequence[str],
+    rows: Iterator[Dict[str, Any]],
+    *,
+    batch_size: int,
+    label: str,
+    on_batch: Any = None,
+) -> int:
+    started = time.perf_counter()
+    count = 0
+    for batch in batches(rows, batch_size):
+        bulk_load(db, model.__table__, columns, batch)
+        if on_batch is not None:
+            on_batch(batch)
+        db.commit()
+        count += len(batch)
+        elapsed = time.perf_counter() - started
+        print(f"\r{label}: {count:,} rows, {count / elapsed:,.0f} rows/s", end="", flush=True)
+    print()
+    return count
+
+def ids(db: Session, model: Any, column: Any, prefix: str) -> List[int]:
+    return [
+        id for (id,) in db.query(model.id).filter(column.like(f"{prefix}%")).order_by(model.id)
+    ]
+
+def generate(db: Session, args: argparse.Namespace) -> Dict[str, Any]:
+    rng = random.Random(args.seed)
+    prefix = args.prefix
+    user = crud.user.get_by_email(db, email=args.user)
+    if not user:
+        raise SystemExit(f"Unknown user {args.user}; run `python -m app.bootstrap` first")
+    if db.query(models.Product.id).filter(models.Product.sku.like(f"{prefix}-%")).first():
+        raise SystemExit(f"A dataset with prefix {prefix} is already loaded; pick another --prefix")
+    end = datetime.combine(args.end_date, dt_time.min, tzinfo=timezone.utc)
+    start = end - timedelta(days=args.days)
+
+    load(db, models.Category, ("name", "description"), (
+        {"name": f"{prefix} category {n}", "description": f"Synthetic category {n}"}
+        for n in range(args.categories)
+    ), batch_size=args.batch_size, label="categories")
+    category_ids = ids(db, models.Category, models.Category.name, f"{prefix} ")
+    load(db, models.Supplier, ("name", "contact_name", "email", "phone"), (
+        {
+            "name": f"{prefix} supplier {n}",
+            "contact_name": f"Contact {n}",
+            "email": f"{prefix.lower()}-supplier-{n}@example.com",
+            "phone": f"555-{n:07d}",
+        }
+        for n in range(args.suppliers)
+    ), batch_size=args.batch_size, label="suppliers")
+    supplier_ids = ids(db, models.Supplier, models.Supplier.name, f"{prefix} ")
+    load(db, models.Customer, ("full_name", "email", "phone"), (
+        {
+            "full_name": f"{prefix} customer {n}",
+            "email": f"{prefix.lower()}-customer-{n}@example.com",
+            "phone": f"555-{n:07d}",
+        }
+        for n in range(args.customers)
+    ), batch_size=args.batch_size, label="customers")
+    customer_ids = ids(db, models.Customer, models.Customer.full_name, f"{prefix} ")
+
+    # Kept for the sales: price, cost and category of every product, by index
+    prices: List[float] = []
+    costs: List[float] = []
+    categories: List[int] = []
+
+    def products() -> Iterator[Dict[str, Any]]:
+        for n in range(args.products):
+            price = round(rng.uniform(1, 200), 2)
+            prices.append(price)
+            costs.append(round(price * rng.uniform(0.4, 0.8), 2))
+            categories.append(rng.choice(category_ids))
+            yield {
+                "name": f"{prefix} product {n}",
+                "description": f"Synthetic product {n}",
+                "sku": f"{prefix}-{n:08d}",
+                "barcode": f"{prefix}{n:010d}",
+                "price": price,
+                "cost": costs[-1],
+                "stock": rng.randint(0, 1000),
+                "min_quantity": rng.randint(0, 20),
+                "category_id": categories[-1],
+                "supplier_id": rng.choice(supplier_ids),
+                "created_by": user.id,
+            }
+
+    load(db, models.Product, (
+        "name", "description", "sku", "barcode", "price", "cost", "stock",
+        "min_quantity", "category_id", "supplier_id", "created_by",
+    ), products(), batch_size=args.batch_size, label="products")
+    product_ids = ids(db, models.Product, models.Product.sku, f"{prefix}-")
+    crud.low_stock.sync(db)
+    db.commit()
+
+    span = (end - start).total_seconds()
+
+    def sales() -> Iterator[Dict[str, Any]]:
+        for n in range(args.sales):
+            # Skewed towards the first products, like real best sellers
+            index = int(args.products * rng.random() ** 3)
+            quantity = rng.randint(1, 5)
+            yield {
+                "product_id": product_ids[index],
+                "customer_id": rng.choice(customer_ids),
+                "quantity": quantity,
+                "unit_price": prices[index],
+                "total_amount": round(quantity * prices[index], 2),
+                "created_at": start + timedelta(seconds=span * n / args.sales),
+                "created_by": user.id,
+                "_index": index,
+            }
+
+    def record_rollups(batch: List[Dict[str, Any]]) -> None:
+        crud.analytics.record_sales(db, lines=[
+            {
+                "product_id": sale["product_id"],
+                "category_id": categories[sale["_index"]],
+                "customer_id": sale["customer_id"],
+                "quantity": sale["quantity"],
+                "revenue": sale["total_amount"],
+                "unit_cost": costs[sale["_index"]],
+                "at": sale["created_at"],
+            }
+            for sale in batch
+        ])
+
+    sale_columns = (
+        "product_id", "customer_id", "quantity", "unit_price", "total_amount",
+        "created_at", "created_by",
+    )
+    last_sale_id = db.query(func.coalesce(func.max(models.Sale.id), 0)).scalar()
+    load(
+        db, models.Sale, sale_columns, sales(), batch_size=args.batch_size, label="sales",
+        on_batch=None if args.no_rollups else record_rollups,
+    )
+    if not args.no_rollups:
+        crud.analytics.fold(db)
+    sale_ids = db.query(func.min(models.Sale.id), func.max(models.Sale.id)).filter(
+        models.Sale.id > last_sale_id
+    ).one()
+    if db.get_bind().dialect.name == "postgresql":
+        for table in ("categories", "suppliers", "customers", "products", "sales", "sales_rollups"):
+            db.execute(text(f"ANALYZE {table}"))
+        db.commit()
+
+    return {
+        "prefix": prefix,
+        "seed": args.seed,
+        "user": args.user,
+        "categories": args.categories,
+        "suppliers": args.suppliers,
+        "customers": args.customers,
+        "products": args.products,
+        "sales": args.sales,
+        "product_ids": [product_ids[0], product_ids[-1]] if product_ids else None,
+        "customer_ids": [customer_ids[0], customer_ids[-1]] if customer_ids else None,
+        "sale_ids": list(sale_ids) if sale_ids[0] is not None else None,
+        "start_date": start.date().isoformat(),
+        "end_date": end.date().isoformat(),
+    }
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description=__doc__.strip().splitlines()[0])
+    parser.add_argument("--products", type=int, default=100_000)
+    parser.add_argument("--sales", type=int, default=1_000_000)
+    parser.add_argument("--customers", type=int, default=10_000)
+    parser.add_argument("--categories", type=int, default=50)
+    parser.add_argument("--suppliers", type=int, default=200)
+    parser.add_argument("--days", type=int, default=365, help="Sales are spread over this many days")
+    parser.add_argument("--end-date", type=date.fromisoformat, default=date.today())
+    parser.add_argument("--seed", type=int, default=42)
+    parser.add_argument("--prefix", default="BENCH")
+    parser.add_argument("--user", default="admin@example.com", help="Owner of the products and sales")
+    parser.add_argument("--batch-size", type=int, default=50_000)
+    parser.add_argument("--no-rollups", action="store_true", help="Skip the sales rollups")
+    parser.add_argument("--manifest", default="bench-dataset.json")
+    args = parser.parse_args()
+
+    started = time.perf_counter()
+    db = SessionLocal()
+    try:
+        manifest = generate(db, args)
+    finally:
+        db.close()
+    with open(args.manifest, "w") as f:
+        json.dump(manifest, f, indent=2)
+    print(f"Loaded in {time.perf_counter() - started:.0f}s, manifest written to {args.manifest}")
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,118 @@
+"""
+Time the serialization of list endpoint responses, from ORM objects to the
+response body, without a server or a database:
+
+    python -m benchmarks.json_serialization --rows 100 --repeat 200
+
+"before" is FastAPI's response_model path rendered by JSONResponse, "orjson"
+the same path rendered by ORJSONResponse (the default response class), and
+"direct" the pydantic dump_json used by the hot list endpoints.
+"""
+import argparse
+import asyncio
+import statistics
+import time
+from datetime import datetime
+from typing import Any, Callable, List
+
+from fastapi.responses import JSONResponse, ORJSONResponse
+from fastapi.routing import serialize_response
+from fastapi.utils import create_response_field
+
+from app import models
+from app.core.serialization import dump_json
+from app.db import base  # noqa: F401
+from app.schemas.inventory import InventoryTransaction
+from app.schemas.product import Product
+from app.schemas.sale import Sale
+
+def make_products(rows: int) -> List[models.Product]:
+    now = datetime.now()
+    category = models.Category(id=1, name="Category", description="Description", created_at=now)
+    supplier = models.Supplier(
+        id=1, name="Supplier", contact_name="Contact", email="supplier@example.com",
+        phone="555-0100", address="1 Main St", created_at=now,
+    )
+    return [
+        models.Product(
+            id=n, name=f"Product {n}", description="Description", sku=f"SKU-{n}",
+            barcode=f"{n:013d}", price=9.99, cost=4.5, stock=100, min_quantity=5,
+            category_id=1, supplier_id=1, category=category, supplier=supplier,
+            created_by=1, created_at=now, updated_at=now,
+        )
+        for n in range(1, rows + 1)
+    ]
+
+def make_sales(rows: int) -> List[models.Sale]:
+    now = datetime.now()
+    customer = models.Customer(
+        id=1, full_name="Customer", email="customer@example.com", phone="555-0101", created_at=now
+    )
+    return [
+        models.Sale(
+            id=product.id, product_id=product.id, customer_id=1, quantity=2, unit_price=9.99,
+            total_amount=19.98, product=product, customer=customer, created_by=1, created_at=now,
+        )
+        for product in make_products(rows)
+    ]
+
+def make_transactions(rows: int) -> List[models.InventoryTransaction]:
+    now = datetime.now()
+    return [
+        models.InventoryTransaction(
+            id=n, product_id=n, quantity=10, transaction_type="IN", balance_after=10,
+            reference="PO-1", created_by=1, created_at=now,
+        )
+        for n in range(1, rows + 1)
+    ]
+
+def fastapi_path(tp: Any, response_class: Any) -> Callable[[List[Any]], bytes]:
+    field = create_response_field(name="response", type_=tp)
+    loop = asyncio.new_event_loop()
+
+    def render(rows: List[Any]) -> bytes:
+        content = loop.run_until_complete(
+            serialize_response(field=field, response_content=rows, is_coroutine=True)
+        )
+        return response_class(content).body
+
+    return render
+
+def timed(render: Callable[[List[Any]], bytes], rows: List[Any], repeat: int) -> List[float]:
+    render(rows)
+    times = []
+    for _ in range(repeat):
+        start = time.perf_counter()
+        render(rows)
+        times.append(time.perf_counter() - start)
+    return times
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description=__doc__.strip().splitlines()[0])
+    parser.add_argument("--rows", type=int, default=100)
+    parser.add_argument("--repeat", type=int, default=200)
+    args = parser.parse_args()
+
+    cases = [
+        ("GET /products", List[Product], make_products(args.rows)),
+        ("GET /sales", List[Sale], make_sales(args.rows)),
+        ("GET /inventory", List[InventoryTransaction], make_transactions(args.rows)),
+    ]
+    for label, tp, rows in cases:
+        renders = {
+            "before": fastapi_path(tp, JSONResponse),
+            "orjson": fastapi_path(tp, ORJSONResponse),
+            "direct": lambda rows, tp=tp: dump_json(tp, rows),
+        }
+        baseline = None
+        for name, render in renders.items():
+            mean = statistics.mean(timed(render, rows, args.repeat))
+            baseline = baseline or mean
+            print(
+                f"{label} ({args.rows} rows) {name}: {mean * 1000:.2f} ms, "
+                f"{baseline / mean:.2f}x, {len(render(rows)) / 1024:.1f} KiB"
+            )
+        print()
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,71 @@
+"""
+Compare payload size and latency of the full list responses with their
+`fields=`/`expand=` projections, against a running server with some data:
+
+    uvicorn app.main:app --workers 1
+    python -m benchmarks.list_projections --requests 200
+"""
+import argparse
+import statistics
+import time
+from typing import List, Tuple
+
+import httpx
+
+from benchmarks.async_vs_sync import percentile
+
+# (full list, projected variants of it)
+DEFAULT_CASES: List[Tuple[str, List[str]]] = [
+    ("/api/v1/sales?limit=100", [
+        "/api/v1/sales?limit=100&fields=product_id,quantity,total_amount,created_at",
+        "/api/v1/sales?limit=100&fields=quantity,total_amount&expand=product",
+    ]),
+    ("/api/v1/products?limit=100", [
+        "/api/v1/products?limit=100&fields=name,sku,price,stock",
+        "/api/v1/products?limit=100&fields=name,price&expand=category",
+    ]),
+    ("/api/v1/inventory/?limit=100", [
+        "/api/v1/inventory/?limit=100&fields=product_id,quantity,transaction_type",
+    ]),
+    ("/api/v1/returns/?limit=100", [
+        "/api/v1/returns/?limit=100&fields=sale_id,quantity",
+    ]),
+]
+
+def measure(client: httpx.Client, path: str, headers: dict, requests: int) -> None:
+    latencies: List[float] = []
+    size = 0
+    for _ in range(requests):
+        start = time.perf_counter()
+        response = client.get(path, headers=headers)
+        latencies.append(time.perf_counter() - start)
+        response.raise_for_status()
+        size = len(response.content)
+    print(
+        f"{path}: {size / 1024:.1f} KiB, "
+        f"mean {statistics.mean(latencies) * 1000:.1f} ms, "
+        f"p50 {percentile(latencies, 50) * 1000:.1f} ms, "
+        f"p95 {percentile(latencies, 95) * 1000:.1f} ms"
+    )
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description=__doc__.strip().splitlines()[0])
+    parser.add_argument("--url", default="http://localhost:8000")
+    parser.add_argument("--email", default="admin@example.com")
+    parser.add_argument("--password", default="admin")
+    parser.add_argument("--requests", type=int, default=200)
+    args = parser.parse_args()
+
+    with httpx.Client(base_url=args.url, timeout=60) as client:
+        response = client.post(
+            "/api/v1/login/access-token", data={"username": args.email, "password": args.password}
+        )
+        response.raise_for_status()
+        headers = {"Authorization": f"Bearer {response.json()['access_token']}"}
+        for full, projections in DEFAULT_CASES:
+            for path in (full, *projections):
+                measure(client, path, headers, args.requests)
+            print()
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,103 @@
+"""
+Sales/sec under contention: the old read-check-write sale path against the
+single-transaction conditional UPDATE in `crud.sale.create_with_stock`.
+
+Every worker thread sells one unit of the same product until the stock runs
+out, which is the worst case for row contention. Run against a disposable
+database:
+
+    python -m benchmarks.sale_contention --threads 16 --stock 2000
+"""
+import argparse
+import threading
+import time
+import uuid
+from typing import Callable, Dict
+
+from sqlalchemy.orm import Session
+
+from app import crud, models
+from app.db import base  # noqa: F401
+from app.db.session import SessionLocal
+from app.schemas.sale import SaleCreate
+
+def legacy_sale(db: Session, sale_in: SaleCreate, user_id: int) -> bool:
+    product = crud.product.get(db, id=sale_in.product_id)
+    if not product or product.stock < sale_in.quantity:
+        return False
+    crud.sale.create_with_total(db, obj_in=sale_in, created_by=user_id)
+    crud.product.update(
+        db, db_obj=product, obj_in={"stock": product.stock - sale_in.quantity}
+    )
+    return True
+
+def atomic_sale(db: Session, sale_in: SaleCreate, user_id: int) -> bool:
+    return crud.sale.create_with_stock(db, obj_in=sale_in, created_by=user_id) is not None
+
+def setup(db: Session, stock: int) -> Dict[str, int]:
+    tag = uuid.uuid4().hex[:8]
+    user = db.query(models.User).order_by(models.User.id).first()
+    if not user:
+        raise SystemExit("No users found; run init_db first")
+    product = models.Product(
+        name=f"bench-{tag}", sku=f"BENCH-{tag}", price=1, cost=1,
+        stock=stock, min_quantity=0, created_by=user.id,
+    )
+    customer = models.Customer(full_name=f"Bench {tag}")
+    db.add_all([product, customer])
+    db.commit()
+    return {"user_id": user.id, "product_id": product.id, "customer_id": customer.id}
+
+def run(name: str, sell: Callable[[Session, SaleCreate, int], bool], threads: int, stock: int) -> None:
+    db = SessionLocal()
+    ids = setup(db, stock)
+    sale_in = SaleCreate(
+        product_id=ids["product_id"], customer_id=ids["customer_id"], quantity=1, unit_price=1
+    )
+    sold = [0] * threads
+    errors = [0] * threads
+
+    def worker(n: int) -> None:
+        session = SessionLocal()
+        try:
+            while True:
+                try:
+                    if not sell(session, sale_in, ids["user_id"]):
+                        return
+                    sold[n] += 1
+                except Exception:
+                    session.rollback()
+                    errors[n] += 1
+                    if errors[n] > 100:
+                        return
+        finally:
+            session.close()
+
+    workers = [threading.Thread(target=worker, args=(n,)) for n in range(threads)]
+    start = time.perf_counter()
+    for t in workers:
+        t.start()
+    for t in workers:
+        t.join()
+    elapsed = time.perf_counter() - start
+
+    db.expire_all()
+    remaining = db.query(models.Product.stock).filter(models.Product.id == ids["product_id"]).scalar()
+    total_sold = sum(sold)
+    print(
+        f"{name:>7}: {total_sold} sales in {elapsed:.2f}s "
+        f"({total_sold / elapsed:.0f} sales/s), remaining stock {remaining}, "
+        f"oversold {max(0, total_sold - stock)}, errors {sum(errors)}"
+    )
+    db.close()
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description=__doc__.strip().splitlines()[0])
+    parser.add_argument("--threads", type=int, default=16)
+    parser.add_argument("--stock", type=int, default=2000)
+    args = parser.parse_args()
+    run("legacy", legacy_sale, args.threads, args.stock)
+    run("atomic", atomic_sale, args.threads, args.stock)
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,58 @@
+"""
+Measure how long a worker takes from launch to serving its first request,
+with and without FAST_BOOT, against the configured database:
+
+    python -m app.bootstrap
+    python -m benchmarks.startup_time --runs 5
+"""
+import argparse
+import os
+import statistics
+import subprocess
+import sys
+import time
+from typing import List
+
+import httpx
+
+def boot_time(*, fast_boot: bool, port: int, timeout: float) -> float:
+    env = dict(os.environ, FAST_BOOT=str(fast_boot).lower())
+    started = time.perf_counter()
+    server = subprocess.Popen(
+        [sys.executable, "-m", "uvicorn", "app.main:app", "--port", str(port)],
+        env=env,
+        stdout=subprocess.DEVNULL,
+        stderr=subprocess.DEVNULL,
+    )
+    try:
+        while time.perf_counter() - started < timeout:
+            try:
+                if httpx.get(f"http://127.0.0.1:{port}/", timeout=1).status_code == 200:
+                    return time.perf_counter() - started
+            except httpx.TransportError:
+                pass
+            time.sleep(0.02)
+        raise SystemExit(f"Server did not start within {timeout}s")
+    finally:
+        server.terminate()
+        server.wait()
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description=__doc__.strip().splitlines()[0])
+    parser.add_argument("--runs", type=int, default=5)
+    parser.add_argument("--port", type=int, default=8099)
+    parser.add_argument("--timeout", type=float, default=60)
+    args = parser.parse_args()
+
+    for fast_boot in (False, True):
+        times: List[float] = [
+            boot_time(fast_boot=fast_boot, port=args.port, timeout=args.timeout)
+            for _ in range(args.runs)
+        ]
+        print(
+            f"FAST_BOOT={str(fast_boot).lower()}: mean {statistics.mean(times):.2f}s, "
+            f"min {min(times):.2f}s, max {max(times):.2f}s over {args.runs} runs"
+        )
+
+if __name__ == "__main__":
+    main()
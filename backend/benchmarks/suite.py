@@ -0,0 +1,275 @@
+"""
+Run timed end-to-end scenarios against a running server loaded with a
+`benchmarks.datagen` dataset, and save the results as JSON:
+
+    uvicorn app.main:app --workers 4
+    python -m benchmarks.suite --manifest bench-dataset.json --output results.json
+    python -m benchmarks.suite --manifest bench-dataset.json --baseline results.json
+
+Every scenario reports throughput and p50/p95/p99 latency. With --baseline,
+each scenario is compared with the saved run, and the exit status is 1 when
+any p95 or throughput is worse by more than --tolerance. The sale scenario
+writes: it sells from the dataset's stock and adds sales.
+"""
+import argparse
+import asyncio
+import json
+import platform
+import random
+import statistics
+import subprocess
+import sys
+import time
+from dataclasses import dataclass
+from datetime import date, datetime, timedelta, timezone
+from typing import Any, Callable, Collection, Dict, List, Optional, Tuple
+
+import httpx
+
+from app.core.pagination import encode_cursor
+from benchmarks.async_vs_sync import login, percentile
+
+# (method, path, params, JSON body) of one request
+Request = Tuple[str, str, Optional[Dict[str, Any]], Optional[Any]]
+
+@dataclass
+class Scenario:
+    name: str
+    description: str
+    make_request: Callable[[random.Random], Request]
+    # Expected answers besides 200, e.g. a sale rejected for lack of stock
+    ok_statuses: Collection[int] = (200,)
+
+def scenarios(manifest: Dict[str, Any]) -> List[Scenario]:
+    prefix, products = manifest["prefix"], manifest["products"]
+    first_product, last_product = manifest["product_ids"]
+    first_customer, last_customer = manifest["customer_ids"]
+    first_sale, last_sale = manifest["sale_ids"]
+    start = date.fromisoformat(manifest["start_date"])
+    days = (date.fromisoformat(manifest["end_date"]) - start).days
+    deep_product = first_product + (last_product - first_product) * 9 // 10
+    deep_sale = first_sale + (last_sale - first_sale) * 9 // 10
+
+    def summary(rng: random.Random) -> Request:
+        start_date = start + timedelta(days=rng.randrange(max(days - 30, 1)))
+        return ("GET", "/api/v1/sales/summary", {
+            "start_date": start_date.isoformat(),
+            "end_date": (start_date + timedelta(days=30)).isoformat(),
+        }, None)
+
+    return [
+        Scenario(
+            "product_by_sku", "GET /products/sku/{sku}",
+            lambda rng: ("GET", f"/api/v1/products/sku/{prefix}-{rng.randrange(products):08d}", None, None),
+        ),
+        Scenario(
+            "product_by_barcode", "GET /products/barcode/{barcode}",
+            lambda rng: ("GET", f"/api/v1/products/barcode/{prefix}{rng.randrange(products):010d}", None, None),
+        ),
+        Scenario(
+            "product_lookup_batch", "POST /products/lookup with 20 barcodes",
+            lambda rng: ("POST", "/api/v1/products/lookup", None, {
+                "codes": [f"{prefix}{rng.randrange(products):010d}" for _ in range(20)]
+            }),
+        ),
+        Scenario(
+            "sale_create", "POST /sales of one unit of a random product",
+            lambda rng: ("POST", "/api/v1/sales", None, {
+                "product_id": rng.randint(first_product, last_product),
+                "customer_id": rng.randint(first_customer, last_customer),
+                "quantity": 1,
+                "unit_price": 1,
+            }),
+            ok_statuses=(200, 400),
+        ),
+        Scenario(
+            "products_deep_offset", "GET /products, 100 rows at 90% with skip",
+            lambda rng: ("GET", "/api/v1/products", {
+                "skip": products * 9 // 10, "limit": 100,
+            }, None),
+        ),
+        Scenario(
+            "products_deep_cursor", "GET /products, 100 rows at 90% with a cursor",
+            lambda rng: ("GET", "/api/v1/products", {
+                "after": encode_cursor(deep_product), "limit": 100,
+            }, None),
+        ),
+        Scenario(
+            "sales_deep_offset", "GET /sales, 100 rows at 90% with skip",
+            lambda rng: ("GET", "/api/v1/sales", {
+                "skip": (last_sale - first_sale) * 9 // 10, "limit": 100,
+            }, None),
+        ),
+        Scenario(
+            "sales_deep_cursor", "GET /sales, 100 rows at 90% with a cursor",
+            lambda rng: ("GET", "/api/v1/sales", {
+                "after": encode_cursor(deep_sale), "limit": 100,
+            }, None),
+        ),
+        Scenario("sales_summary", "GET /sales/summary over a random 30 days", summary),
+    ]
+
+async def run_scenario(
+    client: httpx.AsyncClient,
+    scenario: Scenario,
+    headers: Dict[str, str],
+    *,
+    requests: int,
+    concurrency: int,
+    warmup: int,
+    seed: int,
+) -> Dict[str, Any]:
+    rng = random.Random(seed)
+    latencies: List[float] = []
+    statuses: Dict[str, int] = {}
+    errors = 0
+
+    async def send(record: bool) -> None:
+        nonlocal errors
+        method, path, params, body = scenario.make_request(rng)
+        start = time.perf_counter()
+        try:
+            response = await client.request(method, path, params=params, json=body, headers=headers)
+            status = str(response.status_code)
+        except httpx.HTTPError as e:
+            status = type(e).__name__
+        if not record:
+            return
+        latencies.append(time.perf_counter() - start)
+        statuses[status] = statuses.get(status, 0) + 1
+        if not status.isdigit() or int(status) not in scenario.ok_statuses:
+            errors += 1
+
+    for _ in range(warmup):
+        await send(record=False)
+
+    remaining = requests
+
+    async def worker() -> None:
+        nonlocal remaining
+        while remaining > 0:
+            remaining -= 1
+            await send(record=True)
+
+    start = time.perf_counter()
+    await asyncio.gather(*(worker() for _ in range(concurrency)))
+    elapsed = time.perf_counter() - start
+    return {
+        "description": scenario.description,
+        "requests": len(latencies),
+        "concurrency": concurrency,
+        "elapsed_seconds": elapsed,
+        "throughput_rps": len(latencies) / elapsed,
+        "errors": errors,
+        "statuses": statuses,
+        "latency_ms": {
+            "mean": statistics.mean(latencies) * 1000,
+            "p50": percentile(latencies, 50) * 1000,
+            "p95": percentile(latencies, 95) * 1000,
+            "p99": percentile(latencies, 99) * 1000,
+            "max": max(latencies) * 1000,
+        },
+    }
+
+def git_commit() -> Optional[str]:
+    try:
+        return subprocess.run(
+            ["git", "rev-parse", "--short", "HEAD"], capture_output=True, text=True, check=True
+        ).stdout.strip()
+    except (OSError, subprocess.CalledProcessError):
+        return None
+
+def compare(results: Dict[str, Any], baseline: Dict[str, Any], tolerance: float) -> bool:
+    """
+    Print each scenario against the baseline. Returns True if any regressed.
+    """
+    regressed = False
+    for name, current in results["scenarios"].items():
+        before = baseline["scenarios"].get(name)
+        if before is None:
+            print(f"{name}: not in the baseline")
+            continue
+        p95 = current["latency_ms"]["p95"] / before["latency_ms"]["p95"] - 1
+        throughput = current["throughput_rps"] / before["throughput_rps"] - 1
+        worse = p95 > tolerance or throughput < -tolerance
+        regressed |= worse
+        print(
+            f"{name}: p95 {before['latency_ms']['p95']:.1f} -> {current['latency_ms']['p95']:.1f} ms "
+            f"({p95:+.0%}), {before['throughput_rps']:.0f} -> {current['throughput_rps']:.0f} req/s "
+            f"({throughput:+.0%}){'  REGRESSION' if worse else ''}"
+        )
+    return regressed
+
+async def run(args: argparse.Namespace, manifest: Dict[str, Any]) -> Dict[str, Any]:
+    selected = [
+        scenario for scenario in scenarios(manifest)
+        if not args.scenarios or scenario.name in args.scenarios
+    ]
+    limits = httpx.Limits(max_connections=args.concurrency)
+    results: Dict[str, Any] = {}
+    async with httpx.AsyncClient(base_url=args.url, limits=limits, timeout=60) as client:
+        headers = {"Authorization": f"Bearer {await login(client, manifest['user'], args.password)}"}
+        for n, scenario in enumerate(selected):
+            result = await run_scenario(
+                client, scenario, headers,
+                requests=args.requests, concurrency=args.concurrency,
+                warmup=args.warmup, seed=args.seed + n,
+            )
+            results[scenario.name] = result
+            latency = result["latency_ms"]
+            print(
+                f"{scenario.name}: {result['throughput_rps']:.0f} req/s, "
+                f"p50 {latency['p50']:.1f} ms, p95 {latency['p95']:.1f} ms, "
+                f"p99 {latency['p99']:.1f} ms, errors {result['errors']}"
+            )
+    return results
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description=__doc__.strip().splitlines()[0])
+    parser.add_argument("--url", default="http://localhost:8000")
+    parser.add_argument("--manifest", default="bench-dataset.json")
+    parser.add_argument("--password", default="admin", help="Password of the manifest's user")
+    parser.add_argument("--scenarios", nargs="+", help="Run only these scenarios")
+    parser.add_argument("--requests", type=int, default=2000, help="Per scenario")
+    parser.add_argument("--concurrency", type=int, default=32)
+    parser.add_argument("--warmup", type=int, default=50, help="Unrecorded requests per scenario")
+    parser.add_argument("--seed", type=int, default=1)
+    parser.add_argument("--label", default="run")
+    parser.add_argument("--output", help="Save the results to this JSON file")
+    parser.add_argument("--baseline", help="Compare with the results saved in this JSON file")
+    parser.add_argument("--tolerance", type=float, default=0.10)
+    args = parser.parse_args()
+
+    with open(args.manifest) as f:
+        manifest = json.load(f)
+    known = {scenario.name for scenario in scenarios(manifest)}
+    unknown = set(args.scenarios or ()) - known
+    if unknown:
+        parser.error(f"Unknown scenarios {', '.join(sorted(unknown))}; pick from {', '.join(sorted(known))}")
+
+    results = {
+        "label": args.label,
+        "started_at": datetime.now(timezone.utc).isoformat(),
+        "url": args.url,
+        "commit": git_commit(),
+        "python": platform.python_version(),
+        "dataset": manifest,
+        "settings": {
+            "requests": args.requests, "concurrency": args.concurrency,
+            "warmup": args.warmup, "seed": args.seed,
+        },
+        "scenarios": asyncio.run(run(args, manifest)),
+    }
+    if args.output:
+        with open(args.output, "w") as f:
+            json.dump(results, f, indent=2)
+        print(f"Results written to {args.output}")
+    if args.baseline:
+        with open(args.baseline) as f:
+            baseline = json.load(f)
+        print(f"\nAgainst {args.baseline} ({baseline.get('label')}, {baseline.get('commit')}):")
+        if compare(results, baseline, args.tolerance):
+            sys.exit(1)
+
+if __name__ == "__main__":
+    main()
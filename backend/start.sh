@@ -7,14 +7,14 @@ while ! nc -z db 5432; do
 done
 echo "Database is ready!"
 
-# Apply database migrations
-echo "Applying database migrations..."
-alembic upgrade head
+# Apply database migrations and seed initial data, once for all workers
+echo "Bootstrapping database..."
+python -m app.bootstrap
 
-# Initialize database with initial data
-echo "Initializing database..."
-python -c "from app.db.init_db import init_db; from app.db.session import SessionLocal; init_db(SessionLocal())"
+# Start from an empty directory for the workers' Prometheus samples
+export PROMETHEUS_MULTIPROC_DIR=${PROMETHEUS_MULTIPROC_DIR:-/tmp/prometheus}
+rm -rf "$PROMETHEUS_MULTIPROC_DIR" && mkdir -p "$PROMETHEUS_MULTIPROC_DIR"
 
-# Start the application
+# Start the application, skipping the database work done above
 echo "Starting application..."
-uvicorn app.main:app --host 0.0.0.0 --port 8000 --reload 
\ No newline at end of file
+FAST_BOOT=true uvicorn app.main:app --host 0.0.0.0 --port 8000 --reload 
\ No newline at end of file
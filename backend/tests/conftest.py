@@ -0,0 +1,82 @@
+import os
+import tempfile
+
+# The app reads its settings at import time: point it at a throwaway SQLite
+# database, or at TEST_POSTGRES_URI (an empty PostgreSQL database) when set,
+# and keep background loops from querying during the tests
+os.environ["SQLALCHEMY_DATABASE_URI"] = os.environ.get("TEST_POSTGRES_URI") or (
+    f"sqlite:///{os.path.join(tempfile.mkdtemp(), 'test.db')}"
+)
+os.environ["PASSWORD_HASH_WORKERS"] = "0"
+os.environ["ANALYTICS_FOLD_SECONDS"] = "3600"
+os.environ["PRODUCT_INDEX_REFRESH_SECONDS"] = "3600"
+os.environ["LOW_STOCK_DIGEST_SECONDS"] = "3600"
+
+import itertools
+from typing import Any, Callable, Dict, Iterator
+
+import pytest
+from fastapi.testclient import TestClient
+from sqlalchemy.orm import Session
+
+from app.core.config import settings
+
+API = settings.API_V1_STR
+
+@pytest.fixture(scope="session")
+def client() -> Iterator[TestClient]:
+    from app.main import app
+
+    with TestClient(app) as client:
+        yield client
+
+@pytest.fixture(scope="session")
+def superuser_headers(client: TestClient) -> Dict[str, str]:
+    response = client.post(
+        f"{API}/login/access-token",
+        # The initial admin created by app.db.init_db
+        data={"username": "admin@example.com", "password": "admin"},
+    )
+    assert response.status_code == 200, response.text
+    return {"Authorization": f"Bearer {response.json()['access_token']}"}
+
+@pytest.fixture
+def db(client: TestClient) -> Iterator[Session]:
+    from app.db.session import SessionLocal
+
+    db = SessionLocal()
+    try:
+        yield db
+    finally:
+        db.close()
+
+@pytest.fixture(scope="session")
+def customer(client: TestClient, superuser_headers: Dict[str, str]) -> Dict[str, Any]:
+    response = client.post(
+        f"{API}/customers", json={"full_name": "test-customer"}, headers=superuser_headers
+    )
+    assert response.status_code == 200, response.text
+    return response.json()
+
+_product_numbers = itertools.count(1)
+
+@pytest.fixture
+def create_product(
+    client: TestClient, superuser_headers: Dict[str, str]
+) -> Callable[..., Dict[str, Any]]:
+    """
+    Create a product through the API, with a unique SKU and barcode unless
+    given.
+    """
+    def create(**fields: Any) -> Dict[str, Any]:
+        n = next(_product_numbers)
+        product = {
+            "name": f"test-product-{n}", "sku": f"TEST-{n}", "barcode": f"TEST{n}",
+            "price": 2, "cost": 1, "stock": 100, "min_quantity": 1,
+        }
+        product.update(fields)
+        response = client.post(f"{API}/products", json=product, headers=superuser_headers)
+        assert response.status_code == 200, response.text
+        return response.json()
+
+    return create
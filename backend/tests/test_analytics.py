@@ -0,0 +1,83 @@
+"""
+Sales and returns append rollup deltas bucketed by their row's created_at, and
+`fold` moves exactly the deltas it read into the rollups.
+"""
+from datetime import timedelta
+from typing import Any, Callable, Dict
+
+from fastapi.testclient import TestClient
+from sqlalchemy import event, insert
+from sqlalchemy.orm import Session
+
+from app import crud, models
+from app.crud.crud_analytics import bucket_start
+
+from .conftest import API
+
+def rollup_rows(db: Session, model: Any, product_id: int) -> Dict[Any, Any]:
+    return {
+        row.bucket_start.replace(tzinfo=None): row
+        for row in db.query(model).filter(
+            model.granularity == "hour",
+            model.dimension == "product",
+            model.dimension_id == product_id,
+        )
+    }
+
+def test_sale_is_bucketed_by_its_created_at(
+    client: TestClient,
+    superuser_headers: Dict[str, str],
+    customer: Dict[str, Any],
+    create_product: Callable[..., Dict[str, Any]],
+    db: Session,
+) -> None:
+    product = create_product()
+    response = client.post(f"{API}/sales", json={
+        "product_id": product["id"], "customer_id": customer["id"], "quantity": 2, "unit_price": 3,
+    }, headers=superuser_headers)
+    assert response.status_code == 200, response.text
+    sale = db.get(models.Sale, response.json()["id"])
+
+    deltas = rollup_rows(db, models.SalesRollupDelta, product["id"])
+    hour = bucket_start(sale.created_at, "hour").replace(tzinfo=None)
+    assert list(deltas) == [hour]
+    assert (deltas[hour].sales_count, deltas[hour].units, deltas[hour].revenue) == (1, 2, 6)
+
+def test_fold_keeps_deltas_committed_while_it_runs(
+    create_product: Callable[..., Dict[str, Any]], db: Session
+) -> None:
+    crud.analytics.fold(db)
+    product_id = create_product()["id"]
+    deltas = models.SalesRollupDelta.__table__
+    at = bucket_start(db.query(models.Product).get(product_id).created_at, "hour")
+    row = {
+        "granularity": "hour", "bucket_start": at, "dimension": "product",
+        "dimension_id": product_id, "sales_count": 1, "units": 1, "revenue": 1, "cost": 0,
+        "returns_count": 0, "returned_units": 0, "returned_revenue": 0, "returned_cost": 0,
+    }
+    db.execute(insert(deltas), [dict(row, id=10), dict(row, id=30)])
+    db.commit()
+
+    # A delta with a lower id commits between the fold's read of the first
+    # batch and its delete: it must be left for the next batch
+    inserted = []
+
+    def late_insert(connection: Any, cursor: Any, statement: str, *args: Any) -> None:
+        if not inserted and statement.startswith("DELETE FROM sales_rollup_deltas"):
+            inserted.append(True)
+            connection.execute(insert(deltas), dict(row, id=20))
+
+    connection = db.connection()
+    event.listen(connection, "before_cursor_execute", late_insert)
+    try:
+        assert crud.analytics.fold(db) == 3
+    finally:
+        event.remove(connection, "before_cursor_execute", late_insert)
+
+    assert inserted and db.query(models.SalesRollupDelta).count() == 0
+    rollups = rollup_rows(db, models.SalesRollup, product_id)
+    assert rollups[at.replace(tzinfo=None)].sales_count == 3
+    totals = crud.analytics.get_totals(
+        db, start=at, end=at + timedelta(hours=1), dimension_id=product_id
+    )
+    assert totals["sales_count"] == 3
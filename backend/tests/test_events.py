@@ -0,0 +1,121 @@
+"""
+Events queued on a session reach subscribers only once it commits and are
+dropped on rollback; the stream endpoints authenticate from the Authorization
+header or the `token` query parameter.
+"""
+import time
+from typing import Any, Callable, Dict, Iterator, List, Tuple
+
+import pytest
+from fastapi import HTTPException
+from fastapi.testclient import TestClient
+from sqlalchemy.orm import Session
+from starlette.websockets import WebSocketDisconnect
+
+from app.api import deps
+from app.core.events import bus, publish_after_commit
+from app.core.security import create_access_token
+from app.core.stream import stream_broker
+
+from .conftest import API
+
+@pytest.fixture
+def received() -> Iterator[List[Tuple[str, Dict[str, Any]]]]:
+    events: List[Tuple[str, Dict[str, Any]]] = []
+
+    def handle(topic: str, payload: Dict[str, Any]) -> None:
+        events.append((topic, payload))
+
+    bus.subscribe("test", handle)
+    yield events
+    bus.unsubscribe("test", handle)
+
+def test_events_are_delivered_after_commit(
+    db: Session, received: List[Tuple[str, Dict[str, Any]]]
+) -> None:
+    publish_after_commit(db, "test", {"n": 1})
+    publish_after_commit(db, "test", {"n": 2})
+    db.flush()
+    assert received == []
+    db.commit()
+    assert received == [("test", {"n": 1}), ("test", {"n": 2})]
+    # Delivered once only
+    db.commit()
+    assert len(received) == 2
+
+def test_events_are_dropped_on_rollback(
+    db: Session, received: List[Tuple[str, Dict[str, Any]]]
+) -> None:
+    publish_after_commit(db, "test", {"n": 1})
+    db.rollback()
+    db.commit()
+    assert received == []
+
+def test_a_failing_subscriber_does_not_stop_the_others(
+    db: Session, received: List[Tuple[str, Dict[str, Any]]]
+) -> None:
+    def fail(topic: str, payload: Dict[str, Any]) -> None:
+        raise RuntimeError("broken subscriber")
+
+    bus.subscribe("test", fail)
+    try:
+        publish_after_commit(db, "test", {"n": 1})
+        db.commit()
+    finally:
+        bus.unsubscribe("test", fail)
+    assert received == [("test", {"n": 1})]
+
+def test_stream_user_from_header_or_query(superuser_headers: Dict[str, str]) -> None:
+    token = superuser_headers["Authorization"].split(" ", 1)[1]
+    user_id = deps.decode_token(token)
+    assert deps.get_stream_user(token, None).id == user_id
+    assert deps.get_stream_user(None, token).id == user_id
+    # The header wins over the query parameter
+    assert deps.get_stream_user(token, "not-a-token").id == user_id
+
+    with pytest.raises(HTTPException) as e:
+        deps.get_stream_user(None, None)
+    assert e.value.status_code == 401
+    with pytest.raises(HTTPException) as e:
+        deps.get_stream_user(None, "not-a-token")
+    assert e.value.status_code == 403
+
+def test_sse_stream_needs_a_token(client: TestClient) -> None:
+    response = client.get(f"{API}/stream")
+    assert response.status_code == 401
+    response = client.get(f"{API}/stream", params={"token": "not-a-token"})
+    assert response.status_code == 403
+    response = client.get(f"{API}/stream", params={"topics": "nope"})
+    assert response.status_code == 400
+
+def test_websocket_stream(
+    client: TestClient,
+    superuser_headers: Dict[str, str],
+    customer: Dict[str, Any],
+    create_product: Callable[..., Dict[str, Any]],
+) -> None:
+    with pytest.raises(WebSocketDisconnect) as e:
+        with client.websocket_connect(f"{API}/stream/ws"):
+            pass
+    assert e.value.code == 1008
+
+    product = create_product(stock=5)
+    token = superuser_headers["Authorization"].split(" ", 1)[1]
+    with client.websocket_connect(f"{API}/stream/ws?topics=sale&token={token}") as websocket:
+        # The subscription is registered right after the connection is accepted
+        deadline = time.monotonic() + 5
+        while not len(stream_broker) and time.monotonic() < deadline:
+            time.sleep(0.01)
+        response = client.post(f"{API}/sales", json={
+            "product_id": product["id"], "customer_id": customer["id"], "quantity": 1, "unit_price": 2,
+        }, headers=superuser_headers)
+        assert response.status_code == 200, response.text
+        message = websocket.receive_json()
+    assert message["topic"] == "sale"
+    assert message["data"]["id"] == response.json()["id"]
+
+def test_websocket_rejects_a_token_of_an_unknown_user(client: TestClient) -> None:
+    with pytest.raises(WebSocketDisconnect) as e:
+        with client.websocket_connect(f"{API}/stream/ws?token={create_access_token(999999)}"):
+            pass
+    assert e.value.code == 1008
@@ -0,0 +1,106 @@
+"""
+Exports stream the current user's rows as CSV or NDJSON, in id order, with the
+default fields or just the ones asked for.
+"""
+import csv
+import io
+import json
+from typing import Any, Dict, List
+
+import pytest
+from fastapi.testclient import TestClient
+
+from app.core.config import settings
+
+from .conftest import API
+
+@pytest.fixture(scope="module")
+def exporter(client: TestClient) -> Dict[str, Any]:
+    """
+    A user of its own, so the export holds exactly its three products, and
+    its headers.
+    """
+    user = {"email": "exporter@example.com", "password": "exporter", "full_name": "Exporter"}
+    response = client.post(f"{API}/users/register", json=user)
+    assert response.status_code == 200, response.text
+    response = client.post(
+        f"{API}/login/access-token",
+        data={"username": user["email"], "password": user["password"]},
+    )
+    assert response.status_code == 200, response.text
+    headers = {"Authorization": f"Bearer {response.json()['access_token']}"}
+    response = client.post(f"{API}/categories", json={"name": "export-category"}, headers=headers)
+    assert response.status_code == 200, response.text
+    category_id = response.json()["id"]
+    products = []
+    for n in range(3):
+        response = client.post(f"{API}/products", json={
+            "name": f"export-{n}", "sku": f"EXPORT-{n}", "barcode": f"EXPORT{n}",
+            "price": 2.5, "cost": 1, "stock": n, "min_quantity": 0,
+            "category_id": category_id if n else None,
+        }, headers=headers)
+        assert response.status_code == 200, response.text
+        products.append(response.json())
+    return {"headers": headers, "products": products}
+
+def export(client: TestClient, headers: Dict[str, str], entity: str, **params: Any) -> Any:
+    response = client.get(f"{API}/export/{entity}", params=params, headers=headers)
+    assert response.status_code == 200, response.text
+    return response
+
+def test_csv_export(client: TestClient, exporter: Dict[str, Any]) -> None:
+    response = export(client, exporter["headers"], "products")
+    assert response.headers["content-type"].startswith("text/csv")
+    assert response.headers["content-disposition"].startswith('attachment; filename="products-')
+    rows = list(csv.reader(io.StringIO(response.text)))
+    assert rows[0] == [
+        "id", "name", "sku", "barcode", "price", "cost", "stock",
+        "min_quantity", "category_id", "supplier_id",
+    ]
+    assert [row[1:3] + row[6:7] for row in rows[1:]] == [
+        ["export-0", "EXPORT-0", "0"], ["export-1", "EXPORT-1", "1"], ["export-2", "EXPORT-2", "2"],
+    ]
+    assert [int(row[0]) for row in rows[1:]] == [product["id"] for product in exporter["products"]]
+
+def test_ndjson_export_projects_fields(
+    client: TestClient, exporter: Dict[str, Any], monkeypatch: pytest.MonkeyPatch
+) -> None:
+    # Rows are streamed over several batches
+    monkeypatch.setattr(settings, "EXPORT_BATCH_SIZE", 2)
+    response = export(
+        client, exporter["headers"], "products", format="ndjson", fields="sku, category_name",
+    )
+    assert response.headers["content-type"].startswith("application/x-ndjson")
+    rows: List[Dict[str, Any]] = [json.loads(line) for line in response.text.splitlines()]
+    assert rows == [
+        {"sku": "EXPORT-0", "category_name": None},
+        {"sku": "EXPORT-1", "category_name": "export-category"},
+        {"sku": "EXPORT-2", "category_name": "export-category"},
+    ]
+
+def test_inventory_export_serializes_enums(client: TestClient, exporter: Dict[str, Any]) -> None:
+    response = export(
+        client, exporter["headers"], "inventory", format="ndjson",
+        fields="product_sku,transaction_type,balance_after",
+    )
+    rows = [json.loads(line) for line in response.text.splitlines()]
+    # The opening balance of each product
+    assert rows == [
+        {"product_sku": f"EXPORT-{n}", "transaction_type": "ADJUSTMENT", "balance_after": n}
+        for n in range(3)
+    ]
+
+def test_unknown_fields_are_rejected(client: TestClient, exporter: Dict[str, Any]) -> None:
+    response = client.get(
+        f"{API}/export/products", params={"fields": "name,hashed_password,nope"},
+        headers=exporter["headers"],
+    )
+    assert response.status_code == 400
+    assert response.json()["detail"] == "Unknown fields: hashed_password, nope"
+
+    response = client.get(f"{API}/export/users", headers=exporter["headers"])
+    assert response.status_code == 422
+
+    response = client.get(f"{API}/export/products/fields", headers=exporter["headers"])
+    assert response.status_code == 200
+    assert {"sku", "category_name", "supplier_name"} <= set(response.json())
@@ -0,0 +1,153 @@
+"""
+Every stock change is a ledger row carrying the balance it left behind, so the
+stock at a past time is read from the ledger or from the last snapshot before
+it, and a transfer moves stock between locations in one go.
+"""
+from datetime import datetime, timedelta
+from typing import Any, Callable, Dict, List
+
+from fastapi.testclient import TestClient
+from sqlalchemy.orm import Session
+
+from app import crud, models
+
+from .conftest import API
+
+def ledger(client: TestClient, headers: Dict[str, str], product_id: int) -> List[Dict[str, Any]]:
+    response = client.get(f"{API}/inventory/product/{product_id}", headers=headers)
+    assert response.status_code == 200, response.text
+    return sorted(response.json(), key=lambda entry: entry["id"])
+
+def stock_at(
+    client: TestClient, headers: Dict[str, str], product_id: int, at: str, **params: Any
+) -> Any:
+    return client.get(
+        f"{API}/inventory/product/{product_id}/stock",
+        params=dict(params, at=at), headers=headers,
+    )
+
+def test_ledger_rows_carry_the_balance_after(
+    client: TestClient,
+    superuser_headers: Dict[str, str],
+    customer: Dict[str, Any],
+    create_product: Callable[..., Dict[str, Any]],
+) -> None:
+    product = create_product(stock=10)
+    for transaction_type, quantity in [("IN", 5), ("OUT", 3), ("ADJUSTMENT", 7)]:
+        response = client.post(f"{API}/inventory/", json={
+            "product_id": product["id"], "quantity": quantity, "transaction_type": transaction_type,
+        }, headers=superuser_headers)
+        assert response.status_code == 200, response.text
+
+    response = client.post(f"{API}/inventory/", json={
+        "product_id": product["id"], "quantity": 8, "transaction_type": "OUT",
+    }, headers=superuser_headers)
+    assert response.status_code == 400
+    assert response.json()["detail"] == "Insufficient stock"
+
+    response = client.post(f"{API}/sales", json={
+        "product_id": product["id"], "customer_id": customer["id"], "quantity": 2, "unit_price": 2,
+    }, headers=superuser_headers)
+    assert response.status_code == 200, response.text
+
+    entries = ledger(client, superuser_headers, product["id"])
+    # The opening balance written on creation comes first
+    assert [entry["balance_after"] for entry in entries] == [10, 15, 12, 7, 5]
+    response = client.get(f"{API}/products/{product['id']}", headers=superuser_headers)
+    assert response.json()["stock"] == 5
+
+def test_transfer_moves_stock_between_locations(
+    client: TestClient,
+    superuser_headers: Dict[str, str],
+    create_product: Callable[..., Dict[str, Any]],
+) -> None:
+    product = create_product(stock=10)
+    locations = []
+    for name in ("transfer-warehouse", "transfer-store"):
+        response = client.post(f"{API}/locations", json={"name": name}, headers=superuser_headers)
+        assert response.status_code == 200, response.text
+        locations.append(response.json()["id"])
+    warehouse, store = locations
+
+    def transfer(quantity: int, from_location_id: Any, to_location_id: Any) -> Any:
+        return client.post(f"{API}/locations/transfers", json={
+            "product_id": product["id"], "quantity": quantity,
+            "from_location_id": from_location_id, "to_location_id": to_location_id,
+        }, headers=superuser_headers)
+
+    response = transfer(4, None, warehouse)
+    assert response.status_code == 200, response.text
+    response = transfer(3, warehouse, store)
+    assert response.status_code == 200, response.text
+    moved = response.json()
+    assert (moved["out"]["transaction_type"], moved["out"]["balance_after"]) == ("OUT", 1)
+    assert (moved["into"]["transaction_type"], moved["into"]["balance_after"]) == ("IN", 3)
+    assert moved["out"]["reference"] == f"transfer:{moved['into']['id']}"
+    assert moved["into"]["reference"] == f"transfer:{moved['out']['id']}"
+
+    assert transfer(2, warehouse, store).status_code == 400
+    assert transfer(1, store, store).status_code == 400
+    assert transfer(1, 999999, store).status_code == 404
+
+    response = client.get(
+        f"{API}/locations/stock/product/{product['id']}", headers=superuser_headers
+    )
+    assert response.status_code == 200, response.text
+    stock = response.json()
+    assert (stock["unassigned"], stock["total"]) == (6, 10)
+    assert {level["location_id"]: level["stock"] for level in stock["locations"]} == {
+        warehouse: 1, store: 3,
+    }
+
+def test_stock_at_a_past_time(
+    client: TestClient,
+    superuser_headers: Dict[str, str],
+    create_product: Callable[..., Dict[str, Any]],
+    db: Session,
+) -> None:
+    product = create_product(stock=10)
+    opening, = ledger(client, superuser_headers, product["id"])
+    response = stock_at(client, superuser_headers, product["id"], opening["created_at"])
+    assert response.status_code == 200, response.text
+    assert response.json()["stock"] == 10
+
+    response = client.post(f"{API}/inventory/", json={
+        "product_id": product["id"], "quantity": 5, "transaction_type": "IN",
+    }, headers=superuser_headers)
+    assert response.status_code == 200, response.text
+    entry = response.json()
+    response = stock_at(client, superuser_headers, product["id"], entry["created_at"])
+    assert response.json()["stock"] == 15
+
+    # Before the opening balance, with no snapshot, the stock is unknown
+    before = (datetime.fromisoformat(entry["created_at"]) - timedelta(days=1)).isoformat()
+    response = stock_at(client, superuser_headers, product["id"], before)
+    assert response.status_code == 404
+    assert response.json()["detail"] == "No stock history for this time"
+
+    db.add(models.StockSnapshot(
+        product_id=product["id"], stock=9,
+        taken_at=datetime.fromisoformat(entry["created_at"]) - timedelta(days=2),
+    ))
+    db.commit()
+    response = stock_at(client, superuser_headers, product["id"], before)
+    assert response.status_code == 200, response.text
+    assert response.json()["stock"] == 9
+
+def test_snapshot_records_current_stock(
+    client: TestClient,
+    superuser_headers: Dict[str, str],
+    create_product: Callable[..., Dict[str, Any]],
+    db: Session,
+) -> None:
+    product = create_product(stock=7)
+    assert crud.inventory.take_snapshot(db) > 0
+    snapshot = db.query(models.StockSnapshot).filter(
+        models.StockSnapshot.product_id == product["id"],
+        models.StockSnapshot.location_id.is_(None),
+    ).one()
+    assert snapshot.stock == 7
+    response = stock_at(
+        client, superuser_headers, product["id"], (datetime.utcnow() + timedelta(days=1)).isoformat()
+    )
+    assert response.json()["stock"] == 7
@@ -0,0 +1,175 @@
+"""
+A product enters and leaves the low stock set in the same transaction as the
+stock change, the change is announced once it commits, and the digest sends
+what changed through the configured sink.
+"""
+import logging
+from typing import Any, Callable, Dict, Iterator, List, Tuple
+
+import pytest
+from fastapi.testclient import TestClient
+from sqlalchemy.orm import Session
+
+from app import models
+from app.core.config import settings
+from app.core.events import bus
+from app.notifications import LogSink, LowStockDigest, SMTPSink, get_sink
+
+from .conftest import API
+
+@pytest.fixture
+def low_stock_events() -> Iterator[List[Dict[str, Any]]]:
+    events: List[Dict[str, Any]] = []
+
+    def handle(topic: str, payload: Dict[str, Any]) -> None:
+        events.append(payload)
+
+    bus.subscribe("low_stock", handle)
+    yield events
+    bus.unsubscribe("low_stock", handle)
+
+def listed(db: Session, product_id: int) -> bool:
+    db.expire_all()
+    return db.query(models.LowStockProduct).filter(
+        models.LowStockProduct.product_id == product_id
+    ).first() is not None
+
+def test_sale_return_and_update_move_the_product(
+    client: TestClient,
+    superuser_headers: Dict[str, str],
+    customer: Dict[str, Any],
+    create_product: Callable[..., Dict[str, Any]],
+    db: Session,
+    low_stock_events: List[Dict[str, Any]],
+) -> None:
+    product = create_product(stock=3, min_quantity=1)
+    assert not listed(db, product["id"])
+
+    response = client.post(f"{API}/sales", json={
+        "product_id": product["id"], "customer_id": customer["id"], "quantity": 2, "unit_price": 2,
+    }, headers=superuser_headers)
+    assert response.status_code == 200, response.text
+    assert listed(db, product["id"])
+
+    response = client.post(f"{API}/returns/", json={
+        "sale_id": response.json()["id"], "product_id": product["id"], "quantity": 1,
+    }, headers=superuser_headers)
+    assert response.status_code == 200, response.text
+    assert not listed(db, product["id"])
+
+    fields = {name: product[name] for name in ("name", "sku", "barcode", "price", "cost")}
+    response = client.put(f"{API}/products/{product['id']}", json=dict(
+        fields, stock=2, min_quantity=5,
+    ), headers=superuser_headers)
+    assert response.status_code == 200, response.text
+    assert listed(db, product["id"])
+    response = client.put(f"{API}/products/{product['id']}", json=dict(
+        fields, stock=6, min_quantity=5,
+    ), headers=superuser_headers)
+    assert response.status_code == 200, response.text
+    assert not listed(db, product["id"])
+
+    ours = [event for event in low_stock_events if event["product_id"] == product["id"]]
+    assert [(event["low"], event["stock"]) for event in ours] == [
+        (True, 1), (False, 2), (True, 2), (False, 6),
+    ]
+
+def test_rejected_sale_announces_nothing(
+    client: TestClient,
+    superuser_headers: Dict[str, str],
+    customer: Dict[str, Any],
+    create_product: Callable[..., Dict[str, Any]],
+    db: Session,
+    low_stock_events: List[Dict[str, Any]],
+) -> None:
+    product = create_product(stock=2, min_quantity=1)
+    response = client.post(f"{API}/sales", json={
+        "product_id": product["id"], "customer_id": customer["id"], "quantity": 3, "unit_price": 2,
+    }, headers=superuser_headers)
+    assert response.status_code == 400
+    assert not listed(db, product["id"])
+    assert not [event for event in low_stock_events if event["product_id"] == product["id"]]
+
+class RecordingSink:
+    def __init__(self) -> None:
+        self.sent: List[Tuple[str, str]] = []
+
+    def send(self, subject: str, body: str) -> None:
+        self.sent.append((subject, body))
+
+def change(product_id: int, low: bool, stock: int) -> Dict[str, Any]:
+    return {
+        "product_id": product_id, "name": f"digest-{product_id}", "sku": f"DIGEST-{product_id}",
+        "stock": stock, "min_quantity": 2, "low": low,
+    }
+
+def test_digest_reports_the_latest_state_once() -> None:
+    digest = LowStockDigest(interval=3600)
+    digest.sink = sink = RecordingSink()
+    assert digest.flush() == 0
+
+    digest.handle("low_stock", change(1, True, 2))
+    digest.handle("low_stock", change(1, False, 5))
+    digest.handle("low_stock", change(2, True, 0))
+    assert digest.flush() == 2
+    (subject, body), = sink.sent
+    assert subject == "Low stock: 1 product(s) low, 1 back in stock"
+    assert body.splitlines() == [
+        "Low on stock (1):",
+        "  digest-2 (DIGEST-2): 0 left, minimum 2",
+        "",
+        "Back in stock (1):",
+        "  digest-1 (DIGEST-1): 5",
+    ]
+    assert digest.flush() == 0
+
+def test_digest_survives_a_failing_sink(caplog: pytest.LogCaptureFixture) -> None:
+    class FailingSink:
+        def send(self, subject: str, body: str) -> None:
+            raise OSError("unreachable")
+
+    digest = LowStockDigest(interval=3600)
+    digest.sink = FailingSink()
+    digest.handle("low_stock", change(1, True, 0))
+    with caplog.at_level(logging.ERROR, logger="app.notifications"):
+        assert digest.flush() == 1
+    assert "Could not send the low stock digest" in caplog.text
+
+def test_sinks(monkeypatch: pytest.MonkeyPatch, caplog: pytest.LogCaptureFixture) -> None:
+    monkeypatch.setattr(settings, "LOW_STOCK_NOTIFY_SINK", "none")
+    assert get_sink() is None
+
+    monkeypatch.setattr(settings, "LOW_STOCK_NOTIFY_SINK", "log")
+    sink = get_sink()
+    assert isinstance(sink, LogSink)
+    with caplog.at_level(logging.WARNING, logger="app.notifications"):
+        sink.send("subject", "body")
+    assert "subject\nbody" in caplog.text
+
+    monkeypatch.setattr(settings, "LOW_STOCK_NOTIFY_SINK", "smtp")
+    monkeypatch.setattr(settings, "LOW_STOCK_NOTIFY_TO", "a@example.com, b@example.com")
+    sink = get_sink()
+    assert isinstance(sink, SMTPSink)
+    assert sink.recipients == ["a@example.com", "b@example.com"]
+
+    sent = []
+
+    class FakeSMTP:
+        def __init__(self, host: str, port: int, timeout: float) -> None:
+            self.address = (host, port)
+
+        def __enter__(self) -> "FakeSMTP":
+            return self
+
+        def __exit__(self, *exc: Any) -> None:
+            pass
+
+        def send_message(self, message: Any) -> None:
+            sent.append((self.address, message))
+
+    monkeypatch.setattr("app.notifications.smtplib.SMTP", FakeSMTP)
+    sink.send("subject", "body")
+    (address, message), = sent
+    assert address == (settings.SMTP_HOST, settings.SMTP_PORT)
+    assert (message["Subject"], message["To"]) == ("subject", "a@example.com, b@example.com")
+    assert message.get_content().strip() == "body"
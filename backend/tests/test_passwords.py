@@ -0,0 +1,60 @@
+"""
+Password hashing is bounded: a caller that cannot get a slot within the queue
+timeout is turned away with a 503 instead of waiting.
+"""
+import asyncio
+import time
+from typing import Any
+
+import pytest
+from fastapi.testclient import TestClient
+
+from app.core.passwords import PasswordHashBusy, PasswordHasher
+
+from .conftest import API
+
+def test_busy_hasher_rejects_after_queue_timeout() -> None:
+    hasher = PasswordHasher(workers=0, concurrency=1, queue_timeout=0.05)
+
+    async def burst() -> Any:
+        # The first operation holds the only slot longer than the timeout
+        slow = asyncio.ensure_future(hasher._run("hash", time.sleep, 0.5))
+        await asyncio.sleep(0)
+        with pytest.raises(PasswordHashBusy):
+            await hasher.hash("secret")
+        return await slow
+
+    asyncio.run(burst())
+    stats = hasher.stats()
+    assert (stats["rejected"], stats["hash"], stats["in_flight"]) == (1, 1, 0)
+
+def test_login_gets_503_when_hashing_is_saturated(
+    client: TestClient, monkeypatch: pytest.MonkeyPatch
+) -> None:
+    # No slots at all: every password check waits out the queue timeout
+    busy = PasswordHasher(workers=0, concurrency=0, queue_timeout=0.01)
+    monkeypatch.setattr("app.crud.crud_user.password_hasher", busy)
+    response = client.post(
+        f"{API}/login/access-token",
+        data={"username": "admin@example.com", "password": "admin"},
+    )
+    assert response.status_code == 503, response.text
+    assert response.headers["Retry-After"] == "1"
+    assert busy.stats()["rejected"] == 1
+
+def test_register_and_login_through_the_hasher(client: TestClient) -> None:
+    user = {"email": "hasher@example.com", "password": "s3cret", "full_name": "Hasher"}
+    response = client.post(f"{API}/users/register", json=user)
+    assert response.status_code == 200, response.text
+    assert client.post(f"{API}/users/register", json=user).status_code == 400
+
+    response = client.post(
+        f"{API}/login/access-token",
+        data={"username": user["email"], "password": user["password"]},
+    )
+    assert response.status_code == 200, response.text
+    response = client.post(
+        f"{API}/login/access-token",
+        data={"username": user["email"], "password": "wrong"},
+    )
+    assert response.status_code == 400
@@ -0,0 +1,99 @@
+"""
+Imports insert new SKUs and update existing ones, resolve category and
+supplier names, skip bad rows into the report, and put stock changes of
+existing products on the ledger.
+"""
+from typing import Any, Callable, Dict, List
+
+import pytest
+from fastapi.testclient import TestClient
+
+from .conftest import API
+
+def upload(client: TestClient, headers: Dict[str, str], filename: str, content: str) -> Dict[str, Any]:
+    response = client.post(
+        f"{API}/products/import", files={"file": (filename, content.encode())}, headers=headers
+    )
+    assert response.status_code == 200, response.text
+    return response.json()
+
+def by_sku(client: TestClient, headers: Dict[str, str], sku: str) -> Dict[str, Any]:
+    response = client.get(f"{API}/products/sku/{sku}", headers=headers)
+    assert response.status_code == 200, response.text
+    return response.json()
+
+def ledger(client: TestClient, headers: Dict[str, str], product_id: int) -> List[Dict[str, Any]]:
+    response = client.get(f"{API}/inventory/product/{product_id}", headers=headers)
+    assert response.status_code == 200, response.text
+    return sorted(response.json(), key=lambda entry: entry["id"])
+
+@pytest.fixture(scope="module")
+def names(client: TestClient, superuser_headers: Dict[str, str]) -> Dict[str, int]:
+    ids = {}
+    for kind, name in (("categories", "import-category"), ("suppliers", "import-supplier")):
+        response = client.post(f"{API}/{kind}", json={"name": name}, headers=superuser_headers)
+        assert response.status_code == 200, response.text
+        ids[kind] = response.json()["id"]
+    return ids
+
+def test_csv_import_inserts_updates_and_reports(
+    client: TestClient,
+    superuser_headers: Dict[str, str],
+    create_product: Callable[..., Dict[str, Any]],
+    names: Dict[str, int],
+) -> None:
+    existing = create_product(name="import-existing", sku="IMPORT-EXISTING", stock=5)
+    report = upload(client, superuser_headers, "catalog.csv", "\n".join([
+        "name,sku,barcode,price,cost,stock,min_quantity,category,supplier",
+        "import-new,IMPORT-NEW,IMPORTNEW,4,2,10,1,import-category,import-supplier",
+        "import-existing,IMPORT-EXISTING,,3,1,8,1,,",
+        "import-bad-price,IMPORT-BAD,,abc,1,1,1,,",
+        "import-unknown,IMPORT-UNKNOWN,,1,1,1,1,no-such-category,",
+        "import-again,IMPORT-NEW,,1,1,1,1,,",
+        "import-no-sku,,,1,1,1,1,,",
+    ]) + "\n")
+    assert {key: report[key] for key in ("total", "inserted", "updated", "failed")} == {
+        "total": 6, "inserted": 1, "updated": 1, "failed": 4,
+    }
+    errors = {error["row"]: (error["sku"], error["errors"]) for error in report["errors"]}
+    assert errors[4] == ("IMPORT-UNKNOWN", ["category: unknown category 'no-such-category'"])
+    assert errors[5] == ("IMPORT-NEW", ["sku: duplicate in import"])
+    assert errors[6] == (None, ["sku: required for import"])
+    sku, messages = errors[3]
+    assert sku == "IMPORT-BAD" and messages[0].startswith("price: ")
+
+    new = by_sku(client, superuser_headers, "IMPORT-NEW")
+    assert (new["category_id"], new["supplier_id"], new["stock"]) == (
+        names["categories"], names["suppliers"], 10,
+    )
+    assert [entry["balance_after"] for entry in ledger(client, superuser_headers, new["id"])] == [10]
+
+    updated = by_sku(client, superuser_headers, "IMPORT-EXISTING")
+    assert (updated["id"], updated["price"], updated["stock"]) == (existing["id"], 3, 8)
+    adjustment = ledger(client, superuser_headers, existing["id"])[-1]
+    assert (adjustment["transaction_type"], adjustment["quantity"], adjustment["balance_after"]) == (
+        "ADJUSTMENT", 8, 8,
+    )
+    assert adjustment["reference"] == "import"
+
+def test_ndjson_import_keeps_missing_columns(
+    client: TestClient,
+    superuser_headers: Dict[str, str],
+    create_product: Callable[..., Dict[str, Any]],
+) -> None:
+    existing = create_product(
+        name="import-partial", sku="IMPORT-PARTIAL", description="kept", stock=5
+    )
+    entries = len(ledger(client, superuser_headers, existing["id"]))
+    report = upload(client, superuser_headers, "catalog.ndjson", "\n".join([
+        '{"name": "import-partial", "sku": "IMPORT-PARTIAL", '
+        '"price": 7, "cost": 1, "stock": 5, "min_quantity": 1}',
+        '"not an object"',
+    ]) + "\n")
+    assert (report["updated"], report["failed"]) == (1, 1)
+    assert report["errors"] == [{"row": 2, "sku": None, "errors": ["Expected an object"]}]
+
+    updated = by_sku(client, superuser_headers, "IMPORT-PARTIAL")
+    assert (updated["price"], updated["description"], updated["stock"]) == (7, "kept", 5)
+    # The stock did not change, so nothing was added to the ledger
+    assert len(ledger(client, superuser_headers, existing["id"])) == entries
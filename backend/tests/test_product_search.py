@@ -0,0 +1,111 @@
+"""
+Search ranks exact SKU/barcode matches first, then prefixes, then substrings;
+lookup answers from the in-process index and only asks the database for codes
+the index does not know.
+"""
+from typing import Any, Callable, Dict, List
+
+from fastapi.testclient import TestClient
+from sqlalchemy import insert
+from sqlalchemy.orm import Session
+
+from app import models
+from app.db.query_stats import capture_queries
+from app.product_index import product_index
+
+from .conftest import API
+
+def search(client: TestClient, headers: Dict[str, str], q: str) -> List[int]:
+    response = client.get(f"{API}/products/search", params={"q": q}, headers=headers)
+    assert response.status_code == 200, response.text
+    return [product["id"] for product in response.json()]
+
+def test_search_ranks_exact_then_prefix_then_substring(
+    client: TestClient,
+    superuser_headers: Dict[str, str],
+    create_product: Callable[..., Dict[str, Any]],
+) -> None:
+    substring = create_product(name="striped qzebra lamp")
+    described = create_product(description="looks like a qzebra")
+    prefix = create_product(name="Qzebra stripes")
+    exact = create_product(sku="qzebra")
+    create_product(name="unrelated")
+
+    assert search(client, superuser_headers, "qzebra") == [
+        exact["id"], prefix["id"], substring["id"], described["id"],
+    ]
+    # An exact barcode ranks above a name prefix too
+    assert search(client, superuser_headers, prefix["barcode"])[0] == prefix["id"]
+
+def test_search_treats_wildcards_literally(
+    client: TestClient,
+    superuser_headers: Dict[str, str],
+    create_product: Callable[..., Dict[str, Any]],
+) -> None:
+    literal = create_product(name="qwild 50% off")
+    create_product(name="qwild 500 off")
+    assert search(client, superuser_headers, "qwild 50%") == [literal["id"]]
+    assert search(client, superuser_headers, "qwild_5") == []
+
+def test_lookup_splits_hits_and_missing(
+    client: TestClient,
+    superuser_headers: Dict[str, str],
+    create_product: Callable[..., Dict[str, Any]],
+    db: Session,
+) -> None:
+    product_index.warm_up(db)
+    by_barcode = create_product()
+    by_sku = create_product()
+    codes = [by_barcode["barcode"], by_sku["sku"], "NO-SUCH-CODE", by_barcode["barcode"], "NO-SUCH-CODE"]
+
+    with capture_queries() as captured:
+        response = client.post(
+            f"{API}/products/lookup", json={"codes": codes}, headers=superuser_headers
+        )
+    assert response.status_code == 200, response.text
+    result = response.json()
+    assert {code: product["id"] for code, product in result["products"].items()} == {
+        by_barcode["barcode"]: by_barcode["id"], by_sku["sku"]: by_sku["id"],
+    }
+    assert result["missing"] == ["NO-SUCH-CODE"]
+    # Both products were put in the index on creation: only the unknown code
+    # reached the products table
+    products_queries = [
+        statement for statement in captured.statements or () if "FROM products" in statement
+    ]
+    assert len(products_queries) == 1
+
+def test_lookup_falls_back_to_the_database(
+    client: TestClient,
+    superuser_headers: Dict[str, str],
+    db: Session,
+) -> None:
+    product_index.warm_up(db)
+    admin = db.query(models.User.id).filter(models.User.email == "admin@example.com").scalar()
+    # Written behind the index's back, like a bulk import by another worker
+    db.execute(insert(models.Product.__table__), [{
+        "name": "lookup-unindexed", "sku": "LOOKUP-UNINDEXED", "barcode": "LOOKUPUNINDEXED",
+        "price": 2, "cost": 1, "stock": 1, "min_quantity": 0, "created_by": admin,
+    }])
+    db.commit()
+
+    response = client.post(f"{API}/products/lookup", json={
+        "codes": ["LOOKUPUNINDEXED", "LOOKUP-UNINDEXED"],
+    }, headers=superuser_headers)
+    assert response.status_code == 200, response.text
+    result = response.json()
+    assert {product["name"] for product in result["products"].values()} == {"lookup-unindexed"}
+    assert set(result["products"]) == {"LOOKUPUNINDEXED", "LOOKUP-UNINDEXED"}
+    assert result["missing"] == []
+    # The products found were added to the index
+    with capture_queries() as captured:
+        response = client.post(f"{API}/products/lookup", json={
+            "codes": ["LOOKUPUNINDEXED"],
+        }, headers=superuser_headers)
+    assert set(response.json()["products"]) == {"LOOKUPUNINDEXED"}
+    assert not any("FROM products" in statement for statement in captured.statements or ())
+
+    response = client.post(
+        f"{API}/products/lookup", json={"codes": []}, headers=superuser_headers
+    )
+    assert response.status_code == 422
@@ -0,0 +1,76 @@
+"""
+Upper bounds on the SQL statements the hot endpoints run, so that an N+1
+query or a lost eager load fails here instead of in production.
+"""
+from typing import Dict
+
+import pytest
+from fastapi.testclient import TestClient
+
+from app.core.config import settings
+from app.db.query_stats import assert_max_queries
+
+API = settings.API_V1_STR
+
+@pytest.fixture(scope="module")
+def catalog(client: TestClient, superuser_headers: Dict[str, str]) -> Dict[str, int]:
+    category = client.post(
+        f"{API}/categories", json={"name": "budget-category"}, headers=superuser_headers
+    ).json()
+    supplier = client.post(
+        f"{API}/suppliers", json={"name": "budget-supplier"}, headers=superuser_headers
+    ).json()
+    customer = client.post(
+        f"{API}/customers", json={"full_name": "budget-customer"}, headers=superuser_headers
+    ).json()
+    product_ids = []
+    for n in range(20):
+        response = client.post(f"{API}/products", json={
+            "name": f"budget-{n}", "sku": f"BUDGET-{n}", "barcode": f"BUDGET{n}",
+            "price": 2, "cost": 1, "stock": 1000, "min_quantity": 1,
+            "category_id": category["id"], "supplier_id": supplier["id"],
+        }, headers=superuser_headers)
+        assert response.status_code == 200, response.text
+        product_ids.append(response.json()["id"])
+    for product_id in product_ids:
+        response = client.post(f"{API}/sales", json={
+            "product_id": product_id, "customer_id": customer["id"], "quantity": 1, "unit_price": 2,
+        }, headers=superuser_headers)
+        assert response.status_code == 200, response.text
+    return {"product_id": product_ids[0], "customer_id": customer["id"]}
+
+def test_create_sale(
+    client: TestClient, superuser_headers: Dict[str, str], catalog: Dict[str, int]
+) -> None:
+    sale = {
+        "product_id": catalog["product_id"], "customer_id": catalog["customer_id"],
+        "quantity": 1, "unit_price": 2,
+    }
+    # Customer check, stock update, low stock sync, ledger, sale and rollup
+    # inserts, ledger reference, sale reload; without RETURNING (SQLite), the
+    # re-reads of the stock and of the sale's created_at. The product's
+    # category and supplier come from the reference cache.
+    with assert_max_queries(10):
+        response = client.post(f"{API}/sales", json=sale, headers=superuser_headers)
+    assert response.status_code == 200, response.text
+
+def test_list_products(
+    client: TestClient, superuser_headers: Dict[str, str], catalog: Dict[str, int]
+) -> None:
+    # The first request fills the reference cache
+    client.get(f"{API}/products", headers=superuser_headers)
+    # ETag version and the page, whatever the page size
+    with assert_max_queries(2):
+        response = client.get(f"{API}/products", headers=superuser_headers)
+    assert response.status_code == 200, response.text
+    assert len(response.json()) >= 20
+
+def test_list_sales(
+    client: TestClient, superuser_headers: Dict[str, str], catalog: Dict[str, int]
+) -> None:
+    client.get(f"{API}/sales", headers=superuser_headers)
+    # The page, with products and customers joined in
+    with assert_max_queries(1):
+        response = client.get(f"{API}/sales", headers=superuser_headers)
+    assert response.status_code == 200, response.text
+    assert len(response.json()) >= 20
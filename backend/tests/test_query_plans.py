@@ -0,0 +1,189 @@
+"""
+The list and lookup endpoints must be served by the index added for them, not
+by a table scan.
+
+Each endpoint is called through the TestClient, the SELECTs it runs are
+captured with their parameters, and the test database's EXPLAIN of those exact
+statements is checked. Runs on the tests' SQLite database, or on PostgreSQL
+when TEST_POSTGRES_URI is set (see conftest.py).
+"""
+import random
+import re
+from datetime import datetime, timedelta, timezone
+from typing import Any, Callable, Dict, List, Tuple
+
+import pytest
+from fastapi.testclient import TestClient
+from sqlalchemy import func, insert, text
+from sqlalchemy.engine import Connection
+from sqlalchemy.orm import Session
+
+from app import crud, models
+from app.core.pagination import encode_cursor
+from app.core.security import create_access_token
+from app.db.query_stats import capture_queries
+from app.db.session import SessionLocal, engine
+
+from .conftest import API
+
+SALES = 5000
+
+def add(db: Session, model: Any, rows: List[Dict[str, Any]]) -> List[int]:
+    before = db.query(func.max(model.id)).scalar() or 0
+    db.execute(insert(model.__table__), rows)
+    return [id for id, in db.query(model.id).filter(model.id > before).order_by(model.id)]
+
+@pytest.fixture(scope="module")
+def plans(client: TestClient) -> Dict[str, Any]:
+    """
+    A user of its own with enough products, sales, ledger rows and returns
+    for the planner to prefer indexes, and a token for it.
+    """
+    rng = random.Random(0)
+    db = SessionLocal()
+    try:
+        user_id, = add(db, models.User, [{
+            "email": "plans@example.com", "hashed_password": "x",
+            "is_active": True, "is_superuser": False,
+        }])
+        others = add(db, models.User, [{
+            "email": f"plans-{n}@example.com", "hashed_password": "x",
+            "is_active": True, "is_superuser": False,
+        } for n in range(9)])
+        users = [user_id] + others
+        categories = add(db, models.Category, [{"name": f"plans-category-{n}"} for n in range(20)])
+        suppliers = add(db, models.Supplier, [{"name": f"plans-supplier-{n}"} for n in range(20)])
+        customers = add(db, models.Customer, [{"full_name": f"plans-customer-{n}"} for n in range(500)])
+        products = add(db, models.Product, [{
+            "name": f"plans-{n}", "sku": f"PLANS-{n}", "barcode": f"PLANS{n}",
+            "price": 2, "cost": 1, "stock": rng.randint(0, 100), "min_quantity": 5,
+            "category_id": rng.choice(categories), "supplier_id": rng.choice(suppliers),
+            "created_by": rng.choice(users),
+        } for n in range(SALES // 5)])
+        start = datetime.now(timezone.utc) - timedelta(days=365)
+        sales = add(db, models.Sale, [{
+            "product_id": rng.choice(products), "customer_id": rng.choice(customers),
+            "quantity": 1, "unit_price": 2, "total_amount": 2,
+            "created_at": start + timedelta(minutes=n), "created_by": rng.choice(users),
+        } for n in range(SALES)])
+        add(db, models.InventoryTransaction, [{
+            "product_id": rng.choice(products), "quantity": 1,
+            "transaction_type": models.TransactionType.IN, "created_by": rng.choice(users),
+        } for _ in range(SALES // 2)])
+        add(db, models.Return, [{
+            "sale_id": rng.choice(sales), "product_id": rng.choice(products),
+            "quantity": 1, "created_by": rng.choice(users),
+        } for _ in range(SALES // 20)])
+        crud.low_stock.sync(db, product_ids=products)
+        db.commit()
+        db.execute(text("ANALYZE"))
+        db.commit()
+    finally:
+        db.close()
+    day = (start + timedelta(days=1)).date()
+    return {
+        "headers": {"Authorization": f"Bearer {create_access_token(user_id)}"},
+        "product_id": products[0],
+        "category_id": categories[0],
+        "supplier_id": suppliers[0],
+        "customer_id": customers[0],
+        "sale_id": sales[0],
+        "after": encode_cursor(sales[len(sales) // 2]),
+        "day": day.isoformat(),
+        "next_day": (day + timedelta(days=1)).isoformat(),
+    }
+
+# (endpoint, table that must not be scanned, names of which one must be in
+# the plan, URL)
+ENDPOINTS: List[Tuple[str, str, Tuple[str, ...], Callable[[Dict[str, Any]], str]]] = [
+    ("GET /sales", "sales", ("ix_sales_created_by_id",), lambda ids: "/sales"),
+    ("GET /sales?after=", "sales", ("ix_sales_created_by_id",),
+        lambda ids: f"/sales?after={ids['after']}"),
+    ("GET /sales?start_date&end_date", "sales", ("ix_sales_created_by_created_at_id",),
+        lambda ids: f"/sales?start_date={ids['day']}&end_date={ids['day']}"),
+    ("GET /sales?customer_id", "sales", ("ix_sales_customer_id", "ix_sales_created_by_id"),
+        lambda ids: f"/sales?customer_id={ids['customer_id']}"),
+    ("GET /sales/summary", "sales", ("ix_sales_created_at",),
+        lambda ids: f"/sales/summary?start_date={ids['day']}&end_date={ids['next_day']}"),
+    ("GET /inventory", "inventory_transactions", ("ix_inventory_transactions_created_by_id",),
+        lambda ids: "/inventory/"),
+    ("GET /inventory/product/{id}", "inventory_transactions", (
+        "ix_inventory_transactions_product_id_created_by",
+        "ix_inventory_transactions_product_location_created_at",
+    ), lambda ids: f"/inventory/product/{ids['product_id']}"),
+    ("GET /products", "products", ("ix_products_created_by_id",), lambda ids: "/products"),
+    ("GET /products/category/{id}", "products", ("ix_products_category_id",),
+        lambda ids: f"/products/category/{ids['category_id']}"),
+    ("GET /products/supplier/{id}", "products", ("ix_products_supplier_id",),
+        lambda ids: f"/products/supplier/{ids['supplier_id']}"),
+    ("GET /products/barcode/{barcode}", "products", ("ix_products_barcode",),
+        lambda ids: "/products/barcode/PLANS1"),
+    ("GET /products/sku/{sku}", "products", ("ix_products_sku",),
+        lambda ids: "/products/sku/PLANS-1"),
+    # The small low_stock_products set is read whole, products by id
+    ("GET /products/low-stock", "products", ("low_stock_products",),
+        lambda ids: "/products/low-stock"),
+    ("GET /returns?sale_id", "returns", ("ix_returns_sale_id",),
+        lambda ids: f"/returns/?sale_id={ids['sale_id']}"),
+    ("GET /returns?product_id", "returns", ("ix_returns_product_id",),
+        lambda ids: f"/returns/?product_id={ids['product_id']}"),
+]
+
+# SQLite cannot prove that `barcode = ?` satisfies the partial index's
+# `barcode != ''`, PostgreSQL can
+POSTGRESQL_ONLY = {"GET /products/barcode/{barcode}"}
+
+def explain(connection: Connection, statement: str, parameters: Any) -> List[str]:
+    if connection.dialect.name == "sqlite":
+        result = connection.exec_driver_sql(f"EXPLAIN QUERY PLAN {statement}", parameters)
+        return [row[-1] for row in result]
+    result = connection.exec_driver_sql(f"EXPLAIN {statement}", parameters)
+    return [row[0] for row in result]
+
+def scans(dialect: str, plan: List[str], table: str) -> bool:
+    if dialect == "sqlite":
+        return any(re.fullmatch(rf"SCAN {table}( AS \w+)?", line) for line in plan)
+    return any(re.search(rf"Seq Scan on {table}\b", line) for line in plan)
+
+@pytest.mark.parametrize(
+    "endpoint, table, indexes, url", ENDPOINTS, ids=[endpoint[0] for endpoint in ENDPOINTS]
+)
+def test_endpoint_uses_index(
+    client: TestClient,
+    plans: Dict[str, Any],
+    endpoint: str,
+    table: str,
+    indexes: Tuple[str, ...],
+    url: Callable[[Dict[str, Any]], str],
+) -> None:
+    dialect = engine.dialect.name
+    if dialect != "postgresql" and endpoint in POSTGRESQL_ONLY:
+        pytest.skip(f"{endpoint} is only checked on PostgreSQL")
+    with capture_queries() as captured:
+        response = client.get(f"{API}{url(plans)}", headers=plans["headers"])
+    assert response.status_code == 200, response.text
+    selects = [
+        (statement, parameters)
+        for statement, parameters in zip(captured.statements or (), captured.parameters or ())
+        if statement.lstrip().upper().startswith("SELECT")
+        and re.search(rf"\b(FROM|JOIN) {table}\b", statement)
+    ]
+    assert selects, f"{endpoint} ran no query on {table}"
+
+    plans_text = []
+    with engine.begin() as connection:
+        if dialect == "postgresql":
+            # Price sequential scans out on these small tables, so the plan
+            # shows whether an index can serve the query at all
+            connection.exec_driver_sql("SET LOCAL enable_seqscan = off")
+        for statement, parameters in selects:
+            plan = explain(connection, statement, parameters)
+            listing = "\n".join(plan)
+            assert not scans(dialect, plan, table), (
+                f"{endpoint} scans {table}:\n{statement}\n{listing}"
+            )
+            plans_text.append(f"{statement}\n{listing}")
+    listing = "\n\n".join(plans_text)
+    assert any(
+        re.search(rf"\b{index}\b", listing) for index in indexes
+    ), f"{endpoint} does not use {' or '.join(indexes)}:\n{listing}"
@@ -0,0 +1,46 @@
+"""
+Every write through the cached CRUD objects invalidates the cached pages, so
+a list read right after a write includes it.
+"""
+from typing import Any, Dict
+
+from fastapi.testclient import TestClient
+
+from .conftest import API
+
+def test_category_writes_invalidate_the_cached_list(
+    client: TestClient, superuser_headers: Dict[str, str]
+) -> None:
+    def names(response: Any) -> Dict[int, str]:
+        return {category["id"]: category["name"] for category in response.json()}
+
+    response = client.get(f"{API}/categories", params={"limit": 1000}, headers=superuser_headers)
+    assert response.status_code == 200
+    etag = response.headers["ETag"]
+    response = client.get(
+        f"{API}/categories", params={"limit": 1000},
+        headers=dict(superuser_headers, **{"If-None-Match": etag}),
+    )
+    assert response.status_code == 304
+
+    response = client.post(
+        f"{API}/categories", json={"name": "cache-category"}, headers=superuser_headers
+    )
+    assert response.status_code == 200, response.text
+    category_id = response.json()["id"]
+    response = client.get(
+        f"{API}/categories", params={"limit": 1000},
+        headers=dict(superuser_headers, **{"If-None-Match": etag}),
+    )
+    assert response.status_code == 200
+    assert names(response)[category_id] == "cache-category"
+
+    response = client.put(
+        f"{API}/categories/{category_id}", json={"name": "cache-category-renamed"},
+        headers=superuser_headers,
+    )
+    assert response.status_code == 200, response.text
+    response = client.get(f"{API}/categories/{category_id}", headers=superuser_headers)
+    assert response.json()["name"] == "cache-category-renamed"
+    response = client.get(f"{API}/categories", params={"limit": 1000}, headers=superuser_headers)
+    assert names(response)[category_id] == "cache-category-renamed"
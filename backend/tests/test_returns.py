@@ -0,0 +1,59 @@
+"""
+Returns filtered by sale or product are paged like the unfiltered list.
+"""
+from typing import Any, Callable, Dict, List
+
+import pytest
+from fastapi.testclient import TestClient
+
+from .conftest import API
+
+@pytest.fixture
+def returned_sale(
+    client: TestClient,
+    superuser_headers: Dict[str, str],
+    customer: Dict[str, Any],
+    create_product: Callable[..., Dict[str, Any]],
+) -> Dict[str, Any]:
+    product = create_product(stock=10)
+    response = client.post(f"{API}/sales", json={
+        "product_id": product["id"], "customer_id": customer["id"], "quantity": 3, "unit_price": 2,
+    }, headers=superuser_headers)
+    assert response.status_code == 200, response.text
+    sale = response.json()
+    for _ in range(3):
+        response = client.post(f"{API}/returns/", json={
+            "sale_id": sale["id"], "product_id": product["id"], "quantity": 1,
+        }, headers=superuser_headers)
+        assert response.status_code == 200, response.text
+    return sale
+
+@pytest.mark.parametrize("filter_by", ["sale_id", "product_id"])
+@pytest.mark.parametrize("fields", [None, "quantity"])
+def test_filtered_returns_are_paged(
+    client: TestClient,
+    superuser_headers: Dict[str, str],
+    returned_sale: Dict[str, Any],
+    filter_by: str,
+    fields: str,
+) -> None:
+    value = returned_sale["id"] if filter_by == "sale_id" else returned_sale["product_id"]
+    params: Dict[str, Any] = {filter_by: value, "limit": 2}
+    if fields:
+        params["fields"] = fields
+    pages: List[List[Dict[str, Any]]] = []
+    while True:
+        response = client.get(f"{API}/returns/", params=params, headers=superuser_headers)
+        assert response.status_code == 200, response.text
+        pages.append(response.json())
+        cursor = response.headers.get("X-Next-Cursor")
+        if cursor is None:
+            break
+        params["after"] = cursor
+    assert [len(page) for page in pages] == [2, 1]
+    ids = [item["id"] for page in pages for item in page]
+    assert ids == sorted(set(ids))
+    if fields:
+        assert all(set(item) == {"id", "quantity"} for page in pages for item in page)
+    else:
+        assert all(item["sale_id"] == returned_sale["id"] for page in pages for item in page)
@@ -0,0 +1,104 @@
+"""
+Selling takes stock with one conditional update: a sale never takes more than
+is in stock, however many run at once, and a rejected sale writes nothing.
+"""
+from concurrent.futures import ThreadPoolExecutor
+from typing import Any, Callable, Dict
+
+from fastapi.testclient import TestClient
+from sqlalchemy.orm import Session
+
+from app import models
+
+from .conftest import API
+
+def stock_of(client: TestClient, headers: Dict[str, str], product_id: int) -> int:
+    response = client.get(f"{API}/products/{product_id}", headers=headers)
+    assert response.status_code == 200, response.text
+    return response.json()["stock"]
+
+def ledger_of(db: Session, product_id: int) -> int:
+    return db.query(models.InventoryTransaction).filter(
+        models.InventoryTransaction.product_id == product_id
+    ).count()
+
+def test_oversell_is_rejected_without_writing(
+    client: TestClient,
+    superuser_headers: Dict[str, str],
+    customer: Dict[str, Any],
+    create_product: Callable[..., Dict[str, Any]],
+    db: Session,
+) -> None:
+    product = create_product(stock=5)
+    entries = ledger_of(db, product["id"])
+    response = client.post(f"{API}/sales", json={
+        "product_id": product["id"], "customer_id": customer["id"], "quantity": 6, "unit_price": 2,
+    }, headers=superuser_headers)
+    assert response.status_code == 400
+    assert response.json()["detail"] == "Not enough stock"
+    assert stock_of(client, superuser_headers, product["id"]) == 5
+    assert ledger_of(db, product["id"]) == entries
+    assert db.query(models.Sale).filter(models.Sale.product_id == product["id"]).count() == 0
+
+def test_concurrent_sales_never_oversell(
+    client: TestClient,
+    superuser_headers: Dict[str, str],
+    customer: Dict[str, Any],
+    create_product: Callable[..., Dict[str, Any]],
+) -> None:
+    product = create_product(stock=10)
+    sale = {"product_id": product["id"], "customer_id": customer["id"], "quantity": 1, "unit_price": 2}
+
+    def sell(_: int) -> int:
+        return client.post(f"{API}/sales", json=sale, headers=superuser_headers).status_code
+
+    with ThreadPoolExecutor(max_workers=8) as pool:
+        statuses = list(pool.map(sell, range(16)))
+    assert sorted(statuses) == [200] * 10 + [400] * 6
+    assert stock_of(client, superuser_headers, product["id"]) == 0
+
+def test_sale_needs_an_existing_customer(
+    client: TestClient,
+    superuser_headers: Dict[str, str],
+    create_product: Callable[..., Dict[str, Any]],
+) -> None:
+    product = create_product(stock=5)
+    sale = {"product_id": product["id"], "quantity": 1, "unit_price": 2}
+    response = client.post(f"{API}/sales", json=sale, headers=superuser_headers)
+    assert response.status_code == 422
+
+    response = client.post(
+        f"{API}/sales", json=dict(sale, customer_id=999999), headers=superuser_headers
+    )
+    assert response.status_code == 404
+    assert response.json()["detail"] == "Customer not found"
+    assert stock_of(client, superuser_headers, product["id"]) == 5
+
+def test_batch_reports_each_offending_line(
+    client: TestClient,
+    superuser_headers: Dict[str, str],
+    customer: Dict[str, Any],
+    create_product: Callable[..., Dict[str, Any]],
+) -> None:
+    product = create_product(stock=5)
+    line = {"product_id": product["id"], "customer_id": customer["id"], "quantity": 2, "unit_price": 2}
+    response = client.post(f"{API}/sales/batch", json=[
+        line,
+        dict(line, customer_id=999999),
+        dict(line, quantity=4),
+        dict(line, product_id=999999),
+    ], headers=superuser_headers)
+    assert response.status_code == 400
+    assert [(error["index"], error["detail"]) for error in response.json()["detail"]] == [
+        (0, "Not enough stock"),
+        (1, "Customer not found"),
+        (2, "Not enough stock"),
+        (3, "Product not found"),
+    ]
+    assert stock_of(client, superuser_headers, product["id"]) == 5
+
+    response = client.post(
+        f"{API}/sales/batch", json=[line, dict(line, quantity=3)], headers=superuser_headers
+    )
+    assert response.status_code == 200, response.text
+    assert stock_of(client, superuser_headers, product["id"]) == 0
@@ -1,10 +1,12 @@
-import React, { useState } from "react";
+import React, { useEffect, useState } from "react";
 import { useQuery, useMutation, useQueryClient } from "@tanstack/react-query";
 import { toast } from "react-toastify";
 import { PlusIcon, PencilIcon, TrashIcon } from "@heroicons/react/24/outline";
 import { getProducts, deleteProduct } from "@/services/products";
 import type { Product } from "@/services/products";
 import ProductModal from "@/components/ProductModal";
+import { subscribeToStream } from "@/services/stream";
+import type { StockEvent } from "@/services/stream";
 
 export default function ProductsPage() {
   const [isModalOpen, setIsModalOpen] = useState(false);
@@ -16,6 +18,34 @@ export default function ProductsPage() {
     queryFn: getProducts,
   });
 
+  // Apply stock changes made elsewhere (other lanes, POS terminals) in place;
+  // product edits and resets re-fetch the list
+  useEffect(
+    () =>
+      subscribeToStream(
+        ["stock", "product"],
+        (topic, data) => {
+          if (topic === "product") {
+            queryClient.invalidateQueries({ queryKey: ["products"] });
+            return;
+          }
+          const event = data as StockEvent;
+          if (event.location_id !== null) {
+            return;
+          }
+          queryClient.setQueryData<Product[]>(["products"], (current) =>
+            current?.map((product) =>
+              product.id === event.product_id
+                ? { ...product, stock: event.stock }
+                : product
+            )
+          );
+        },
+        () => queryClient.invalidateQueries({ queryKey: ["products"] })
+      ),
+    [queryClient]
+  );
+
   const deleteMutation = useMutation({
     mutationFn: deleteProduct,
     onSuccess: () => {
@@ -48,6 +48,24 @@ export interface CreateProductDTO {
   supplier_id: number;
 }
 
+export interface ProductSearchResult {
+  id: number;
+  name: string;
+  sku: string | null;
+  barcode: string | null;
+  price: number;
+  stock: number;
+  category_id: number | null;
+}
+
+export const searchProducts = async (
+  q: string,
+  limit = 20
+): Promise<ProductSearchResult[]> => {
+  const response = await api.get("/products/search", { params: { q, limit } });
+  return response.data;
+};
+
 export const getProducts = async (): Promise<Product[]> => {
   const response = await api.get("/products");
   return response.data;
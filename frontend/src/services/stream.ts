@@ -0,0 +1,47 @@
+const API_URL = import.meta.env.VITE_API_URL || "http://localhost:8000";
+
+export type StreamTopic = "stock" | "sale" | "return" | "product" | "low_stock";
+
+export interface StockEvent {
+  product_id: number;
+  location_id: number | null;
+  transaction_type: "IN" | "OUT" | "ADJUSTMENT";
+  quantity: number;
+  stock: number;
+}
+
+export interface ProductEvent {
+  action: "created" | "updated" | "deleted" | "imported";
+  id?: number;
+  skus?: string[];
+}
+
+// Opens the /stream Server-Sent Events feed; returns a function that closes it.
+// `onReset` runs on (re)connect and when the server drops events, i.e. whenever
+// the data on screen may be stale and should be re-fetched.
+export function subscribeToStream(
+  topics: StreamTopic[],
+  onEvent: (topic: StreamTopic, data: unknown) => void,
+  onReset: () => void
+): () => void {
+  const token = localStorage.getItem("token");
+  if (!token) {
+    return () => {};
+  }
+  const params = new URLSearchParams({ topics: topics.join(","), token });
+  const source = new EventSource(`${API_URL}/api/v1/stream?${params}`);
+  let opened = false;
+  source.onopen = () => {
+    if (opened) {
+      onReset();
+    }
+    opened = true;
+  };
+  for (const topic of topics) {
+    source.addEventListener(topic, (event) =>
+      onEvent(topic, JSON.parse((event as MessageEvent).data))
+    );
+  }
+  source.addEventListener("reset", onReset);
+  return () => source.close();
+}